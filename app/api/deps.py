@@ -1,6 +1,9 @@
-from fastapi import Depends
+from typing import Optional
+from fastapi import Depends, Query
 from sqlalchemy.orm import Session
-from app.config.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.database import get_db, get_async_db
+from app.utils.pagination import TotalMode
 
 
 def get_current_db(db: Session = Depends(get_db)) -> Session:
@@ -8,6 +11,11 @@ def get_current_db(db: Session = Depends(get_db)) -> Session:
     return db
 
 
+def get_current_async_db(db: AsyncSession = Depends(get_async_db)) -> AsyncSession:
+    """Dependencia para obtener la sesión asíncrona de base de datos"""
+    return db
+
+
 def get_pagination_params(page: int = 1, page_size: int = 20) -> dict:
     """Dependencia para parámetros de paginación"""
     if page < 1:
@@ -20,3 +28,15 @@ def get_pagination_params(page: int = 1, page_size: int = 20) -> dict:
         "page_size": page_size,
         "offset": (page - 1) * page_size
     }
+
+
+def get_cursor_params(
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior (`next_cursor`)"),
+    limit: int = Query(20, ge=1, le=100),
+    total: TotalMode = Query(
+        "exact",
+        description="exact (COUNT con los filtros) | estimate (estimación del planificador, opcional) | none"
+    )
+) -> dict:
+    """Dependencia para paginación por cursor"""
+    return {"cursor": cursor, "limit": limit, "total_mode": total}
@@ -1,17 +1,90 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.api.deps import get_current_db
+from datetime import date
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.api.deps import get_current_async_db, get_cursor_params
+from app.models.calls import Call
+from app.schemas.calls import CallIngestResult, CallList, CallWithDetails
+from app.services.call_ingestion_service import call_ingestion_service
+from app.utils.pagination import InvalidCursorError, keyset_paginate
 
 router = APIRouter()
 
 
-@router.get("/", response_model=dict)
-async def get_calls(db: Session = Depends(get_current_db)):
-    """Obtener lista de llamadas"""
-    return {"calls": [], "total": 0}
+@router.get("/", response_model=CallList)
+async def get_calls(
+    operator_id: Optional[int] = None,
+    client_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    pagination: dict = Depends(get_cursor_params),
+    db: AsyncSession = Depends(get_current_async_db)
+):
+    """Obtener lista de llamadas paginada por cursor (más recientes primero)"""
+    query = select(Call).options(selectinload(Call.operator), selectinload(Call.client))
+    if operator_id:
+        query = query.where(Call.operator_id == operator_id)
+    if client_id:
+        query = query.where(Call.client_id == client_id)
+    if start_date:
+        query = query.where(Call.call_date >= start_date)
+    if end_date:
+        query = query.where(Call.call_date <= end_date)
+    
+    try:
+        page = await keyset_paginate(
+            db,
+            query,
+            listing="calls",
+            columns=(Call.call_date, Call.call_id),
+            limit=pagination["limit"],
+            cursor=pagination["cursor"],
+            descending=True,
+            total_mode=pagination["total_mode"]
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    calls = [
+        CallWithDetails.model_validate(call).model_copy(update={
+            "operator_name": call.operator.name if call.operator else None,
+            "client_external_ref": call.client.external_ref if call.client else None
+        })
+        for call in page.items
+    ]
+    return CallList(calls=calls, total=page.total, limit=pagination["limit"], next_cursor=page.next_cursor)
+
+
+@router.post("/bulk", response_model=CallIngestResult)
+async def bulk_ingest_calls(
+    file: UploadFile = File(..., description="Archivo NDJSON (una llamada por línea) o CSV con encabezados"),
+    format: Optional[Literal["ndjson", "csv"]] = Query(None, description="Se deduce de la extensión si se omite"),
+    create_clients: bool = Query(False, description="Dar de alta referencias de cliente desconocidas"),
+    db: AsyncSession = Depends(get_current_async_db)
+):
+    """
+    Carga masiva de llamadas
+    
+    Cada fila lleva `operator_id` u `operator_name`, `client_id` o
+    `client_external_ref`, `call_date` y los campos opcionales de la llamada.
+    Las filas inválidas se reportan por número de línea sin detener la carga.
+    """
+    file_format = format
+    if file_format is None:
+        extension = (file.filename or "").rsplit(".", 1)[-1].lower()
+        file_format = {"ndjson": "ndjson", "jsonl": "ndjson", "csv": "csv"}.get(extension)
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato no reconocido: usa ?format=ndjson|csv"
+        )
+    
+    return await call_ingestion_service.ingest(db, file.file, file_format, create_clients=create_clients)
 
 
 @router.post("/", response_model=dict)
-async def create_call(call_data: dict, db: Session = Depends(get_current_db)):
+async def create_call(call_data: dict, db: AsyncSession = Depends(get_current_async_db)):
     """Crear nueva llamada"""
     return {"message": "Llamada creada", "call": call_data}
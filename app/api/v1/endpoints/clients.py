@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.api.deps import get_current_db, get_pagination_params
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_current_async_db, get_pagination_params
 
 router = APIRouter()
 
@@ -8,7 +8,7 @@ router = APIRouter()
 @router.get("/", response_model=dict)
 async def get_clients(
     pagination: dict = Depends(get_pagination_params),
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """Obtener lista de clientes con paginación"""
     # Implementación básica - expandir según necesidades
@@ -23,7 +23,7 @@ async def get_clients(
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_client(
     client_data: dict,
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """Crear nuevo cliente"""
     return {"message": "Cliente creado", "client": client_data}
@@ -1,65 +1,154 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from datetime import datetime, date
-from typing import Optional
-from app.api.deps import get_current_db
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, WebSocket, status
+from fastapi.responses import StreamingResponse
+from datetime import date
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from loguru import logger
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import database
+from app.config.settings import settings
+from app.core.cache import StaleWhileRevalidateCache
+from app.services.dashboard_service import DashboardService
+from app.services.realtime_broadcaster import real_time_broadcaster
 
 router = APIRouter()
+dashboard_service = DashboardService()
+
+# Caché de respuestas compartido por todos los clientes que consultan los dashboards
+dashboard_cache = StaleWhileRevalidateCache(
+    ttl=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    stale_ttl=settings.DASHBOARD_CACHE_STALE_SECONDS
+)
+
+
+async def _cached(
+    key: tuple,
+    query: Callable[[AsyncSession], Awaitable[Dict[str, Any]]],
+    ttl: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Responder desde el caché; la recarga abre su propia sesión porque puede sobrevivir a la solicitud
+    
+    Si la base de datos no responde se sirve el último valor cargado aunque
+    esté vencido; sin ninguno, 503 en lugar de un error 500.
+    """
+    async def load() -> Dict[str, Any]:
+        async with database.get_async_session_factory()() as db:
+            return await query(db)
+    
+    try:
+        return await dashboard_cache.get_or_load(key, load, ttl=ttl)
+    except (SQLAlchemyError, OSError) as e:
+        last = dashboard_cache.last_value(key)
+        if last is not None:
+            logger.warning(f"Dashboard {key[0]}: base de datos no disponible, se sirve el último valor ({e})")
+            return last
+        logger.error(f"Dashboard {key[0]}: base de datos no disponible y sin valor en caché ({e})")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Dashboard no disponible: la base de datos no responde, intenta de nuevo en unos segundos"
+        )
 
 
 @router.get("/metrics", response_model=dict)
-async def get_dashboard_metrics(db: Session = Depends(get_current_db)):
+async def get_dashboard_metrics():
     """Obtener métricas principales para dashboard"""
-    return {
-        "total_calls_today": 0,
-        "total_tickets_open": 0,
-        "total_operators_active": 0,
-        "total_clients": 0,
-        "ticket_resolution_rate": 0.0,
-        "average_call_duration": 0.0
-    }
+    return await _cached(("metrics",), dashboard_service.get_main_metrics)
 
 
 @router.get("/charts/calls-by-date", response_model=dict)
 async def get_calls_by_date_chart(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
-    db: Session = Depends(get_current_db)
+    days: int = Query(30, ge=1, le=366)
 ):
     """Datos para gráfico de llamadas por fecha"""
-    return {
-        "labels": [],
-        "data": [],
-        "chart_type": "line"
-    }
+    return await _cached(
+        ("calls-by-date", start_date, end_date, days),
+        lambda db: dashboard_service.get_calls_by_date_chart(
+            db, days=days, start_date=start_date, end_date=end_date
+        )
+    )
 
 
 @router.get("/charts/tickets-by-status", response_model=dict)
-async def get_tickets_by_status_chart(db: Session = Depends(get_current_db)):
+async def get_tickets_by_status_chart():
     """Datos para gráfico de tickets por estado"""
-    return {
-        "labels": ["Abierto", "En Progreso", "Resuelto", "Cerrado"],
-        "data": [0, 0, 0, 0],
-        "chart_type": "pie"
-    }
+    return await _cached(("tickets-by-status",), dashboard_service.get_tickets_by_status_chart)
 
 
 @router.get("/charts/calls-by-operator", response_model=dict)
-async def get_calls_by_operator_chart(db: Session = Depends(get_current_db)):
+async def get_calls_by_operator_chart():
     """Datos para gráfico de llamadas por operador"""
-    return {
-        "labels": [],
-        "data": [],
-        "chart_type": "bar"
-    }
+    return await _cached(("calls-by-operator",), dashboard_service.get_calls_by_operator_chart)
 
 
 @router.get("/real-time", response_model=dict)
-async def get_real_time_data(db: Session = Depends(get_current_db)):
+async def get_real_time_data():
     """Datos en tiempo real para dashboard"""
-    return {
-        "active_calls": 0,
-        "pending_tickets": 0,
-        "operators_online": 0,
-        "last_updated": datetime.now().isoformat()
-    }
+    return await _cached(
+        ("real-time",),
+        dashboard_service.get_real_time_data,
+        ttl=settings.DASHBOARD_REALTIME_CACHE_TTL_SECONDS
+    )
+
+
+@router.get("/real-time/stream")
+async def stream_real_time_data():
+    """
+    Datos en tiempo real por Server-Sent Events
+    
+    El primer evento trae la foto completa (`snapshot`); después solo se
+    envían los campos que cambiaron (`delta`).
+    """
+    async def events() -> AsyncIterator[str]:
+        async with real_time_broadcaster.subscribe() as queue:
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=settings.DASHBOARD_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Comentario SSE para mantener viva la conexión a través de proxies
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {message}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/real-time/ws")
+async def real_time_websocket(websocket: WebSocket):
+    """Datos en tiempo real por WebSocket (mismos mensajes que el stream SSE)"""
+    await websocket.accept()
+    async with real_time_broadcaster.subscribe() as queue:
+        async def forward():
+            while True:
+                await websocket.send_text(await queue.get())
+        
+        sender = asyncio.create_task(forward())
+        try:
+            # Leer del socket detecta la desconexión aunque no haya cambios que enviar
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
+
+
+@router.get("/real-time/stream/stats", response_model=dict)
+async def get_real_time_stream_stats():
+    """Estadísticas del productor de tiempo real"""
+    return real_time_broadcaster.stats()
+
+
+@router.get("/cache-stats", response_model=dict)
+async def get_dashboard_cache_stats():
+    """Estadísticas del caché de respuestas de dashboards"""
+    return dashboard_cache.stats()
@@ -2,15 +2,27 @@
 🔧 Endpoints para generar especificación OpenAPI para Watson Orchestrate
 """
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Request, Response
 from typing import Dict, Any
 import json
 
+from app.utils.precomputed import PrecomputedJSON
+
 router = APIRouter()
 
+
 @router.get("/watson-openapi.json")
-async def get_watson_openapi_spec() -> JSONResponse:
+async def get_watson_openapi_spec(request: Request) -> Response:
+    """
+    📋 Especificación OpenAPI para Watson Orchestrate
+    
+    Se serializa y comprime una sola vez; con `If-None-Match` vigente
+    responde 304 sin cuerpo.
+    """
+    return watson_openapi_spec.response(request)
+
+
+def build_watson_openapi_spec() -> Dict[str, Any]:
     """
     📋 Generar especificación OpenAPI específica para Watson Orchestrate
     
@@ -362,7 +374,12 @@ async def get_watson_openapi_spec() -> JSONResponse:
         }
     }
     
-    return JSONResponse(content=openapi_spec)
+    return openapi_spec
+
+
+# La especificación solo cambia con un despliegue
+watson_openapi_spec = PrecomputedJSON(build_watson_openapi_spec)
+
 
 @router.get("/watson-integration-guide")
 async def get_watson_integration_guide() -> Dict[str, Any]:
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, exists
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.api.deps import get_current_db, get_pagination_params
+from app.api.deps import get_current_async_db, get_cursor_params
 from app.schemas.operators import (
     OperatorCreate,
     OperatorUpdate,
@@ -9,36 +10,46 @@ from app.schemas.operators import (
     OperatorList
 )
 from app.models.operators import Operator
+from app.models.calls import Call
+from app.utils.pagination import InvalidCursorError, keyset_paginate
 
 router = APIRouter()
 
 
 @router.get("/", response_model=OperatorList)
 async def get_operators(
-    pagination: dict = Depends(get_pagination_params),
-    db: Session = Depends(get_current_db)
+    pagination: dict = Depends(get_cursor_params),
+    db: AsyncSession = Depends(get_current_async_db)
 ):
-    """Obtener lista de operadores con paginación"""
-    query = db.query(Operator)
-    total = query.count()
-    
-    operators = query.offset(pagination["offset"]).limit(pagination["page_size"]).all()
+    """Obtener lista de operadores paginada por cursor"""
+    try:
+        page = await keyset_paginate(
+            db,
+            select(Operator),
+            listing="operators",
+            columns=(Operator.operator_id,),
+            limit=pagination["limit"],
+            cursor=pagination["cursor"],
+            total_mode=pagination["total_mode"]
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return OperatorList(
-        operators=operators,
-        total=total,
-        page=pagination["page"],
-        page_size=pagination["page_size"]
+        operators=page.items,
+        total=page.total,
+        limit=pagination["limit"],
+        next_cursor=page.next_cursor
     )
 
 
 @router.get("/{operator_id}", response_model=OperatorResponse)
 async def get_operator(
     operator_id: int,
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """Obtener operador por ID"""
-    operator = db.query(Operator).filter(Operator.operator_id == operator_id).first()
+    operator = await db.get(Operator, operator_id)
     if not operator:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -50,11 +61,13 @@ async def get_operator(
 @router.post("/", response_model=OperatorResponse, status_code=status.HTTP_201_CREATED)
 async def create_operator(
     operator_data: OperatorCreate,
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """Crear nuevo operador"""
     # Verificar si ya existe un operador con ese nombre
-    existing = db.query(Operator).filter(Operator.name == operator_data.name).first()
+    existing = await db.scalar(
+        select(Operator).where(Operator.name == operator_data.name)
+    )
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -63,8 +76,8 @@ async def create_operator(
     
     operator = Operator(**operator_data.model_dump())
     db.add(operator)
-    db.commit()
-    db.refresh(operator)
+    await db.commit()
+    await db.refresh(operator)
     return operator
 
 
@@ -72,10 +85,10 @@ async def create_operator(
 async def update_operator(
     operator_id: int,
     operator_data: OperatorUpdate,
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """Actualizar operador"""
-    operator = db.query(Operator).filter(Operator.operator_id == operator_id).first()
+    operator = await db.get(Operator, operator_id)
     if not operator:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -84,7 +97,9 @@ async def update_operator(
     
     # Verificar nombre único si se está actualizando
     if operator_data.name and operator_data.name != operator.name:
-        existing = db.query(Operator).filter(Operator.name == operator_data.name).first()
+        existing = await db.scalar(
+            select(Operator).where(Operator.name == operator_data.name)
+        )
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -95,18 +110,18 @@ async def update_operator(
     for field, value in operator_data.model_dump(exclude_unset=True).items():
         setattr(operator, field, value)
     
-    db.commit()
-    db.refresh(operator)
+    await db.commit()
+    await db.refresh(operator)
     return operator
 
 
 @router.delete("/{operator_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_operator(
     operator_id: int,
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """Eliminar operador"""
-    operator = db.query(Operator).filter(Operator.operator_id == operator_id).first()
+    operator = await db.get(Operator, operator_id)
     if not operator:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -114,12 +129,15 @@ async def delete_operator(
         )
     
     # Verificar si tiene llamadas asociadas
-    if operator.calls:
+    has_calls = await db.scalar(
+        select(exists().where(Call.operator_id == operator_id))
+    )
+    if has_calls:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No se puede eliminar el operador porque tiene llamadas asociadas"
         )
     
-    db.delete(operator)
-    db.commit()
+    await db.delete(operator)
+    await db.commit()
     return None
@@ -1,67 +1,152 @@
+import os
 from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from datetime import date
-from typing import Optional
-from app.api.deps import get_current_db
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+from app.api.deps import get_current_async_db
+from app.config.settings import settings
+from app.models.reports import Report
+from app.schemas.reports import ReportJobCreate, ReportJobResponse
+from app.services.report_service import report_service, MEDIA_TYPES
+from app.services.report_jobs import report_job_engine
 
 router = APIRouter()
 
 
-@router.get("/calls", response_model=dict)
+async def _export_report(
+    report_type: str,
+    filters: Dict[str, Any],
+    format: str,
+    limit: int,
+    db: AsyncSession
+):
+    """JSON con resumen y primeras filas; CSV/XLSX con el reporte completo como descarga"""
+    filename = f"reporte_{report_type}_{datetime.now():%Y%m%d_%H%M%S}.{format}"
+    
+    if format == "csv":
+        return StreamingResponse(
+            report_service.iter_csv(report_type, filters),
+            media_type=MEDIA_TYPES["csv"],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    
+    if format == "xlsx":
+        path = await report_service.export_xlsx_tempfile(report_type, filters)
+        return FileResponse(
+            path,
+            media_type=MEDIA_TYPES["xlsx"],
+            filename=filename,
+            background=BackgroundTask(os.unlink, path)
+        )
+    
+    return {
+        "report_type": report_type,
+        "filters": filters,
+        "format": format,
+        "data": await report_service.get_preview(db, report_type, filters, limit),
+        "summary": await report_service.get_summary(db, report_type, filters)
+    }
+
+
+@router.get("/calls")
 async def generate_calls_report(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     operator_id: Optional[int] = Query(None),
     client_id: Optional[int] = Query(None),
     format: str = Query("json", regex="^(json|csv|xlsx)$"),
-    db: Session = Depends(get_current_db)
+    limit: int = Query(100, ge=1, le=1000, description="Filas incluidas en formato JSON"),
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """Generar reporte de llamadas"""
-    return {
-        "report_type": "calls",
-        "filters": {
-            "start_date": start_date,
-            "end_date": end_date,
-            "operator_id": operator_id,
-            "client_id": client_id
-        },
-        "format": format,
-        "data": [],
-        "summary": {
-            "total_calls": 0,
-            "total_duration": 0,
-            "average_duration": 0
-        }
+    filters = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "operator_id": operator_id,
+        "client_id": client_id
     }
+    return await _export_report("calls", filters, format, limit, db)
 
 
-@router.get("/tickets", response_model=dict)
+@router.get("/tickets")
 async def generate_tickets_report(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
-    status: Optional[str] = Query(None),
-    priority: Optional[str] = Query(None),
+    status: Optional[str] = Query(None, regex="^(open|in_progress|resolved|closed)$"),
+    priority: Optional[str] = Query(None, regex="^(low|medium|high|urgent)$"),
     format: str = Query("json", regex="^(json|csv|xlsx)$"),
-    db: Session = Depends(get_current_db)
+    limit: int = Query(100, ge=1, le=1000, description="Filas incluidas en formato JSON"),
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """Generar reporte de tickets"""
-    return {
-        "report_type": "tickets",
-        "filters": {
-            "start_date": start_date,
-            "end_date": end_date,
-            "status": status,
-            "priority": priority
-        },
-        "format": format,
-        "data": [],
-        "summary": {
-            "total_tickets": 0,
-            "resolved_tickets": 0,
-            "resolution_rate": 0.0,
-            "average_resolution_time": 0
-        }
+    filters = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "status": status,
+        "priority": priority
     }
+    return await _export_report("tickets", filters, format, limit, db)
+
+
+def _job_response(report: Report, deduplicated: bool = False) -> ReportJobResponse:
+    response = ReportJobResponse.model_validate(report)
+    response.deduplicated = deduplicated
+    if report.status == "completed":
+        response.download_url = f"{settings.API_V1_STR}/reports/jobs/{report.report_id}/download"
+    return response
+
+
+@router.post("/jobs", response_model=ReportJobResponse, status_code=202)
+async def submit_report_job(
+    job: ReportJobCreate,
+    db: AsyncSession = Depends(get_current_async_db)
+):
+    """
+    Encolar la generación de un reporte (CSV/XLSX) en segundo plano
+    
+    Si ya hay un reporte con los mismos parámetros en cola, en proceso o
+    terminado recientemente, se devuelve ese mismo (`deduplicated`).
+    """
+    filters = job.model_dump(exclude={"report_type", "format", "generated_by"})
+    report, deduplicated = await report_job_engine.submit(
+        db, job.report_type, job.format, filters, generated_by=job.generated_by
+    )
+    return _job_response(report, deduplicated)
+
+
+@router.get("/jobs/{report_id}", response_model=ReportJobResponse)
+async def get_report_job(
+    report_id: int,
+    db: AsyncSession = Depends(get_current_async_db)
+):
+    """Consultar el estado de un trabajo de reporte"""
+    report = await report_job_engine.get(db, report_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Reporte no encontrado")
+    return _job_response(report)
+
+
+@router.get("/jobs/{report_id}/download")
+async def download_report_job(
+    report_id: int,
+    db: AsyncSession = Depends(get_current_async_db)
+):
+    """Descargar el archivo de un reporte terminado"""
+    report = await report_job_engine.get(db, report_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Reporte no encontrado")
+    if report.status != "completed":
+        raise HTTPException(status_code=409, detail=f"El reporte aún no está listo (estado: {report.status})")
+    if not report.file_path or not os.path.exists(report.file_path):
+        raise HTTPException(status_code=410, detail="El archivo del reporte ya no está disponible")
+    
+    return FileResponse(
+        report.file_path,
+        media_type=MEDIA_TYPES[report.file_format],
+        filename=f"reporte_{report.report_type}_{report.report_id}.{report.file_format}"
+    )
 
 
 @router.get("/operators-performance", response_model=dict)
@@ -69,7 +154,7 @@ async def generate_operators_performance_report(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     format: str = Query("json", regex="^(json|csv|xlsx)$"),
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """Generar reporte de rendimiento de operadores"""
     return {
@@ -91,7 +176,7 @@ async def generate_operators_performance_report(
 @router.post("/custom", response_model=dict)
 async def generate_custom_report(
     report_config: dict,
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """Generar reporte personalizado"""
     return {
@@ -105,7 +190,7 @@ async def generate_custom_report(
 @router.get("/analytics", response_model=dict)
 async def get_analytics_data(
     period: str = Query("week", regex="^(day|week|month|year)$"),
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """Obtener datos analíticos para BI"""
     return {
@@ -1,29 +1,63 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.api.deps import get_current_db
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status as http_status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_current_async_db, get_cursor_params
+from app.models.tickets import TicketStatus as ModelTicketStatus, TicketPriority as ModelTicketPriority
+from app.schemas.tickets import TicketList, TicketPriority, TicketStats, TicketStatus, TicketWithDetails
+from app.services.ticket_service import TicketService
+from app.utils.pagination import InvalidCursorError
 
 router = APIRouter()
+ticket_service = TicketService()
 
 
-@router.get("/", response_model=dict)
-async def get_tickets(db: Session = Depends(get_current_db)):
-    """Obtener lista de tickets"""
-    return {"tickets": [], "total": 0}
+@router.get("/", response_model=TicketList)
+async def get_tickets(
+    status: Optional[TicketStatus] = None,
+    priority: Optional[TicketPriority] = None,
+    client_id: Optional[int] = None,
+    assigned_operator_id: Optional[int] = None,
+    pagination: dict = Depends(get_cursor_params),
+    db: AsyncSession = Depends(get_current_async_db)
+):
+    """Obtener lista de tickets paginada por cursor (más recientes primero)"""
+    try:
+        page = await ticket_service.get_tickets_list(
+            db,
+            cursor=pagination["cursor"],
+            limit=pagination["limit"],
+            status=ModelTicketStatus(status.value) if status else None,
+            priority=ModelTicketPriority(priority.value) if priority else None,
+            client_id=client_id,
+            assigned_operator_id=assigned_operator_id,
+            total_mode=pagination["total_mode"]
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    tickets = [
+        TicketWithDetails.model_validate(ticket).model_copy(update={
+            "assigned_operator_name": ticket.assigned_operator.name if ticket.assigned_operator else None,
+            "client_external_ref": ticket.client.external_ref if ticket.client else None,
+            "call_label": ticket.call.call_label if ticket.call else None
+        })
+        for ticket in page.items
+    ]
+    return TicketList(
+        tickets=tickets,
+        total=page.total,
+        limit=pagination["limit"],
+        next_cursor=page.next_cursor
+    )
 
 
 @router.post("/", response_model=dict)
-async def create_ticket(ticket_data: dict, db: Session = Depends(get_current_db)):
+async def create_ticket(ticket_data: dict, db: AsyncSession = Depends(get_current_async_db)):
     """Crear nuevo ticket"""
     return {"message": "Ticket creado", "ticket": ticket_data}
 
 
-@router.get("/stats", response_model=dict)
-async def get_ticket_stats(db: Session = Depends(get_current_db)):
+@router.get("/stats", response_model=TicketStats)
+async def get_ticket_stats(db: AsyncSession = Depends(get_current_async_db)):
     """Obtener estadísticas de tickets"""
-    return {
-        "total_tickets": 0,
-        "open_tickets": 0,
-        "in_progress_tickets": 0,
-        "resolved_tickets": 0,
-        "closed_tickets": 0
-    }
+    return await ticket_service.get_ticket_stats(db)
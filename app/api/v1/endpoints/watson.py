@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Request, Response
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
-from datetime import datetime
-from app.api.deps import get_current_db
+from datetime import datetime, date
+from app.api.deps import get_current_async_db
+from app.config.settings import settings
+from app.core.serialization import FastJSONResponse
+from app.utils.precomputed import PrecomputedJSON
 from app.services.watson_service import WatsonService
+from app.services.conversation_analysis_service import (
+    conversation_analysis_service,
+    ANALYSIS_RULES_VERSION
+)
 
 router = APIRouter()
 watson_service = WatsonService()
@@ -43,6 +51,19 @@ class ConversationAnalysisRequest(BaseModel):
     client_ref: str
     call_date: str = None
     call_label: str = None
+    call_id: int = None
+    persist: bool = False
+
+class BatchConversationItem(BaseModel):
+    conversation: str
+    call_id: int = None
+
+class BatchConversationAnalysisRequest(BaseModel):
+    conversations: List[BatchConversationItem] = Field(default_factory=list)
+    call_id_start: int = None
+    call_id_end: int = None
+    only_unanalyzed: bool = True
+    persist: bool = True
 
 class SimpleResponse(BaseModel):
     success: bool
@@ -66,7 +87,9 @@ class WatsonWebhookResponse(BaseModel):
 async def watson_webhook(
     request: WatsonWebhookRequest,
     raw_request: Request,
-    db: Session = Depends(get_current_db)
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """
     🤖 Webhook principal para Watson Orchestrate
@@ -77,6 +100,10 @@ async def watson_webhook(
     - Consultas de estado
     - Generación de reportes
     
+    Los reintentos (mismo header `Idempotency-Key`, o misma sesión y mensaje
+    dentro de WATSON_IDEMPOTENCY_TTL_SECONDS) reciben la respuesta original
+    con el header `Idempotent-Replayed: true`, sin volver a ejecutarse.
+    
     Ejemplo de payload de Watson:
     ```json
     {
@@ -100,7 +127,12 @@ async def watson_webhook(
         print(f"📨 Webhook Watson recibido: {request.session_id}")
         
         # Procesar según la intención
-        response_data = await watson_service.process_watson_webhook(request, db)
+        # Un reintento de Watson (mismo mensaje o mismo Idempotency-Key) repite la respuesta
+        response_data, replayed = await watson_service.process_watson_webhook_once(
+            request, db, idempotency_key
+        )
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
         
         return WatsonWebhookResponse(**response_data)
     
@@ -111,20 +143,14 @@ async def watson_webhook(
         )
 
 
-@router.get("/openapi-spec")
-async def get_openapi_spec():
-    """
-    📋 Obtener especificación OpenAPI para Watson
-    
-    Watson puede consumir esta especificación para entender
-    qué endpoints están disponibles y cómo usarlos.
-    """
+def _build_watson_spec() -> Dict[str, Any]:
+    """Subconjunto de la especificación de la app con los endpoints útiles para Watson"""
     from app.main import app
     
     # Filtrar solo endpoints relevantes para Watson
     openapi_spec = app.openapi()
     
-    watson_spec = {
+    return {
         "openapi": openapi_spec["openapi"],
         "info": {
             "title": "UANL API - Watson Integration",
@@ -144,15 +170,29 @@ async def get_openapi_spec():
         },
         "components": openapi_spec.get("components", {})
     }
+
+
+# Se arma en la primera consulta (las rutas ya no cambian después del arranque)
+watson_spec = PrecomputedJSON(_build_watson_spec)
+
+
+@router.get("/openapi-spec")
+async def get_openapi_spec(request: Request) -> Response:
+    """
+    📋 Obtener especificación OpenAPI para Watson
     
-    return watson_spec
+    Watson puede consumir esta especificación para entender
+    qué endpoints están disponibles y cómo usarlos. Se sirve precalculada
+    con ETag: si no cambió, la respuesta es un 304 sin cuerpo.
+    """
+    return watson_spec.response(request)
 
 
 @router.post("/actions/{action_type}")
 async def execute_watson_action(
     action_type: str,
     action_data: Dict[str, Any],
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """
     ⚡ Ejecutar acciones específicas desde Watson
@@ -199,7 +239,12 @@ async def watson_integration_status():
             "send_notification", 
             "generate_report",
             "get_status"
-        ]
+        ],
+        "analysis_cache": {
+            "rules_version": ANALYSIS_RULES_VERSION,
+            **conversation_analysis_service.cache.stats()
+        },
+        "background_analyzer": background_call_analyzer.stats()
     }
 
 
@@ -219,7 +264,7 @@ async def test_watson_connection():
 @router.post("/create-ticket", response_model=SimpleResponse)
 async def create_ticket_simple(
     request: CreateTicketRequest,
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ) -> SimpleResponse:
     """✅ Crear ticket de soporte - Endpoint simplificado para Watson"""
     try:
@@ -242,7 +287,7 @@ async def create_ticket_simple(
 @router.post("/schedule-visit", response_model=SimpleResponse)
 async def schedule_visit_simple(
     request: ScheduleVisitRequest,
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ) -> SimpleResponse:
     """📅 Programar visita técnica - Endpoint simplificado para Watson"""
     try:
@@ -264,7 +309,7 @@ async def schedule_visit_simple(
 @router.post("/get-status", response_model=SimpleResponse)
 async def get_status_simple(
     request: GetStatusRequest,
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ) -> SimpleResponse:
     """📋 Consultar estado - Endpoint simplificado para Watson"""
     try:
@@ -303,214 +348,135 @@ async def get_status_simple(
 @router.post("/analyze-conversation")
 async def analyze_conversation(
     request: ConversationAnalysisRequest,
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ) -> Dict[str, Any]:
     """🧠 Analizar conversación telefónica y generar insights para Watson"""
     try:
         conversation_text = request.conversation
         
-        # Análisis automático de la conversación
-        analysis = {
-            "call_analysis": {
-                "problem_type": extract_problem_type(conversation_text),
-                "urgency_level": extract_urgency(conversation_text),
-                "customer_sentiment": analyze_sentiment(conversation_text),
-                "resolution_status": extract_resolution_status(conversation_text),
-                "follow_up_required": check_follow_up_needed(conversation_text)
-            },
-            "extracted_entities": extract_entities(conversation_text),
-            "recommended_actions": generate_recommendations(conversation_text),
-            "summary": generate_summary(conversation_text)
-        }
-        
-        # Generar ID de llamada
-        call_id = f"CALL-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        if request.persist:
+            # Guardar la llamada y su análisis completo en uanl.calls / uanl.call_analyses
+            call_id, analysis = await conversation_analysis_service.analyze_and_store_call(
+                db,
+                conversation=conversation_text,
+                operator_id=request.operator_id,
+                client_ref=request.client_ref,
+                call_date=date.fromisoformat(request.call_date) if request.call_date else None,
+                call_label=request.call_label,
+                call_id=request.call_id
+            )
+        else:
+            # Análisis automático de la conversación (reutiliza resultados en caché)
+            analysis = await conversation_analysis_service.analyze(conversation_text)
+            
+            # Generar ID de llamada
+            call_id = f"CALL-{datetime.now().strftime('%Y%m%d%H%M%S')}"
         
         return {
             "success": True,
             "call_id": call_id,
+            "persisted": request.persist,
             "analysis": analysis,
             "message": "Conversación analizada exitosamente"
         }
         
     except Exception as e:
+        await db.rollback()
         return {
             "success": False,
             "message": f"Error analizando conversación: {str(e)}"
         }
 
 
-# 🧠 Funciones de análisis de conversaciones
-def extract_problem_type(conversation: str) -> str:
-    """Extraer tipo de problema de la conversación"""
-    conversation_lower = conversation.lower()
-    
-    if "lentitud" in conversation_lower or "lento" in conversation_lower:
-        return "lentitud_servicio"
-    elif "no funciona" in conversation_lower or "no conecta" in conversation_lower:
-        return "falta_servicio"
-    elif "intermitente" in conversation_lower:
-        return "servicio_intermitente"
-    elif "luz naranja" in conversation_lower or "indicador" in conversation_lower:
-        return "problema_conectividad"
-    else:
-        return "problema_general"
-
-
-def extract_urgency(conversation: str) -> str:
-    """Determinar nivel de urgencia basado en contexto"""
-    conversation_lower = conversation.lower()
-    
-    if "urgente" in conversation_lower or "inmediato" in conversation_lower:
-        return "high"
-    elif "varios aparatos" in conversation_lower or "trabajo" in conversation_lower:
-        return "medium"
-    elif "cuando pueda" in conversation_lower or "no hay prisa" in conversation_lower:
-        return "low"
-    else:
-        return "medium"
-
-
-def analyze_sentiment(conversation: str) -> str:
-    """Analizar sentimiento del cliente"""
-    conversation_lower = conversation.lower()
-    
-    negative_words = ["problema", "lento", "no funciona", "molesto", "frustrante"]
-    positive_words = ["gracias", "muy bien", "perfecto", "excelente"]
-    neutral_words = ["okay", "entiendo", "está bien"]
-    
-    negative_count = sum(1 for word in negative_words if word in conversation_lower)
-    positive_count = sum(1 for word in positive_words if word in conversation_lower)
-    neutral_count = sum(1 for word in neutral_words if word in conversation_lower)
-    
-    if negative_count > positive_count + neutral_count:
-        return "frustrated"
-    elif positive_count > negative_count:
-        return "satisfied"
-    else:
-        return "neutral"
-
-
-def extract_resolution_status(conversation: str) -> str:
-    """Determinar estado de resolución"""
-    conversation_lower = conversation.lower()
-    
-    if "ajuste" in conversation_lower and "realizó" in conversation_lower:
-        return "potentially_resolved"
-    elif "devuelvo la llamada" in conversation_lower or "callback" in conversation_lower:
-        return "pending_verification"
-    elif "técnico" in conversation_lower and "venir" in conversation_lower:
-        return "requires_technician"
-    else:
-        return "unresolved"
-
-
-def check_follow_up_needed(conversation: str) -> bool:
-    """Verificar si se necesita seguimiento"""
-    follow_up_indicators = [
-        "devuelvo la llamada",
-        "mañana temprano", 
-        "en media hora",
-        "revisar",
-        "callback",
-        "verificar"
-    ]
-    
-    return any(indicator in conversation.lower() for indicator in follow_up_indicators)
-
-
-def extract_entities(conversation: str) -> Dict[str, Any]:
-    """Extraer entidades importantes de la conversación"""
-    entities = {
-        "tiempo_estimado": None,
-        "hora_callback": None,
-        "problema_especifico": None,
-        "estado_servicio": None,
-        "ajustes_realizados": False,
-        "ubicacion_cliente": None
-    }
-    
-    conversation_lower = conversation.lower()
-    
-    # Extraer tiempo estimado
-    if "media hora" in conversation_lower:
-        entities["tiempo_estimado"] = "30 minutos"
-    elif "una hora" in conversation_lower:
-        entities["tiempo_estimado"] = "60 minutos"
-    
-    # Extraer hora de callback
-    if "nueve" in conversation_lower and "noche" in conversation_lower:
-        entities["hora_callback"] = "21:00"
-    elif "mañana temprano" in conversation_lower:
-        entities["hora_callback"] = "08:00"
-    
-    # Extraer problema específico
-    if "luz naranja" in conversation_lower:
-        entities["problema_especifico"] = "indicador_conexion_baja"
-        entities["estado_servicio"] = "degradado"
-    
-    # Verificar si se realizaron ajustes
-    if "ajuste" in conversation_lower and "realizó" in conversation_lower:
-        entities["ajustes_realizados"] = True
-    
-    # Extraer ubicación
-    if "no estoy en mi casa" in conversation_lower:
-        entities["ubicacion_cliente"] = "fuera_domicilio"
-    elif "casa" in conversation_lower:
-        entities["ubicacion_cliente"] = "domicilio"
-    
-    return entities
-
-
-def generate_recommendations(conversation: str) -> List[str]:
-    """Generar recomendaciones basadas en la conversación"""
-    recommendations = []
-    conversation_lower = conversation.lower()
-    
-    if "devuelvo la llamada" in conversation_lower:
-        recommendations.append("programar_callback")
-    
-    if "ajuste" in conversation_lower and "realizó" in conversation_lower:
-        recommendations.append("verificar_ajustes_realizados")
-    
-    if "luz naranja" in conversation_lower:
-        recommendations.append("revisar_niveles_señal")
-        recommendations.append("diagnostico_remoto")
-    
-    if "varios aparatos" in conversation_lower:
-        recommendations.append("optimizar_ancho_banda")
-    
-    if "técnico" in conversation_lower:
-        recommendations.append("programar_visita_tecnica")
+@router.post("/analyze-conversations/batch")
+async def analyze_conversations_batch(
+    request: BatchConversationAnalysisRequest,
+    http_response: Response,
+    db: AsyncSession = Depends(get_current_async_db)
+) -> Dict[str, Any]:
+    """
+    🧠 Analizar conversaciones en lote
     
-    if "lentitud" in conversation_lower:
-        recommendations.append("monitoreo_velocidad")
-        recommendations.append("verificar_configuracion")
+    Acepta una lista de conversaciones (opcionalmente con `call_id` para
+    guardar el resultado) o un rango `call_id_start`..`call_id_end` de
+    uanl.calls. La lista se analiza en la solicitud y se guarda con UPDATEs
+    masivos; los `call_id` inexistentes se omiten y se devuelven en
+    `unknown_call_ids`. El rango se encola en segundo plano (202) y su
+    avance se consulta en `/analyze-conversations/jobs/{job_id}`.
+    """
+    has_range = request.call_id_start is not None or request.call_id_end is not None
+    if not request.conversations and not has_range:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Se requiere una lista de conversaciones o un rango de call_id"
+        )
     
-    return recommendations
+    try:
+        response: Dict[str, Any] = {"success": True}
+        
+        if request.conversations:
+            analyses = await conversation_analysis_service.analyze_many(
+                [item.conversation for item in request.conversations]
+            )
+            
+            updated = 0
+            unknown_call_ids: List[int] = []
+            if request.persist:
+                requested_ids = [item.call_id for item in request.conversations if item.call_id is not None]
+                existing_ids = await conversation_analysis_service.existing_call_ids(db, requested_ids)
+                unknown_call_ids = sorted(set(requested_ids) - existing_ids)
+                to_save = [
+                    (item, analysis)
+                    for item, analysis in zip(request.conversations, analyses)
+                    if item.call_id in existing_ids
+                ]
+                updated = await conversation_analysis_service.save_call_analyses(
+                    db,
+                    [(item.call_id, analysis) for item, analysis in to_save],
+                    conversations=[item.conversation for item, _ in to_save]
+                )
+                await db.commit()
+            
+            response["results"] = [
+                {"call_id": item.call_id, "analysis": analysis}
+                for item, analysis in zip(request.conversations, analyses)
+            ]
+            response["updated_calls"] = updated
+            response["unknown_call_ids"] = unknown_call_ids
+        
+        if has_range:
+            # Decenas de miles de filas no caben en el timeout de una solicitud
+            job = background_call_analyzer.submit_backfill(
+                call_id_start=request.call_id_start,
+                call_id_end=request.call_id_end,
+                only_unanalyzed=request.only_unanalyzed
+            )
+            job["status_url"] = f"{settings.API_V1_STR}/watson/analyze-conversations/jobs/{job['job_id']}"
+            response["backfill"] = job
+            http_response.status_code = status.HTTP_202_ACCEPTED
+        
+        return response
+        
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error en análisis masivo: {str(e)}"
+        )
 
 
-def generate_summary(conversation: str) -> str:
-    """Generar resumen inteligente de la conversación"""
-    conversation_lower = conversation.lower()
-    
-    # Detectar elementos clave
-    problem = "lentitud de servicio" if "lentitud" in conversation_lower else "problema técnico"
-    action_taken = "ajustes realizados" if "ajuste" in conversation_lower else "diagnóstico inicial"
-    next_step = "callback programado" if "devuelvo" in conversation_lower else "seguimiento requerido"
-    
-    return f"""
-    📋 Resumen Automático:
-    • Problema: {problem}
-    • Acción realizada: {action_taken}
-    • Estado: Pendiente de verificación
-    • Próximo paso: {next_step}
-    • Cliente: Cooperativo, disponible para seguimiento
-    """.strip()
+@router.get("/analyze-conversations/jobs/{job_id}")
+async def get_analysis_backfill_job(job_id: str) -> Dict[str, Any]:
+    """🧠 Estado de un análisis por rango encolado desde el endpoint batch"""
+    job = background_call_analyzer.get_backfill(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo de análisis no encontrado")
+    return job
 
 
 # ENDPOINTS PARA CONEXIÓN CON POSTGRESQL
-from app.models.calls import Call
+from app.services.background_analyzer import background_call_analyzer
+from app.models.calls import Call, CallAnalysis, CallStatsDaily
 from app.models.operators import Operator
 from app.models.clients import Client
 from fastapi import Query
@@ -520,32 +486,34 @@ async def get_recent_calls(
     limit: int = Query(10, ge=1, le=100, description="Número de llamadas a retornar"),
     operator_id: int = Query(None, description="Filtrar por operador"),
     has_analysis: bool = Query(None, description="Filtrar llamadas con/sin análisis"),
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """
     Obtener llamadas recientes de PostgreSQL para que Watson pueda analizarlas.
     """
     try:
-        query = db.query(Call).join(Operator).join(Client)
+        query = select(Call, Operator.name, Client.external_ref).join(Operator).join(Client)
         
         if operator_id:
-            query = query.filter(Call.operator_id == operator_id)
+            query = query.where(Call.operator_id == operator_id)
             
         if has_analysis is not None:
             if has_analysis:
-                query = query.filter(Call.sentimiento.isnot(None))
+                query = query.where(Call.sentimiento.isnot(None))
             else:
-                query = query.filter(Call.sentimiento.is_(None))
+                query = query.where(Call.sentimiento.is_(None))
         
-        calls = query.order_by(Call.call_date.desc(), Call.call_id.desc()).limit(limit).all()
+        calls = (await db.execute(
+            query.order_by(Call.call_date.desc(), Call.call_id.desc()).limit(limit)
+        )).all()
         
         result = []
-        for call in calls:
+        for call, operator_name, client_ref in calls:
             result.append({
                 "call_id": call.call_id,
                 "call_label": call.call_label,
-                "operator_name": call.operator.name,
-                "client_ref": call.client.external_ref,
+                "operator_name": operator_name,
+                "client_ref": client_ref,
                 "call_date": call.call_date.isoformat(),
                 "conversation": call.conversation,
                 "sentimiento": call.sentimiento,
@@ -554,11 +522,12 @@ async def get_recent_calls(
                 "tema": call.tema
             })
         
-        return {
+        # Respuesta directa: con 100 transcripciones se evita el recorrido de jsonable_encoder
+        return FastJSONResponse({
             "calls": result,
             "total": len(result),
             "source": "postgresql"
-        }
+        })
         
     except Exception as e:
         # Si no hay conexión a DB, devolver datos de ejemplo
@@ -586,27 +555,35 @@ async def get_recent_calls(
 @router.get("/calls/{call_id}")
 async def get_call_detail(
     call_id: int,
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """
     Obtener detalles de una llamada específica para análisis de Watson.
     """
     try:
-        call = db.query(Call).join(Operator).join(Client).filter(Call.call_id == call_id).first()
+        row = (await db.execute(
+            select(Call, Operator, Client, CallAnalysis)
+            .join(Operator)
+            .join(Client)
+            .outerjoin(CallAnalysis, CallAnalysis.call_id == Call.call_id)
+            .where(Call.call_id == call_id)
+        )).first()
         
-        if not call:
+        if not row:
             raise HTTPException(status_code=404, detail="Llamada no encontrada")
         
+        call, operator, client, stored_analysis = row
+        
         return {
             "call_id": call.call_id,
             "call_label": call.call_label,
             "operator": {
-                "operator_id": call.operator.operator_id,
-                "name": call.operator.name
+                "operator_id": operator.operator_id,
+                "name": operator.name
             },
             "client": {
-                "client_id": call.client.client_id,
-                "external_ref": call.client.external_ref
+                "client_id": client.client_id,
+                "external_ref": client.external_ref
             },
             "call_date": call.call_date.isoformat(),
             "conversation": call.conversation,
@@ -615,7 +592,13 @@ async def get_call_detail(
                 "impacto": call.impacto,
                 "urgencia": call.urgencia,
                 "tema": call.tema
-            }
+            },
+            # Análisis completo precalculado (entidades, recomendaciones, resumen)
+            "full_analysis": stored_analysis.analysis if stored_analysis else None,
+            "analyzed_at": (
+                stored_analysis.analyzed_at.isoformat()
+                if stored_analysis and stored_analysis.analyzed_at else None
+            )
         }
         
     except HTTPException:
@@ -628,13 +611,13 @@ async def get_call_detail(
 async def update_call_analysis(
     call_id: int,
     analysis: dict,
-    db: Session = Depends(get_current_db)
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """
     Actualizar el análisis de una llamada. Watson puede usar esto para almacenar sus análisis.
     """
     try:
-        call = db.query(Call).filter(Call.call_id == call_id).first()
+        call = await db.get(Call, call_id)
         
         if not call:
             raise HTTPException(status_code=404, detail="Llamada no encontrada")
@@ -649,7 +632,7 @@ async def update_call_analysis(
         if "tema" in analysis:
             call.tema = analysis["tema"]
         
-        db.commit()
+        await db.commit()
         
         return {
             "message": "Análisis actualizado correctamente",
@@ -665,38 +648,55 @@ async def update_call_analysis(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error al actualizar análisis: {str(e)}")
 
 
 @router.get("/analytics/dashboard")
 async def get_analytics_dashboard(
-    db: Session = Depends(get_current_db)
+    date_from: date = Query(None, description="Fecha inicial (YYYY-MM-DD)"),
+    date_to: date = Query(None, description="Fecha final (YYYY-MM-DD)"),
+    db: AsyncSession = Depends(get_current_async_db)
 ):
     """
     Obtener métricas y analytics para Watson Orchestrate dashboard.
+    
+    Se responde desde los agregados diarios de `uanl.call_stats_daily`, que
+    mantienen los triggers de `uanl.calls`, en lugar de recorrer las llamadas.
     """
     try:
-        from sqlalchemy import func
+        criteria = [CallStatsDaily.call_count != 0]
+        if date_from:
+            criteria.append(CallStatsDaily.stat_date >= date_from)
+        if date_to:
+            criteria.append(CallStatsDaily.stat_date <= date_to)
         
-        # Estadísticas básicas
-        total_calls = db.query(Call).count()
-        calls_with_analysis = db.query(Call).filter(Call.sentimiento.isnot(None)).count()
+        # Totales por dimensión (total, sentimiento, urgencia, tema)
+        dimension_rows = (await db.execute(
+            select(
+                CallStatsDaily.dimension,
+                CallStatsDaily.value,
+                func.sum(CallStatsDaily.call_count)
+            ).where(*criteria).group_by(CallStatsDaily.dimension, CallStatsDaily.value)
+        )).all()
         
-        # Llamadas por sentimiento
-        sentiment_stats = db.query(Call.sentimiento, func.count(Call.call_id)).filter(
-            Call.sentimiento.isnot(None)
-        ).group_by(Call.sentimiento).all()
-        
-        # Llamadas por urgencia
-        urgency_stats = db.query(Call.urgencia, func.count(Call.call_id)).filter(
-            Call.urgencia.isnot(None)
-        ).group_by(Call.urgencia).all()
+        distributions: Dict[str, Dict[str, int]] = {}
+        for dimension, value, count in dimension_rows:
+            distributions.setdefault(dimension, {})[value] = int(count)
         
         # Llamadas por operador
-        operator_stats = db.query(Operator.name, func.count(Call.call_id)).join(
-            Call
-        ).group_by(Operator.name).all()
+        operator_stats = (await db.execute(
+            select(Operator.name, func.sum(CallStatsDaily.call_count)).join(
+                Operator, Operator.operator_id == CallStatsDaily.operator_id
+            ).where(
+                CallStatsDaily.dimension == "total", *criteria
+            ).group_by(Operator.name)
+        )).all()
+        
+        total_calls = sum(distributions.get("total", {}).values())
+        calls_with_analysis = sum(distributions.get("sentimiento", {}).values())
+        sentiment_stats = distributions.get("sentimiento", {}).items()
+        urgency_stats = distributions.get("urgencia", {}).items()
         
         return {
             "total_calls": total_calls,
@@ -704,7 +704,8 @@ async def get_analytics_dashboard(
             "analysis_coverage": round((calls_with_analysis / total_calls * 100), 2) if total_calls > 0 else 0,
             "sentiment_distribution": {sentiment: count for sentiment, count in sentiment_stats},
             "urgency_distribution": {urgency: count for urgency, count in urgency_stats},
-            "calls_by_operator": {operator: count for operator, count in operator_stats},
+            "calls_by_operator": {operator: int(count) for operator, count in operator_stats},
+            "topic_distribution": distributions.get("tema", {}),
             "source": "postgresql"
         }
         
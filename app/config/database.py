@@ -1,7 +1,12 @@
+"""Configuración de la aplicación"""
+import time
+from typing import Any, Dict, Optional
+
 from sqlalchemy import create_engine, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.config.settings import settings
 
 # Metadatos para el esquema
@@ -19,39 +24,142 @@ SessionLocal = None
 # Motor asíncrono (inicialización perezosa) 
 async_engine = None
 
-def initialize_database():
-    """Inicializar la base de datos solo cuando sea necesario"""
-    global engine, SessionLocal, async_engine
+# Fábrica de sesiones asíncronas (se construye una sola vez junto con el motor)
+AsyncSessionLocal = None
+
+
+class PoolWaitStats:
+    """Acumulador del tiempo de espera para obtener una conexión del pool"""
+    
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
     
-    if engine is None:
+    def record(self, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+
+
+class _WaitTimingMixin:
+    """Mide cuánto tarda cada checkout del pool (incluye la espera en cola)"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+    
+    def _do_get(self):
+        start = time.perf_counter()
         try:
-            engine = create_engine(
-                settings.database_url_sync,
-                pool_pre_ping=True,
-                pool_size=10,
-                max_overflow=20,
-                echo=settings.ENVIRONMENT == "development"
-            )
-            SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-            
-            async_engine = create_async_engine(
-                settings.database_url_async,
-                pool_pre_ping=True,
-                pool_size=10,
-                max_overflow=20,
-                echo=settings.ENVIRONMENT == "development"
-            )
-        except Exception as e:
-            print(f"Warning: No se pudo conectar a la base de datos: {e}")
-            # Para desarrollo sin BD, usar SQLite en memoria
-            engine = create_engine("sqlite:///./test.db", echo=True)
-            SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            return super()._do_get()
+        finally:
+            self.wait_stats.record(time.perf_counter() - start)
+
+
+class TimedQueuePool(_WaitTimingMixin, QueuePool):
+    """QueuePool con métricas de espera"""
+
+
+class TimedAsyncAdaptedQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool con métricas de espera"""
+
+
+def _pool_options() -> Dict[str, Any]:
+    """Opciones de pool configurables desde Settings"""
+    return {
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "echo": settings.ENVIRONMENT == "development"
+    }
+
+
+def initialize_database():
+    """Inicializar motores y fábricas de sesión una única vez"""
+    global engine, SessionLocal, async_engine, AsyncSessionLocal
+    
+    if engine is not None:
+        return
+    
+    try:
+        engine = create_engine(
+            settings.database_url_sync,
+            poolclass=TimedQueuePool,
+            **_pool_options()
+        )
+        async_engine = create_async_engine(
+            settings.database_url_async,
+            poolclass=TimedAsyncAdaptedQueuePool,
+            **_pool_options()
+        )
+    except Exception as e:
+        print(f"Warning: No se pudo conectar a la base de datos: {e}")
+        # Para desarrollo sin BD, usar SQLite en memoria
+        engine = create_engine("sqlite:///./test.db", echo=True)
+        async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", echo=True)
+    
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        expire_on_commit=False
+    )
+
+
+async def dispose_database():
+    """Cerrar los pools de conexiones (shutdown)"""
+    global engine, SessionLocal, async_engine, AsyncSessionLocal
+    
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
+    
+    engine = SessionLocal = async_engine = AsyncSessionLocal = None
+
+
+def _describe_pool(pool) -> Optional[Dict[str, Any]]:
+    """Estadísticas de un pool de conexiones"""
+    if not isinstance(pool, QueuePool):
+        return None
+    
+    stats = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow
+    }
+    
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        stats.update({
+            "checkouts": wait_stats.count,
+            "wait_avg_ms": round(
+                wait_stats.total_seconds / wait_stats.count * 1000, 3
+            ) if wait_stats.count else 0.0,
+            "wait_max_ms": round(wait_stats.max_seconds * 1000, 3)
+        })
+    
+    return stats
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Estadísticas de los pools síncrono y asíncrono"""
+    return {
+        "sync": _describe_pool(engine.pool) if engine is not None else None,
+        "async": _describe_pool(async_engine.sync_engine.pool) if async_engine is not None else None
+    }
+
 
 def get_db():
     """Dependencia para obtener sesión de base de datos síncrona"""
-    initialize_database()
     if SessionLocal is None:
-        raise RuntimeError("Base de datos no inicializada")
+        initialize_database()
     
     db = SessionLocal()
     try:
@@ -60,17 +168,15 @@ def get_db():
         db.close()
 
 
+def get_async_session_factory() -> async_sessionmaker:
+    """Fábrica de sesiones asíncronas para tareas fuera de una solicitud HTTP"""
+    if AsyncSessionLocal is None:
+        initialize_database()
+    
+    return AsyncSessionLocal
+
+
 async def get_async_db():
     """Dependencia para obtener sesión de base de datos asíncrona"""
-    initialize_database()
-    if async_engine is None:
-        raise RuntimeError("Motor asíncrono no inicializado")
-        
-    AsyncSessionLocal = sessionmaker(
-        async_engine, 
-        class_=AsyncSession, 
-        expire_on_commit=False
-    )
-    
-    async with AsyncSessionLocal() as session:
+    async with get_async_session_factory()() as session:
         yield session
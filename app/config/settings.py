@@ -24,6 +24,11 @@ class Settings(BaseSettings):
     DATABASE_NAME: str = "uanl_db"
     DATABASE_USER: str
     DATABASE_PASSWORD: str
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT: int = 30  # segundos esperando una conexión libre
+    DATABASE_POOL_RECYCLE: int = 1800  # segundos antes de reciclar una conexión
+    DATABASE_POOL_PRE_PING: bool = True
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -32,6 +37,72 @@ class Settings(BaseSettings):
     WATSON_API_KEY: Optional[str] = None
     WATSON_URL: Optional[str] = None
     WATSON_VERSION: str = "2023-09-01"
+    WATSON_IDEMPOTENCY_TTL_SECONDS: int = 600  # ventana en la que un reintento del webhook repite la respuesta
+    WATSON_IDEMPOTENCY_MAX_SIZE: int = 10000
+    WATSON_IDEMPOTENCY_REDIS_ENABLED: bool = False  # compartir respuestas entre instancias
+    WATSON_ACTIVITY_BUFFER_SIZE: int = 10000  # registros de bitácora en memoria antes de aplicar backpressure
+    WATSON_ACTIVITY_BATCH_SIZE: int = 500  # filas por INSERT
+    WATSON_ACTIVITY_FLUSH_MS: int = 500
+    WATSON_ACTIVITY_ENQUEUE_TIMEOUT_MS: int = 100  # espera con el buffer lleno antes de descartar
+    
+    # Cliente HTTP saliente compartido (Watson y otros servicios externos)
+    OUTBOUND_HTTP_TIMEOUT_SECONDS: float = 10.0
+    OUTBOUND_HTTP_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    OUTBOUND_HTTP_MAX_CONNECTIONS: int = 100
+    OUTBOUND_HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    OUTBOUND_HTTP_KEEPALIVE_SECONDS: float = 30.0
+    OUTBOUND_HTTP2_ENABLED: bool = True  # solo si está instalado h2
+    OUTBOUND_CIRCUIT_FAILURE_THRESHOLD: int = 5  # fallos seguidos que abren el circuito del host
+    OUTBOUND_CIRCUIT_RESET_SECONDS: float = 30.0
+    
+    # Conversation analysis
+    ANALYSIS_MAX_WORKERS: int = 4  # 0 = analizar en el proceso actual
+    ANALYSIS_CHUNK_SIZE: int = 50  # conversaciones por tarea del pool
+    ANALYSIS_BATCH_SIZE: int = 500  # filas por lote/commit en análisis masivos
+    ANALYSIS_CACHE_MAX_SIZE: int = 10000
+    ANALYSIS_CACHE_TTL_SECONDS: int = 3600
+    ANALYSIS_CACHE_REDIS_ENABLED: bool = False
+    ANALYZER_ENABLED: bool = True  # análisis incremental en segundo plano
+    ANALYZER_INTERVAL_SECONDS: int = 30
+    ANALYZER_BATCH_SIZE: int = 500
+    ANALYZER_MAX_BATCHES_PER_RUN: int = 20
+    ANALYZER_BACKFILL_JOBS_KEPT: int = 100  # trabajos de análisis por rango terminados que se siguen consultando
+    
+    # Tickets
+    TICKET_STATS_CACHE_TTL_SECONDS: int = 30
+    
+    # Respuestas JSON con orjson (si está instalado); False = JSONResponse estándar
+    FAST_JSON_RESPONSES: bool = True
+    
+    # Dashboards (caché de respuestas)
+    DASHBOARD_CACHE_TTL_SECONDS: int = 10
+    DASHBOARD_REALTIME_CACHE_TTL_SECONDS: int = 2
+    DASHBOARD_CACHE_STALE_SECONDS: int = 60
+    DASHBOARD_STREAM_INTERVAL_SECONDS: int = 2  # tick del productor SSE/WebSocket
+    DASHBOARD_STREAM_HEARTBEAT_SECONDS: int = 15
+    
+    # Reportes en segundo plano
+    REPORTS_DIR: str = "reports"  # compartido entre instancias si hay más de una
+    REPORT_WORKERS: int = 2
+    REPORT_POLL_INTERVAL_SECONDS: int = 5
+    REPORT_DEDUP_WINDOW_SECONDS: int = 600  # reutilizar reportes idénticos recientes
+    REPORT_JOB_TIMEOUT_SECONDS: int = 3600  # reintentar trabajos abandonados en 'generating'
+    
+    # Carga masiva de llamadas
+    CALL_INGEST_BATCH_SIZE: int = 5000  # filas por COPY (y por commit)
+    CALL_INGEST_MAX_REJECTS_REPORTED: int = 1000
+    
+    # Outbox de notificaciones
+    NOTIFICATION_BATCH_SIZE: int = 50  # notificaciones tomadas por vuelta del dispatcher
+    NOTIFICATION_POLL_INTERVAL_SECONDS: int = 5
+    NOTIFICATION_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_RETRY_BASE_SECONDS: int = 30  # backoff exponencial: 30s, 60s, 120s...
+    NOTIFICATION_RETRY_MAX_SECONDS: int = 3600
+    NOTIFICATION_LEASE_SECONDS: int = 300  # reintentar envíos abandonados en 'sending'
+    
+    # Caché external_ref -> client_id
+    CLIENT_ID_CACHE_SIZE: int = 10000
+    CLIENT_ID_CACHE_TTL_SECONDS: int = 3600
     
     # Email Settings
     SMTP_SERVER: str = "smtp.gmail.com"
@@ -39,6 +110,13 @@ class Settings(BaseSettings):
     SMTP_USER: Optional[str] = None
     SMTP_PASSWORD: Optional[str] = None
     EMAIL_FROM: Optional[str] = None
+    SMTP_START_TLS: bool = True
+    SMTP_TIMEOUT_SECONDS: int = 30
+    SMTP_POOL_SIZE: int = 5  # conexiones SMTP simultáneas (también tope de envíos masivos en paralelo)
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_IDLE_TIMEOUT_SECONDS: int = 60
+    EMAIL_TEMPLATES_DIR: str = str(Path(__file__).resolve().parent.parent / "templates" / "email")
+    EMAIL_TEMPLATE_BYTECODE_DIR: Optional[str] = None  # None = directorio temporal de jinja2
     
     # Environment
     ENVIRONMENT: str = "development"
@@ -0,0 +1,297 @@
+"""Cachés en memoria (LRU + TTL) y nivel opcional en Redis"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from loguru import logger
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis es opcional
+    aioredis = None
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Caché LRU en memoria con expiración por TTL y contadores de uso"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Obtener un valor vigente (lo marca como usado recientemente)"""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Guardar un valor, desalojando el menos usado si se excede el tamaño"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+    
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+    
+    def clear(self):
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de aciertos/fallos del caché"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class RedisCache:
+    """Nivel de caché en Redis con valores JSON; si Redis falla se omite"""
+    
+    def __init__(self, url: str, prefix: str, ttl: Optional[int] = None):
+        self.url = url
+        self.prefix = prefix
+        self.ttl = ttl
+        self._client = None
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+    
+    @property
+    def available(self) -> bool:
+        return aioredis is not None
+    
+    def _get_client(self):
+        if self._client is None:
+            self._client = aioredis.from_url(self.url)
+        return self._client
+    
+    async def get(self, key: str) -> Any:
+        try:
+            raw = await self._get_client().get(f"{self.prefix}:{key}")
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis no disponible para caché {self.prefix}: {str(e)}")
+            return None
+        
+        if raw is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return json.loads(raw)
+    
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            await self._get_client().set(
+                f"{self.prefix}:{key}",
+                json.dumps(value, default=str, ensure_ascii=False),
+                ex=ttl or None
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis no disponible para caché {self.prefix}: {str(e)}")
+    
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors
+        }
+
+
+class TieredCache:
+    """Caché de dos niveles: memoria local y, opcionalmente, Redis compartido"""
+    
+    def __init__(self, memory: TTLCache, redis_cache: Optional[RedisCache] = None):
+        self.memory = memory
+        self.redis = redis_cache if redis_cache is not None and redis_cache.available else None
+    
+    async def get(self, key: str) -> Any:
+        value = self.memory.get(key)
+        if value is not None or self.redis is None:
+            return value
+        
+        value = await self.redis.get(key)
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+    
+    async def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.redis is not None:
+            await self.redis.set(key, value)
+    
+    async def close(self):
+        if self.redis is not None:
+            await self.redis.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "redis": self.redis.stats() if self.redis is not None else None
+        }
+
+
+class StaleWhileRevalidateCache:
+    """
+    Caché de respuestas con TTL, stale-while-revalidate y coalescencia
+    
+    - Dentro del TTL se responde desde memoria.
+    - Vencido el TTL pero dentro de `stale_ttl` se responde el valor viejo y se
+      lanza una sola recarga en segundo plano.
+    - Sin valor utilizable, todas las solicitudes concurrentes de la misma
+      llave esperan la misma carga en lugar de consultar cada una.
+    
+    Los loaders pueden terminar después de la solicitud que los lanzó, así que
+    deben abrir sus propios recursos (p. ej. su propia sesión de base de datos).
+    """
+    
+    def __init__(self, ttl: float, stale_ttl: float = 0, maxsize: int = 256):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.load_errors = 0
+    
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None
+    ) -> Any:
+        """Obtener el valor de la llave, cargándolo con `loader` si hace falta"""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        
+        if entry is not None:
+            fresh_until, stale_until, value = entry
+            if now < fresh_until:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            if now < stale_until:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                self._start_load(key, loader, ttl, stale_ttl)
+                return value
+        
+        self.misses += 1
+        # shield: si el cliente se desconecta no se cancela la carga compartida
+        return await asyncio.shield(self._start_load(key, loader, ttl, stale_ttl))
+    
+    def _start_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float],
+        stale_ttl: Optional[float]
+    ) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader, ttl, stale_ttl))
+            task.add_done_callback(self._log_failure)
+            self._inflight[key] = task
+        return task
+    
+    async def _load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float],
+        stale_ttl: Optional[float]
+    ) -> Any:
+        try:
+            self.loads += 1
+            value = await loader()
+            
+            ttl = self.ttl if ttl is None else ttl
+            stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+            loaded_at = time.monotonic()
+            self._entries[key] = (loaded_at + ttl, loaded_at + ttl + stale_ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+    
+    def _log_failure(self, task: asyncio.Task):
+        # Recuperar la excepción evita "Task exception was never retrieved" en recargas de fondo
+        if task.cancelled() or task.exception() is None:
+            return
+        self.load_errors += 1
+        logger.warning(f"Error recargando caché de respuestas: {task.exception()}")
+    
+    def last_value(self, key: Hashable) -> Optional[Any]:
+        """Último valor cargado de la llave aunque ya esté vencido (respaldo si la recarga falla)"""
+        entry = self._entries.get(key)
+        return entry[2] if entry is not None else None
+    
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Descartar una llave (o todas)"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "in_flight": len(self._inflight),
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,254 @@
+"""
+🌐 Cliente HTTP saliente compartido (Watson y otros servicios externos)
+
+Un solo `httpx.AsyncClient` para toda la app, creado en el `lifespan`: las
+conexiones se reutilizan (keep-alive, HTTP/2 si está instalado `h2`) en
+lugar de pagar TCP+TLS en cada llamada. Por host se limita la concurrencia,
+se mide la latencia y un circuit breaker corta las llamadas a un servicio
+caído durante un tiempo en lugar de acumular timeouts.
+"""
+import asyncio
+import bisect
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+from app.config.settings import settings
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # pragma: no cover - h2 es opcional
+    h2 = None
+
+
+# Límites superiores (ms) de las cubetas del histograma de latencia
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class CircuitOpenError(Exception):
+    """El circuito del host está abierto: la llamada no se intenta"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por conteo de fallos consecutivos
+    
+    - closed: las llamadas pasan; `failure_threshold` fallos seguidos lo abren.
+    - open: las llamadas fallan de inmediato durante `reset_timeout`.
+    - half_open: pasa una sola llamada de prueba; si funciona se cierra y si
+      falla se vuelve a abrir.
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.short_circuited = 0
+        self._probe_in_flight = False
+    
+    def before_call(self):
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.short_circuited += 1
+                raise CircuitOpenError("circuito abierto")
+            self.state = "half_open"
+        
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                self.short_circuited += 1
+                raise CircuitOpenError("circuito en prueba")
+            self._probe_in_flight = True
+    
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+    
+    def release_probe(self):
+        """La llamada de prueba terminó sin resultado atribuible al host (p. ej. cancelada)"""
+        self._probe_in_flight = False
+    
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "short_circuited": self.short_circuited
+        }
+
+
+class LatencyHistogram:
+    """Histograma de latencias por cubetas fijas (percentiles aproximados)"""
+    
+    def __init__(self, buckets_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        # Una cubeta extra para lo que excede el último límite
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+    
+    def observe(self, seconds: float):
+        elapsed_ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.buckets_ms, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+    
+    def percentile(self, quantile: float) -> Optional[float]:
+        """Límite superior de la cubeta que contiene el percentil (None = más que el último límite)"""
+        if not self.count:
+            return None
+        target = quantile * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return self.buckets_ms[index] if index < len(self.buckets_ms) else None
+        return None
+    
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in self.buckets_ms] + ["inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
+class _HostState:
+    """Límite de concurrencia, breaker y latencias de un host"""
+    
+    def __init__(self, max_connections: int, failure_threshold: int, reset_timeout: float):
+        self.slots = asyncio.Semaphore(max_connections)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0
+
+
+class OutboundHTTPClient:
+    """Cliente HTTP compartido con pool de conexiones, breaker y métricas por host"""
+    
+    def __init__(
+        self,
+        timeout: float = 10,
+        connect_timeout: float = 3,
+        max_connections: int = 100,
+        max_connections_per_host: int = 20,
+        keepalive_expiry: float = 30,
+        http2: bool = True,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30
+    ):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.max_connections_per_host = max_connections_per_host
+        self.http2 = http2 and h2 is not None
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._hosts: Dict[str, _HostState] = {}
+    
+    def start(self):
+        """Crear el cliente (startup); idempotente"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, http2=self.http2)
+            logger.info(f"🌐 Cliente HTTP saliente listo (HTTP/2: {'sí' if self.http2 else 'no'})")
+        return self._client
+    
+    async def close(self):
+        """Cerrar las conexiones abiertas (shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _host_state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(self.max_connections_per_host, self.failure_threshold, self.reset_timeout)
+            self._hosts[host] = state
+        return state
+    
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Hacer una solicitud por el pool compartido
+        
+        Errores de transporte, timeouts y respuestas 5xx cuentan como fallo del
+        host; con el circuito abierto se lanza `CircuitOpenError` sin llamar.
+        """
+        client = self._client or self.start()
+        state = self._host_state(httpx.URL(url).host)
+        state.breaker.before_call()
+        
+        async with state.slots:
+            started = time.perf_counter()
+            state.requests += 1
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                state.errors += 1
+                state.breaker.record_failure()
+                raise
+            except BaseException:
+                # Cancelación u otro error ajeno al host: liberar la prueba del breaker
+                state.breaker.release_probe()
+                raise
+            finally:
+                state.latency.observe(time.perf_counter() - started)
+        
+        if response.status_code >= 500:
+            state.errors += 1
+            state.breaker.record_failure()
+        else:
+            state.breaker.record_success()
+        return response
+    
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+    
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "started": self._client is not None,
+            "http2": self.http2,
+            "hosts": {
+                host: {
+                    "requests": state.requests,
+                    "errors": state.errors,
+                    "circuit": state.breaker.stats(),
+                    "latency": state.latency.snapshot()
+                }
+                for host, state in self._hosts.items()
+            }
+        }
+
+
+# Instancia compartida (se abre y cierra en el ciclo de vida de la app)
+outbound_http = OutboundHTTPClient(
+    timeout=settings.OUTBOUND_HTTP_TIMEOUT_SECONDS,
+    connect_timeout=settings.OUTBOUND_HTTP_CONNECT_TIMEOUT_SECONDS,
+    max_connections=settings.OUTBOUND_HTTP_MAX_CONNECTIONS,
+    max_connections_per_host=settings.OUTBOUND_HTTP_MAX_CONNECTIONS_PER_HOST,
+    keepalive_expiry=settings.OUTBOUND_HTTP_KEEPALIVE_SECONDS,
+    http2=settings.OUTBOUND_HTTP2_ENABLED,
+    failure_threshold=settings.OUTBOUND_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.OUTBOUND_CIRCUIT_RESET_SECONDS
+)
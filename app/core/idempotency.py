@@ -0,0 +1,99 @@
+"""Ejecución idempotente de operaciones con respuesta repetible (reintentos de webhooks)"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from app.core.cache import TieredCache
+
+
+def request_fingerprint(*parts: Any) -> str:
+    """sha256 del JSON canónico de las partes que identifican una solicitud"""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class IdempotencyCache:
+    """
+    Respuestas guardadas por llave de idempotencia con deduplicación en vuelo
+    
+    - Una llave ya resuelta dentro de la ventana regresa la respuesta guardada
+      sin volver a ejecutar la operación.
+    - Duplicados simultáneos esperan a la primera ejecución en lugar de
+      correr en paralelo; si esa falla, uno de ellos vuelve a intentar.
+    - Solo se guardan las respuestas que `should_store` acepta (un error no
+      debe repetirse en el reintento).
+    
+    La deduplicación en vuelo es por proceso; con Redis las respuestas
+    terminadas se comparten entre instancias.
+    """
+    
+    def __init__(
+        self,
+        responses: TieredCache,
+        should_store: Callable[[Any], bool] = lambda response: True
+    ):
+        self.responses = responses
+        self.should_store = should_store
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.executions = 0
+        self.replays = 0
+        self.coalesced = 0
+    
+    async def run(self, key: str, operation: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Ejecutar `operation` una vez por llave; regresa (respuesta, repetida)"""
+        while True:
+            stored = await self.responses.get(key)
+            if stored is not None:
+                self.replays += 1
+                return stored, True
+            
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            
+            self.coalesced += 1
+            try:
+                # shield: si este duplicado se cancela no cancela la ejecución original
+                return await asyncio.shield(pending), True
+            except BaseException:
+                if pending.done() and (pending.cancelled() or pending.exception() is not None):
+                    continue
+                raise
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.executions += 1
+        try:
+            response = await operation()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Marcar la excepción como leída aunque nadie esté esperando
+                future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        
+        if self.should_store(response):
+            await self.responses.set(key, response)
+            future.set_result(response)
+        else:
+            # Los duplicados que esperaban vuelven a ejecutar en lugar de copiar el error
+            future.set_exception(RuntimeError("respuesta no almacenable"))
+            future.exception()
+        return response, False
+    
+    async def close(self):
+        await self.responses.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "executions": self.executions,
+            "replays": self.replays,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "responses": self.responses.stats()
+        }
@@ -0,0 +1,63 @@
+"""
+Codec JSON de la API (orjson, con respaldo en la librería estándar)
+
+orjson serializa a bytes de forma nativa `datetime`, `date`, `Enum`, `UUID`
+y dataclasses; `Decimal`, conjuntos y modelos Pydantic pasan por
+`_default` con las mismas reglas que `jsonable_encoder`.
+"""
+import json
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Tipos que orjson no conoce (y cualquiera que el stdlib no conozca)"""
+    if isinstance(value, Decimal):
+        # Igual que FastAPI: sin decimales → int, con decimales → float
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def dumps(data: Any) -> bytes:
+        """Serializar a JSON UTF-8 compacto"""
+        return orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+    
+    loads = orjson.loads
+else:
+    def dumps(data: Any) -> bytes:
+        """Serializar a JSON UTF-8 compacto"""
+        return json.dumps(
+            data, default=_default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+    
+    loads = json.loads
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse renderizada con orjson
+    
+    Como clase por defecto de la app acelera el render de todas las
+    respuestas; un endpoint pesado sin `response_model` puede además
+    devolverla directamente para saltarse `jsonable_encoder`.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,132 @@
+"""Pool de conexiones SMTP asíncronas (aiosmtplib) autenticadas y reutilizables"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.message import Message
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+import aiosmtplib
+from loguru import logger
+
+
+class _PooledConnection:
+    """Conexión abierta con sus contadores de uso"""
+    
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    Conexiones SMTP reutilizables con tope de conexiones simultáneas
+    
+    El handshake (conexión, STARTTLS y AUTH) se paga una vez por conexión y
+    no una vez por mensaje. Las conexiones inactivas por más de
+    `idle_timeout` o con `max_messages_per_connection` envíos se reciclan
+    (muchos servidores las cierran por su cuenta).
+    """
+    
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: bool = True,
+        size: int = 5,
+        timeout: float = 30,
+        max_messages_per_connection: int = 100,
+        idle_timeout: float = 60
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.size = size
+        self.timeout = timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self.idle_timeout = idle_timeout
+        self._idle: List[_PooledConnection] = []
+        self._slots = asyncio.Semaphore(size)
+        self.connections_opened = 0
+        self.messages_sent = 0
+    
+    async def _open(self) -> _PooledConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            timeout=self.timeout,
+            start_tls=self.start_tls
+        )
+        await smtp.connect()
+        if self.username:
+            await smtp.login(self.username, self.password or "")
+        self.connections_opened += 1
+        return _PooledConnection(smtp)
+    
+    async def _discard(self, connection: _PooledConnection):
+        try:
+            if connection.smtp.is_connected:
+                await connection.smtp.quit()
+        except Exception:
+            connection.smtp.close()
+    
+    def _is_reusable(self, connection: _PooledConnection) -> bool:
+        return (
+            connection.smtp.is_connected
+            and connection.messages_sent < self.max_messages_per_connection
+            and time.monotonic() - connection.last_used < self.idle_timeout
+        )
+    
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[_PooledConnection]:
+        """Tomar una conexión del pool (espera si ya hay `size` en uso)"""
+        async with self._slots:
+            connection = None
+            while self._idle and connection is None:
+                candidate = self._idle.pop()
+                if self._is_reusable(candidate):
+                    connection = candidate
+                else:
+                    await self._discard(candidate)
+            if connection is None:
+                connection = await self._open()
+            
+            try:
+                yield connection
+            except BaseException:
+                # Estado de la sesión SMTP desconocido: no se devuelve al pool
+                await self._discard(connection)
+                raise
+            connection.last_used = time.monotonic()
+            self._idle.append(connection)
+    
+    async def send_message(self, message: Message, recipients: Sequence[str]):
+        """Enviar un mensaje; si la conexión reutilizada estaba muerta se reintenta una vez con una nueva"""
+        for attempt in (1, 2):
+            try:
+                async with self.connection() as connection:
+                    await connection.smtp.send_message(message, recipients=list(recipients))
+                    connection.messages_sent += 1
+                    self.messages_sent += 1
+                    return
+            except aiosmtplib.SMTPServerDisconnected:
+                if attempt == 2:
+                    raise
+                logger.debug("Conexión SMTP cerrada por el servidor, reintentando")
+    
+    async def close(self):
+        """Cerrar las conexiones inactivas (shutdown)"""
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(self._discard(connection) for connection in idle), return_exceptions=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "connections_opened": self.connections_opened,
+            "messages_sent": self.messages_sent
+        }
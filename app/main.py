@@ -1,4 +1,5 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
@@ -6,9 +7,20 @@ import uvicorn
 from loguru import logger
 
 from app.config.settings import settings
-from app.config.database import initialize_database
+from app.config.database import initialize_database, dispose_database, get_pool_stats
 from app.api.v1.router import api_router
+from app.services.conversation_analysis_service import conversation_analysis_service
+from app.services.background_analyzer import background_call_analyzer
+from app.services.realtime_broadcaster import real_time_broadcaster
+from app.services.report_jobs import report_job_engine
+from app.services.email_service import email_service
+from app.services.email_templates import email_template_registry
+from app.services.notification_outbox import notification_outbox
+from app.services.watson_service import webhook_idempotency
+from app.services.activity_writer import activity_writer
 from app.core.exceptions import custom_http_exception_handler
+from app.core.http_client import outbound_http
+from app.core.serialization import FastJSONResponse
 
 
 @asynccontextmanager
@@ -17,9 +29,26 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Iniciando UANL Automation API")
     initialize_database()
+    email_template_registry.load()
+    outbound_http.start()
+    if settings.ANALYZER_ENABLED:
+        background_call_analyzer.start()
+    report_job_engine.start()
+    notification_outbox.start()
+    activity_writer.start()
     yield
     # Shutdown
     logger.info("🛑 Cerrando UANL Automation API")
+    await real_time_broadcaster.stop()
+    await report_job_engine.stop()
+    await notification_outbox.stop()
+    await background_call_analyzer.stop()
+    await conversation_analysis_service.close()
+    await email_service.close()
+    await webhook_idempotency.close()
+    await activity_writer.stop()
+    await outbound_http.close()
+    await dispose_database()
 
 
 def create_application() -> FastAPI:
@@ -32,6 +61,7 @@ def create_application() -> FastAPI:
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
         docs_url=f"{settings.API_V1_STR}/docs",
         redoc_url=f"{settings.API_V1_STR}/redoc",
+        default_response_class=FastJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse,
         lifespan=lifespan
     )
 
@@ -70,6 +100,16 @@ def create_application() -> FastAPI:
         """Health check endpoint"""
         return {"status": "healthy", "version": settings.PROJECT_VERSION}
 
+    @app.get("/health/db")
+    async def database_pool_status():
+        """Estadísticas del pool de conexiones a la base de datos"""
+        return {"status": "healthy", "pools": get_pool_stats()}
+
+    @app.get("/health/outbound")
+    async def outbound_http_status():
+        """Latencias, errores y circuit breaker de las llamadas salientes por host"""
+        return {"status": "healthy", "outbound": outbound_http.stats()}
+
     return app
 
 
@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey, BigInteger
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, BigInteger
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from app.config.database import Base
 
 
@@ -21,6 +23,7 @@ class Call(Base):
         nullable=False
     )
     call_date = Column(Date, nullable=False)
+    duration_seconds = Column(Integer, nullable=True)
     conversation = Column(Text, nullable=True)
     
     # Campos adicionales para análisis de Watson
@@ -35,3 +38,43 @@ class Call(Base):
     
     def __repr__(self):
         return f"<Call(call_id={self.call_id}, call_date='{self.call_date}', tema='{self.tema}')>"
+
+
+class CallAnalysis(Base):
+    """Modelo para el análisis completo de una llamada (entidades, recomendaciones, resumen)"""
+    __tablename__ = "call_analyses"
+    __table_args__ = {'schema': 'uanl'}
+    
+    call_id = Column(
+        BigInteger,
+        ForeignKey("uanl.calls.call_id", onupdate="CASCADE", ondelete="CASCADE"),
+        primary_key=True
+    )
+    rules_version = Column(Text, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    analysis = Column(JSONB, nullable=False)
+    analyzed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<CallAnalysis(call_id={self.call_id}, rules_version='{self.rules_version}')>"
+
+
+class CallStatsDaily(Base):
+    """
+    Conteo diario de llamadas por operador y dimensión
+    
+    Solo lectura desde la app: la mantienen los triggers de `uanl.calls`
+    (ver scripts/init.sql). dimension = 'total' (value vacío), 'sentimiento',
+    'urgencia' o 'tema'.
+    """
+    __tablename__ = "call_stats_daily"
+    __table_args__ = {'schema': 'uanl'}
+    
+    stat_date = Column(Date, primary_key=True)
+    operator_id = Column(Integer, primary_key=True)
+    dimension = Column(Text, primary_key=True)
+    value = Column(Text, primary_key=True)
+    call_count = Column(BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<CallStatsDaily(stat_date='{self.stat_date}', operator_id={self.operator_id}, {self.dimension}='{self.value}', call_count={self.call_count})>"
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, BigInteger, Text, DateTime
+from sqlalchemy.sql import func
+from app.config.database import Base
+
+
+class ProcessingCheckpoint(Base):
+    """Marca de agua (último ID procesado) de un proceso en segundo plano"""
+    __tablename__ = "processing_checkpoints"
+    __table_args__ = {'schema': 'uanl'}
+    
+    name = Column(Text, primary_key=True)
+    last_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<ProcessingCheckpoint(name='{self.name}', last_id={self.last_id})>"
@@ -10,6 +10,7 @@ class Client(Base):
     
     client_id = Column(Integer, primary_key=True, index=True)
     external_ref = Column(VARCHAR(64), nullable=False, unique=True, index=True)
+    email = Column(String(255), nullable=True)
     
     # Relación con llamadas
     calls = relationship("Call", back_populates="client")
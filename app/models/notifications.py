@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.config.database import Base
+
+
+class Notification(Base):
+    """Modelo para notificaciones pendientes de envío (outbox)"""
+    __tablename__ = "notifications"
+    __table_args__ = {'schema': 'uanl'}
+    
+    notification_id = Column(Integer, primary_key=True, index=True)
+    recipient_type = Column(String(50), nullable=False)  # client, operator, admin
+    recipient_id = Column(Integer, nullable=False)
+    notification_type = Column(String(100), nullable=False)  # email, sms, push
+    title = Column(String(255), nullable=False)
+    message = Column(Text, nullable=False)
+    status = Column(String(50), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<Notification(notification_id={self.notification_id}, recipient_type='{self.recipient_type}', status='{self.status}')>"
@@ -10,6 +10,7 @@ class Operator(Base):
     
     operator_id = Column(Integer, primary_key=True, index=True)
     name = Column(Text, nullable=False, unique=True, index=True)
+    email = Column(String(255), nullable=True)
     
     # Relación con llamadas
     calls = relationship("Call", back_populates="operator")
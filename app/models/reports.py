@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.config.database import Base
+
+
+class Report(Base):
+    """Modelo para reportes generados en segundo plano (trabajos de exportación)"""
+    __tablename__ = "reports"
+    __table_args__ = {'schema': 'uanl'}
+    
+    report_id = Column(Integer, primary_key=True, index=True)
+    report_type = Column(String(100), nullable=False)
+    report_name = Column(String(255), nullable=False)
+    parameters = Column(Text, nullable=True)  # JSON canónico con tipo, formato y filtros
+    parameters_hash = Column(String(64), nullable=True, index=True)  # sha256 de `parameters`
+    file_path = Column(String(500), nullable=True)
+    file_format = Column(String(10), nullable=True)
+    generated_by = Column(
+        Integer,
+        ForeignKey("uanl.operators.operator_id", onupdate="CASCADE", ondelete="SET NULL"),
+        nullable=True
+    )
+    status = Column(String(50), nullable=False, default="queued")  # queued, generating, completed, failed
+    row_count = Column(Integer, nullable=True)
+    error_message = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self):
+        return f"<Report(report_id={self.report_id}, report_type='{self.report_type}', status='{self.status}')>"
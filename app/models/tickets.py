@@ -21,6 +21,11 @@ class TicketPriority(PyEnum):
     URGENT = "urgent"
 
 
+def _enum_values(enum_class) -> list:
+    """Persistir el valor de cada miembro ('open') en lugar del nombre ('OPEN')"""
+    return [member.value for member in enum_class]
+
+
 class Ticket(Base):
     """Modelo para tickets generados automáticamente"""
     __tablename__ = "tickets"
@@ -28,8 +33,17 @@ class Ticket(Base):
     ticket_id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
-    status = Column(Enum(TicketStatus), default=TicketStatus.OPEN, nullable=False)
-    priority = Column(Enum(TicketPriority), default=TicketPriority.MEDIUM, nullable=False)
+    # VARCHAR con los valores en minúsculas, igual que scripts/init.sql
+    status = Column(
+        Enum(TicketStatus, native_enum=False, length=50, values_callable=_enum_values),
+        default=TicketStatus.OPEN,
+        nullable=False
+    )
+    priority = Column(
+        Enum(TicketPriority, native_enum=False, length=50, values_callable=_enum_values),
+        default=TicketPriority.MEDIUM,
+        nullable=False
+    )
     
     # Relación con llamada que generó el ticket
     call_id = Column(
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.config.database import Base
+
+
+class WatsonActivity(Base):
+    """Modelo para la bitácora de interacciones del webhook de Watson"""
+    __tablename__ = "watson_activities"
+    __table_args__ = {'schema': 'uanl'}
+    
+    activity_id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String(255), nullable=False, index=True)
+    client_id = Column(
+        Integer,
+        ForeignKey("uanl.clients.client_id", onupdate="CASCADE", ondelete="SET NULL"),
+        nullable=True
+    )
+    user_input = Column(Text, nullable=True)
+    bot_response = Column(Text, nullable=True)
+    action_taken = Column(String(100), nullable=True)
+    context_data = Column(Text, nullable=True)  # JSON
+    metadata_json = Column("metadata", Text, nullable=True)  # JSON (`metadata` está reservado en los modelos)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<WatsonActivity(activity_id={self.activity_id}, session_id='{self.session_id}', action_taken='{self.action_taken}')>"
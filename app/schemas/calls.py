@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from typing import Optional, List
 from datetime import date
 
@@ -47,9 +47,9 @@ class CallWithDetails(CallResponse):
 class CallList(BaseModel):
     """Esquema para lista de llamadas"""
     calls: List[CallWithDetails]
-    total: int
-    page: int
-    page_size: int
+    total: Optional[int] = None
+    limit: int
+    next_cursor: Optional[str] = None
 
 
 class CallAnalytics(BaseModel):
@@ -61,3 +61,44 @@ class CallAnalytics(BaseModel):
     calls_by_impact: dict
     calls_by_date: dict
     average_conversation_length: Optional[float] = None
+
+
+class CallIngestRow(BaseModel):
+    """Fila de carga masiva: operador y cliente por id o por nombre/referencia externa"""
+    call_label: Optional[str] = None
+    operator_id: Optional[int] = None
+    operator_name: Optional[str] = None
+    client_id: Optional[int] = None
+    client_external_ref: Optional[str] = Field(None, max_length=64)
+    call_date: date
+    duration_seconds: Optional[int] = Field(None, ge=0)
+    conversation: Optional[str] = None
+    sentimiento: Optional[str] = None
+    impacto: Optional[str] = None
+    urgencia: Optional[str] = None
+    tema: Optional[str] = None
+    
+    @model_validator(mode="after")
+    def check_references(self) -> "CallIngestRow":
+        if self.operator_id is None and not self.operator_name:
+            raise ValueError("Se requiere operator_id u operator_name")
+        if self.client_id is None and not self.client_external_ref:
+            raise ValueError("Se requiere client_id o client_external_ref")
+        return self
+
+
+class CallIngestReject(BaseModel):
+    """Fila rechazada en una carga masiva"""
+    line: int
+    error: str
+
+
+class CallIngestResult(BaseModel):
+    """Resultado de una carga masiva de llamadas"""
+    received: int
+    inserted: int
+    rejected: int
+    rejects: List[CallIngestReject]
+    rejects_truncated: bool = False
+    seconds: float
+    rows_per_second: float
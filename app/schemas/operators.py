@@ -25,8 +25,8 @@ class OperatorResponse(OperatorBase):
 
 
 class OperatorList(BaseModel):
-    """Esquema para lista de operadores"""
+    """Esquema para lista de operadores (paginada por cursor)"""
     operators: List[OperatorResponse]
-    total: int
-    page: int
-    page_size: int
+    total: Optional[int] = None
+    limit: int
+    next_cursor: Optional[str] = None
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, Literal
+from datetime import date, datetime
+
+
+class ReportJobCreate(BaseModel):
+    """Esquema para solicitar la generación de un reporte en segundo plano"""
+    report_type: Literal["calls", "tickets"]
+    format: Literal["csv", "xlsx"] = "csv"
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    operator_id: Optional[int] = None
+    client_id: Optional[int] = None
+    status: Optional[Literal["open", "in_progress", "resolved", "closed"]] = None
+    priority: Optional[Literal["low", "medium", "high", "urgent"]] = None
+    generated_by: Optional[int] = Field(None, description="Operador que solicita el reporte")
+
+
+class ReportJobResponse(BaseModel):
+    """Esquema de respuesta para un trabajo de reporte"""
+    report_id: int
+    report_type: str
+    report_name: str
+    file_format: Optional[str] = None
+    status: str
+    row_count: Optional[int] = None
+    error_message: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    deduplicated: bool = False
+    download_url: Optional[str] = None
+    
+    model_config = ConfigDict(from_attributes=True)
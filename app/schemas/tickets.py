@@ -69,9 +69,9 @@ class TicketWithDetails(TicketResponse):
 class TicketList(BaseModel):
     """Esquema para lista de tickets"""
     tickets: List[TicketWithDetails]
-    total: int
-    page: int
-    page_size: int
+    total: Optional[int] = None
+    limit: int
+    next_cursor: Optional[str] = None
 
 
 class TicketStats(BaseModel):
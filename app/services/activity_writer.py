@@ -0,0 +1,170 @@
+"""
+📝 Escritura en lotes de la bitácora de Watson (`uanl.watson_activities`)
+
+`record` solo deja el registro en un buffer en memoria; una tarea de fondo
+lo vacía cada WATSON_ACTIVITY_BATCH_SIZE registros o cada
+WATSON_ACTIVITY_FLUSH_MS con un `COPY` de PostgreSQL por lote (INSERT de
+varias filas en otros motores), así que la bitácora no agrega un viaje a la
+base de datos por solicitud.
+
+- Con el buffer lleno, `record` espera hasta WATSON_ACTIVITY_ENQUEUE_TIMEOUT_MS
+  (backpressure) y después descarta el registro en lugar de frenar el webhook.
+- Al detenerse se escribe todo lo pendiente antes de cerrar la base de datos.
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import insert, inspect
+
+from app.config import database
+from app.config.settings import settings
+from app.models.watson_activities import WatsonActivity
+
+
+# Marca de fin: todo lo encolado antes se escribe, luego la tarea termina
+_STOP = object()
+
+# Los registros usan los atributos del modelo; el COPY, los nombres de columna
+# (`metadata_json` del modelo es la columna `metadata`). `columns` no fuerza la
+# configuración de los mappers: importar este módulo no exige tener Call registrado
+_COLUMN_KEYS = {key: column.key for key, column in inspect(WatsonActivity).columns.items()}
+COPY_COLUMNS = tuple(
+    column.key for column in WatsonActivity.__table__.columns if not column.primary_key
+)
+
+# Fuera de PostgreSQL: filas por INSERT para no pasar el límite de parámetros (SQLite: 999)
+_MAX_BIND_PARAMS = 999
+_ROWS_PER_INSERT = _MAX_BIND_PARAMS // len(COPY_COLUMNS)
+
+
+class ActivityBatchWriter:
+    """Buffer acotado de actividades con escritura periódica en lotes"""
+    
+    def __init__(
+        self,
+        buffer_size: int = settings.WATSON_ACTIVITY_BUFFER_SIZE,
+        batch_size: int = settings.WATSON_ACTIVITY_BATCH_SIZE,
+        flush_interval_ms: int = settings.WATSON_ACTIVITY_FLUSH_MS,
+        enqueue_timeout_ms: int = settings.WATSON_ACTIVITY_ENQUEUE_TIMEOUT_MS
+    ):
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.enqueue_timeout = enqueue_timeout_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed = 0
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self):
+        """Arrancar la tarea de escritura (idempotente)"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.buffer_size)
+        self._task = asyncio.create_task(self._run(), name="watson-activity-writer")
+        logger.info(f"📝 Bitácora de Watson en lotes ({self.batch_size} filas / {self.flush_interval * 1000:.0f} ms)")
+    
+    async def stop(self):
+        """Escribir lo pendiente y detener la tarea (shutdown)"""
+        if not self.running:
+            return
+        task, self._task = self._task, None
+        # Desde aquí `record` escribe directo; el buffer se vacía hasta la marca de fin
+        await self._queue.put(_STOP)
+        await task
+        logger.info(f"📝 Bitácora de Watson detenida ({self.written} registros escritos)")
+    
+    async def record(self, activity: Dict[str, Any]):
+        """Encolar una actividad; nunca lanza excepción al llamador"""
+        # La hora es la de la interacción, no la del flush (el COPY no usa el default del servidor)
+        activity.setdefault("created_at", datetime.now().astimezone())
+        if not self.running:
+            # Sin tarea de fondo (scripts, pruebas): escritura inmediata
+            await self._flush([activity])
+            return
+        
+        try:
+            self._queue.put_nowait(activity)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(activity), timeout=self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                if self.dropped % 1000 == 1:
+                    logger.warning(f"📝 Buffer de bitácora lleno, {self.dropped} registros descartados")
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            await self._flush(batch)
+    
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        """Un COPY por lote en PostgreSQL; INSERT ... VALUES de varias filas en otro motor"""
+        rows = [{_COLUMN_KEYS.get(key, key): value for key, value in activity.items()} for activity in batch]
+        try:
+            async with database.get_async_session_factory()() as db:
+                connection = await db.connection()
+                if connection.dialect.name == "postgresql":
+                    raw = await connection.get_raw_connection()
+                    await raw.driver_connection.copy_records_to_table(
+                        WatsonActivity.__table__.name,
+                        schema_name=WatsonActivity.__table__.schema,
+                        columns=COPY_COLUMNS,
+                        records=[tuple(row.get(column) for column in COPY_COLUMNS) for row in rows]
+                    )
+                else:
+                    for start in range(0, len(rows), _ROWS_PER_INSERT):
+                        await db.execute(insert(WatsonActivity.__table__).values(rows[start:start + _ROWS_PER_INSERT]))
+                await db.commit()
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Error escribiendo bitácora de Watson ({len(batch)} registros): {e}")
+            return
+        self.written += len(batch)
+        self.batches += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "buffered": self._queue.qsize() if self._queue is not None else 0,
+            "buffer_size": self.buffer_size,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
+
+
+# Instancia compartida (se arranca y detiene en el ciclo de vida de la app)
+activity_writer = ActivityBatchWriter()
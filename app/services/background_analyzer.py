@@ -0,0 +1,261 @@
+"""
+🔁 Analizador incremental de llamadas en segundo plano
+
+Corre como tarea de asyncio dentro del ciclo de vida de la app. Cada corrida
+toma las llamadas nuevas sin analizar a partir de una marca de agua
+(`uanl.processing_checkpoints`), las analiza en paralelo con el servicio de
+análisis y guarda resultados y marca de agua en la misma transacción.
+
+También ejecuta los análisis por rango de call_id que se piden desde la API
+(`submit_backfill`): uno a la vez, fuera de la solicitud HTTP, con su estado
+consultable por id. Los trabajos viven en la memoria de esta instancia; si
+se reinicia, el rango se vuelve a pedir y `only_unanalyzed` salta lo hecho.
+"""
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import database
+from app.config.settings import settings
+from app.models.calls import Call
+from app.models.checkpoints import ProcessingCheckpoint
+from app.services.conversation_analysis_service import (
+    ConversationAnalysisService,
+    conversation_analysis_service,
+)
+
+
+CHECKPOINT_NAME = "call_analyzer"
+
+
+class BackgroundCallAnalyzer:
+    """Analiza en lotes las llamadas nuevas que aún no tienen análisis"""
+    
+    def __init__(
+        self,
+        analysis_service: ConversationAnalysisService,
+        interval_seconds: float = settings.ANALYZER_INTERVAL_SECONDS,
+        batch_size: int = settings.ANALYZER_BATCH_SIZE,
+        max_batches_per_run: int = settings.ANALYZER_MAX_BATCHES_PER_RUN
+    ):
+        self.analysis_service = analysis_service
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.max_batches_per_run = max_batches_per_run
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event = asyncio.Event()
+        self._processed_total = 0
+        self._last_call_id: Optional[int] = None
+        self._last_run_at: Optional[datetime] = None
+        self._last_error: Optional[str] = None
+        self._backfills: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._backfill_tasks: Dict[str, asyncio.Task] = {}
+        self._backfill_slot = asyncio.Semaphore(1)
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self):
+        """Arrancar la tarea periódica (idempotente)"""
+        if self.running:
+            return
+        self._stop_event = asyncio.Event()
+        self._task = asyncio.create_task(self._run_forever(), name="background-call-analyzer")
+        logger.info(f"🔁 Analizador en segundo plano iniciado (cada {self.interval_seconds}s)")
+    
+    async def stop(self):
+        """Detener la tarea esperando a que termine el lote en curso"""
+        await self._cancel_backfills()
+        if not self.running:
+            return
+        self._stop_event.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=self.interval_seconds + 30)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+        logger.info("🔁 Analizador en segundo plano detenido")
+    
+    async def _run_forever(self):
+        while not self._stop_event.is_set():
+            batches = 0
+            try:
+                batches = (await self.run_once())["batches"]
+                self._last_error = None
+            except Exception as e:
+                self._last_error = str(e)
+                logger.error(f"Error en el analizador en segundo plano: {e}")
+            
+            # Con rezago pendiente se sigue de inmediato; si no, se espera el intervalo
+            if batches >= self.max_batches_per_run:
+                continue
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def run_once(self) -> Dict[str, Any]:
+        """
+        Procesar hasta `max_batches_per_run` lotes de llamadas nuevas
+        
+        Cada lote bloquea la fila de la marca de agua con SKIP LOCKED: si otra
+        instancia de la API ya la tiene, esta corrida termina sin hacer nada.
+        Las llamadas por debajo de la marca que sigan sin análisis se cubren con
+        el análisis masivo por rango (`/watson/analyze-conversations/batch`).
+        """
+        session_factory = database.get_async_session_factory()
+        processed = 0
+        batches = 0
+        
+        async with session_factory() as db:
+            await db.execute(
+                insert(ProcessingCheckpoint)
+                .values(name=CHECKPOINT_NAME, last_id=0)
+                .on_conflict_do_nothing(index_elements=[ProcessingCheckpoint.name])
+            )
+            await db.commit()
+            
+            while batches < self.max_batches_per_run and not self._stop_event.is_set():
+                checkpoint = (await db.execute(
+                    select(ProcessingCheckpoint)
+                    .where(ProcessingCheckpoint.name == CHECKPOINT_NAME)
+                    .with_for_update(skip_locked=True)
+                )).scalar_one_or_none()
+                if checkpoint is None:
+                    await db.rollback()
+                    break
+                
+                rows = (await db.execute(
+                    select(Call.call_id, Call.conversation)
+                    .where(
+                        Call.call_id > checkpoint.last_id,
+                        Call.sentimiento.is_(None),
+                        Call.conversation.isnot(None)
+                    )
+                    .order_by(Call.call_id)
+                    .limit(self.batch_size)
+                )).all()
+                if not rows:
+                    await db.rollback()
+                    break
+                
+                analyses = await self.analysis_service.analyze_many(
+                    [row.conversation for row in rows],
+                    use_cache=False
+                )
+                processed += await self.analysis_service.save_call_analyses(
+                    db,
+                    [(row.call_id, analysis) for row, analysis in zip(rows, analyses)],
+                    conversations=[row.conversation for row in rows]
+                )
+                checkpoint.last_id = rows[-1].call_id
+                await db.commit()
+                
+                batches += 1
+                self._last_call_id = rows[-1].call_id
+                
+                if len(rows) < self.batch_size:
+                    break
+        
+        self._processed_total += processed
+        self._last_run_at = datetime.now()
+        if processed:
+            logger.info(f"🔁 Analizador: {processed} llamadas nuevas analizadas (hasta call_id {self._last_call_id})")
+        
+        return {"processed": processed, "batches": batches}
+    
+    def submit_backfill(
+        self,
+        call_id_start: Optional[int],
+        call_id_end: Optional[int],
+        only_unanalyzed: bool = True
+    ) -> Dict[str, Any]:
+        """Encolar el análisis de un rango de call_id y devolver el trabajo"""
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "call_id_start": call_id_start,
+            "call_id_end": call_id_end,
+            "only_unanalyzed": only_unanalyzed,
+            "processed": 0,
+            "last_call_id": None,
+            "error": None,
+            "created_at": datetime.now().isoformat(),
+            "finished_at": None
+        }
+        self._backfills[job_id] = job
+        self._backfill_tasks[job_id] = asyncio.create_task(
+            self._run_backfill(job), name=f"call-backfill-{job_id[:8]}"
+        )
+        self._prune_backfills()
+        return dict(job)
+    
+    def get_backfill(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._backfills.get(job_id)
+        return dict(job) if job is not None else None
+    
+    async def _run_backfill(self, job: Dict[str, Any]):
+        def progress(processed: int, last_call_id: int):
+            job["processed"] = processed
+            job["last_call_id"] = last_call_id
+        
+        try:
+            # Un rango a la vez: comparten el pool de procesos con el análisis incremental
+            async with self._backfill_slot:
+                job["status"] = "running"
+                async with database.get_async_session_factory()() as db:
+                    result = await self.analysis_service.backfill_calls(
+                        db,
+                        call_id_start=job["call_id_start"],
+                        call_id_end=job["call_id_end"],
+                        only_unanalyzed=job["only_unanalyzed"],
+                        on_batch=progress
+                    )
+            job.update(result, status="completed")
+        except asyncio.CancelledError:
+            # Los lotes ya confirmados se conservan; el rango se puede volver a pedir
+            job["status"] = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Error en el análisis por rango {job['job_id']}: {e}")
+            job.update(status="failed", error=str(e))
+        finally:
+            job["finished_at"] = datetime.now().isoformat()
+            self._backfill_tasks.pop(job["job_id"], None)
+    
+    def _prune_backfills(self):
+        """Olvidar los trabajos terminados más viejos"""
+        finished = [job_id for job_id in self._backfills if job_id not in self._backfill_tasks]
+        for job_id in finished[:max(0, len(finished) - settings.ANALYZER_BACKFILL_JOBS_KEPT)]:
+            del self._backfills[job_id]
+    
+    async def _cancel_backfills(self):
+        tasks = list(self._backfill_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.ANALYZER_ENABLED,
+            "running": self.running,
+            "interval_seconds": self.interval_seconds,
+            "batch_size": self.batch_size,
+            "processed_total": self._processed_total,
+            "last_call_id": self._last_call_id,
+            "last_run_at": self._last_run_at.isoformat() if self._last_run_at else None,
+            "last_error": self._last_error,
+            "backfills_active": len(self._backfill_tasks)
+        }
+
+
+# Instancia compartida (se arranca y detiene en el ciclo de vida de la app)
+background_call_analyzer = BackgroundCallAnalyzer(conversation_analysis_service)
@@ -0,0 +1,278 @@
+"""
+📥 Carga masiva de llamadas (NDJSON o CSV)
+
+El archivo se lee por lotes; en cada lote se validan las filas, se resuelven
+los nombres de operador y las referencias externas de cliente con una
+consulta por tipo (con caché durante toda la carga) y las filas válidas se
+insertan con `COPY` de PostgreSQL. En otros motores (SQLite en desarrollo)
+se usa un `executemany` por lote. Las filas inválidas se reportan con su
+número de línea y no detienen la carga: eso incluye líneas con UTF-8
+inválido y filas que la base rechaza (si el lote falla se reintenta fila
+por fila, cada una en un savepoint).
+"""
+import asyncio
+import csv
+import time
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+from loguru import logger
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.models.calls import Call
+from app.models.clients import Client
+from app.models.operators import Operator
+from app.schemas.calls import CallIngestRow
+from app.services.client_service import client_service
+
+
+# Columnas que se cargan en uanl.calls (en el orden de los registros del COPY)
+COPY_COLUMNS = (
+    "call_label", "operator_id", "client_id", "call_date", "duration_seconds",
+    "conversation", "sentimiento", "impacto", "urgencia", "tema"
+)
+
+
+def _iter_lines(source: BinaryIO, rejects: List[Dict[str, Any]]) -> Iterator[str]:
+    """Decodificar línea por línea para que un byte inválido solo rechace su línea"""
+    for line_number, raw in enumerate(source, start=1):
+        try:
+            yield raw.decode("utf-8-sig" if line_number == 1 else "utf-8")
+        except UnicodeDecodeError as e:
+            rejects.append({"line": line_number, "error": f"UTF-8 inválido: {e.reason} (byte {e.start})"})
+            # Línea vacía: conserva la numeración y ambos lectores la ignoran
+            yield "\n"
+
+
+def _iter_ndjson(text: Iterator[str]) -> Iterator[Tuple[int, Any]]:
+    # Las líneas se validan como JSON directamente con pydantic (sin json.loads intermedio)
+    for line_number, line in enumerate(text, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def _iter_csv(text: Iterator[str]) -> Iterator[Tuple[int, Any]]:
+    reader = csv.DictReader(text)
+    for row in reader:
+        # Celdas vacías = sin valor; line_num apunta a la última línea del registro
+        yield reader.line_num, {key: value for key, value in row.items() if key and value not in ("", None)}
+
+
+def _format_error(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc']) or 'fila'}: {detail['msg']}"
+            for detail in error.errors()
+        )
+    if isinstance(error, DBAPIError):
+        # Solo la primera línea del mensaje del driver, sin la sentencia ni los parámetros
+        return str(error.orig).rsplit(">: ", 1)[-1].strip().splitlines()[0]
+    return str(error)
+
+
+class CallIngestionService:
+    """Servicio para cargar llamadas en volumen sin un INSERT ORM por fila"""
+    
+    def __init__(
+        self,
+        batch_size: int = settings.CALL_INGEST_BATCH_SIZE,
+        max_rejects_reported: int = settings.CALL_INGEST_MAX_REJECTS_REPORTED
+    ):
+        self.batch_size = batch_size
+        self.max_rejects_reported = max_rejects_reported
+    
+    async def ingest(
+        self,
+        db: AsyncSession,
+        source: BinaryIO,
+        file_format: str,
+        create_clients: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Cargar un archivo completo. Cada lote se confirma por separado; si
+        la base rechaza el lote se reintenta fila por fila y las filas que
+        fallan se reportan como rechazadas.
+        
+        Con `create_clients` las referencias de cliente desconocidas se dan
+        de alta en lugar de rechazar la fila.
+        """
+        started = time.perf_counter()
+        decode_rejects: List[Dict[str, Any]] = []
+        text = _iter_lines(source, decode_rejects)
+        rows = _iter_ndjson(text) if file_format == "ndjson" else _iter_csv(text)
+        
+        operator_ids: Dict[Any, int] = {}
+        client_ids: Dict[Any, int] = {}
+        received = inserted = rejected = 0
+        rejects: List[Dict[str, Any]] = []
+        
+        def prepare_next():
+            # Parsear y validar es CPU puro: se hace en un hilo mientras el lote anterior se carga
+            batch = list(islice(rows, self.batch_size))
+            valid, batch_rejects = self._validate(batch)
+            # Las líneas con UTF-8 inválido no llegan al lote pero cuentan como recibidas
+            batch_rejects.extend(decode_rejects)
+            received = len(batch) + len(decode_rejects)
+            decode_rejects.clear()
+            return received, valid, batch_rejects
+        
+        pending = asyncio.ensure_future(asyncio.to_thread(prepare_next))
+        try:
+            while True:
+                batch_size, valid, batch_rejects = await pending
+                if not batch_size:
+                    break
+                received += batch_size
+                pending = asyncio.ensure_future(asyncio.to_thread(prepare_next))
+                
+                records, unresolved = await self._resolve(db, valid, operator_ids, client_ids, create_clients)
+                batch_rejects.extend(unresolved)
+                
+                if records:
+                    try:
+                        # Savepoint: si el COPY falla se conservan los clientes creados en `_resolve`
+                        async with db.begin_nested():
+                            await self._load(db, [record for _, record in records])
+                        inserted += len(records)
+                    except Exception as e:
+                        logger.warning(f"📥 La base rechazó un lote de {len(records)} filas ({e}); reintentando fila por fila")
+                        row_inserted, row_rejects = await self._load_row_by_row(db, records)
+                        inserted += row_inserted
+                        batch_rejects.extend(row_rejects)
+                    await db.commit()
+                
+                rejected += len(batch_rejects)
+                room = self.max_rejects_reported - len(rejects)
+                if room > 0:
+                    rejects.extend(sorted(batch_rejects, key=lambda reject: reject["line"])[:room])
+        finally:
+            # El hilo no se puede cancelar: esperar a que suelte el archivo antes de cerrarlo
+            await asyncio.wait([pending])
+        
+        elapsed = time.perf_counter() - started
+        logger.info(f"📥 Carga masiva: {inserted} llamadas insertadas, {rejected} rechazadas en {elapsed:.2f}s")
+        return {
+            "received": received,
+            "inserted": inserted,
+            "rejected": rejected,
+            "rejects": rejects,
+            "rejects_truncated": rejected > len(rejects),
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(inserted / elapsed, 1) if elapsed else 0.0
+        }
+    
+    def _validate(self, batch: List[Tuple[int, Any]]) -> Tuple[List[Tuple[int, CallIngestRow]], List[Dict[str, Any]]]:
+        valid, rejects = [], []
+        for line_number, data in batch:
+            try:
+                if isinstance(data, str):
+                    valid.append((line_number, CallIngestRow.model_validate_json(data)))
+                else:
+                    valid.append((line_number, CallIngestRow.model_validate(data)))
+            except ValidationError as e:
+                rejects.append({"line": line_number, "error": _format_error(e)})
+        return valid, rejects
+    
+    async def _resolve(
+        self,
+        db: AsyncSession,
+        rows: List[Tuple[int, CallIngestRow]],
+        operator_ids: Dict[Any, int],
+        client_ids: Dict[Any, int],
+        create_clients: bool
+    ) -> Tuple[List[Tuple[int, Tuple[Any, ...]]], List[Dict[str, Any]]]:
+        """
+        Convertir nombres/referencias a ids con una consulta por tipo
+        
+        Los cachés de la carga guardan tanto `("id", n)` como `("name", s)`
+        para que los ids explícitos también se verifiquen (un id inexistente
+        haría fallar el COPY completo por la llave foránea).
+        """
+        missing_operators = {
+            ("id", row.operator_id) if row.operator_id is not None else ("name", row.operator_name)
+            for _, row in rows
+        } - operator_ids.keys()
+        if missing_operators:
+            found = await db.execute(
+                select(Operator.operator_id, Operator.name).where(or_(
+                    Operator.operator_id.in_([value for kind, value in missing_operators if kind == "id"]),
+                    Operator.name.in_([value for kind, value in missing_operators if kind == "name"])
+                ))
+            )
+            for operator_id, name in found:
+                operator_ids[("id", operator_id)] = operator_id
+                operator_ids[("name", name)] = operator_id
+        
+        missing_clients = {
+            ("id", row.client_id) if row.client_id is not None else ("ref", row.client_external_ref)
+            for _, row in rows
+        } - client_ids.keys()
+        missing_client_ids = [value for kind, value in missing_clients if kind == "id"]
+        if missing_client_ids:
+            found = await db.execute(select(Client.client_id).where(Client.client_id.in_(missing_client_ids)))
+            for client_id in found.scalars():
+                client_ids[("id", client_id)] = client_id
+        missing_refs = [value for kind, value in missing_clients if kind == "ref"]
+        if missing_refs:
+            # Caché compartido external_ref -> client_id (y alta de clientes nuevos si se pidió)
+            found = await client_service.resolve_client_ids(db, missing_refs, create_missing=create_clients)
+            for external_ref, client_id in found.items():
+                client_ids[("ref", external_ref)] = client_id
+        
+        records, rejects = [], []
+        for line_number, row in rows:
+            operator_id = operator_ids.get(
+                ("id", row.operator_id) if row.operator_id is not None else ("name", row.operator_name)
+            )
+            client_id = client_ids.get(
+                ("id", row.client_id) if row.client_id is not None else ("ref", row.client_external_ref)
+            )
+            if operator_id is None:
+                rejects.append({"line": line_number, "error": f"Operador no encontrado: {row.operator_id or row.operator_name}"})
+                continue
+            if client_id is None:
+                rejects.append({"line": line_number, "error": f"Cliente no encontrado: {row.client_id or row.client_external_ref}"})
+                continue
+            records.append((line_number, (
+                row.call_label, operator_id, client_id, row.call_date, row.duration_seconds,
+                row.conversation, row.sentimiento, row.impacto, row.urgencia, row.tema
+            )))
+        return records, rejects
+    
+    async def _load(self, db: AsyncSession, records: List[Tuple[Any, ...]]):
+        """COPY en PostgreSQL; executemany por lote en cualquier otro motor"""
+        connection = await db.connection()
+        if connection.dialect.name == "postgresql":
+            raw = await connection.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                Call.__table__.name,
+                schema_name=Call.__table__.schema,
+                columns=COPY_COLUMNS,
+                records=records
+            )
+        else:
+            await db.execute(insert(Call), [dict(zip(COPY_COLUMNS, record)) for record in records])
+    
+    async def _load_row_by_row(
+        self,
+        db: AsyncSession,
+        records: List[Tuple[int, Tuple[Any, ...]]]
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Reintento de un lote rechazado: cada fila en su savepoint para aislar las que fallan"""
+        inserted, rejects = 0, []
+        for line_number, record in records:
+            try:
+                async with db.begin_nested():
+                    await db.execute(insert(Call.__table__).values(dict(zip(COPY_COLUMNS, record))))
+                inserted += 1
+            except DBAPIError as e:
+                rejects.append({"line": line_number, "error": _format_error(e)})
+        return inserted, rejects
+
+
+# Instancia compartida
+call_ingestion_service = CallIngestionService()
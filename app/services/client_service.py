@@ -0,0 +1,150 @@
+"""
+👤 Resolución de clientes por referencia externa
+
+`external_ref → client_id` se resuelve con un caché en proceso y, en un
+fallo, con una sola sentencia `INSERT ... ON CONFLICT DO NOTHING RETURNING`
+unida a la búsqueda de los que ya existían. Dos solicitudes simultáneas con
+la misma referencia nueva ya no chocan con la llave única: una inserta y la
+otra encuentra la fila.
+"""
+from typing import Any, Dict, Iterable
+
+from loguru import logger
+from sqlalchemy import VARCHAR, false, func, insert, literal, select, true
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.core.cache import TTLCache
+from app.models.clients import Client
+
+
+# Solo se guardan ids de filas ya confirmadas (un cliente recién insertado
+# podría desaparecer si la transacción del llamador hace rollback)
+_client_id_cache = TTLCache(
+    maxsize=settings.CLIENT_ID_CACHE_SIZE,
+    ttl=settings.CLIENT_ID_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_client(external_ref: str):
+    """Olvidar una referencia (cliente borrado o referencia cambiada)"""
+    _client_id_cache.delete(external_ref)
+
+
+class ClientService:
+    """Servicio para resolver y crear clientes por `external_ref`"""
+    
+    async def get_or_create_client_id(self, db: AsyncSession, external_ref: str) -> int:
+        """Id del cliente con esa referencia; lo crea si no existe (sin confirmar la transacción)"""
+        return (await self.resolve_client_ids(db, [external_ref]))[external_ref]
+    
+    async def resolve_client_ids(
+        self,
+        db: AsyncSession,
+        external_refs: Iterable[str],
+        create_missing: bool = True
+    ) -> Dict[str, int]:
+        """
+        Resolver varias referencias en un viaje a la base de datos
+        
+        Con `create_missing` las que no existen se insertan dentro de la
+        transacción del llamador; si no, simplemente no aparecen en el resultado.
+        """
+        resolved: Dict[str, int] = {}
+        missing = []
+        for external_ref in dict.fromkeys(external_refs):
+            client_id = _client_id_cache.get(external_ref)
+            if client_id is None:
+                missing.append(external_ref)
+            else:
+                resolved[external_ref] = client_id
+        
+        if not missing:
+            return resolved
+        
+        connection = await db.connection()
+        if connection.dialect.name == "postgresql":
+            found = await self._upsert_postgres(db, missing, create_missing)
+        else:
+            found = await self._upsert_generic(db, missing, create_missing)
+        
+        for external_ref, (client_id, created) in found.items():
+            resolved[external_ref] = client_id
+            if created:
+                logger.info(f"Cliente creado: {external_ref}")
+            else:
+                _client_id_cache.set(external_ref, client_id)
+        
+        return resolved
+    
+    async def _upsert_postgres(
+        self,
+        db: AsyncSession,
+        external_refs: list,
+        create_missing: bool
+    ) -> Dict[str, tuple]:
+        wanted = select(
+            func.unnest(literal(external_refs, ARRAY(VARCHAR(64)))).label("external_ref")
+        ).cte("wanted")
+        existing = select(Client.client_id, Client.external_ref, false().label("created")).join(
+            wanted, wanted.c.external_ref == Client.external_ref
+        )
+        
+        if create_missing:
+            inserted = pg_insert(Client).from_select(
+                ["external_ref"], select(wanted.c.external_ref)
+            ).on_conflict_do_nothing(
+                index_elements=[Client.external_ref]
+            ).returning(Client.client_id, Client.external_ref).cte("inserted")
+            # Ambas ramas ven la misma foto: una fila sale de `inserted` o de `existing`, nunca de las dos
+            query = select(inserted.c.client_id, inserted.c.external_ref, true()).union_all(existing)
+        else:
+            query = existing
+        
+        found = {
+            external_ref: (client_id, created)
+            for client_id, external_ref, created in await db.execute(query)
+        }
+        
+        # Una referencia insertada por otra transacción que aún no confirmaba al
+        # empezar la sentencia no sale en ninguna rama: se vuelve a buscar
+        lagging = [external_ref for external_ref in external_refs if external_ref not in found]
+        if lagging and create_missing:
+            rows = await db.execute(
+                select(Client.client_id, Client.external_ref).where(Client.external_ref.in_(lagging))
+            )
+            for client_id, external_ref in rows:
+                found[external_ref] = (client_id, False)
+        
+        return found
+    
+    async def _upsert_generic(
+        self,
+        db: AsyncSession,
+        external_refs: list,
+        create_missing: bool
+    ) -> Dict[str, tuple]:
+        """Otros motores (SQLite en desarrollo): buscar e insertar los faltantes"""
+        rows = await db.execute(
+            select(Client.client_id, Client.external_ref).where(Client.external_ref.in_(external_refs))
+        )
+        found = {external_ref: (client_id, False) for client_id, external_ref in rows}
+        
+        new_refs = [external_ref for external_ref in external_refs if external_ref not in found]
+        if new_refs and create_missing:
+            rows = await db.execute(
+                insert(Client).returning(Client.client_id, Client.external_ref),
+                [{"external_ref": external_ref} for external_ref in new_refs]
+            )
+            for client_id, external_ref in rows:
+                found[external_ref] = (client_id, True)
+        
+        return found
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        return _client_id_cache.stats()
+
+
+# Instancia compartida
+client_service = ClientService()
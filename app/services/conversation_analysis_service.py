@@ -0,0 +1,716 @@
+"""
+🧠 Servicio de análisis de conversaciones telefónicas
+
+Las reglas de análisis son funciones puras a nivel de módulo para que puedan
+ejecutarse en un pool de procesos durante los análisis masivos.
+"""
+import ast
+import asyncio
+import hashlib
+import inspect
+import multiprocessing
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from loguru import logger
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.core.cache import TTLCache, RedisCache, TieredCache
+from app.models.calls import Call, CallAnalysis
+from app.models.operators import Operator
+from app.services.client_service import client_service
+
+
+# Versión de las reglas: cambiarla invalida todos los análisis en caché
+ANALYSIS_RULES_VERSION = "2"
+
+
+# 🔎 Palabras clave que consume cada regla. El detector se construye una sola
+# vez con la unión de todas ellas; cualquier palabra nueva en una regla debe
+# agregarse aquí (`_check_rule_keywords` lo verifica al importar el módulo).
+RULE_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "extract_problem_type": (
+        "lentitud", "lento", "no funciona", "no conecta", "intermitente",
+        "luz naranja", "indicador"
+    ),
+    "extract_urgency": (
+        "urgente", "inmediato", "varios aparatos", "trabajo", "cuando pueda",
+        "no hay prisa"
+    ),
+    "analyze_sentiment": (
+        "problema", "lento", "no funciona", "molesto", "frustrante",
+        "gracias", "muy bien", "perfecto", "excelente",
+        "okay", "entiendo", "está bien"
+    ),
+    "extract_resolution_status": (
+        "ajuste", "realizó", "devuelvo la llamada", "callback", "técnico", "venir"
+    ),
+    "check_follow_up_needed": (
+        "devuelvo la llamada", "mañana temprano", "en media hora", "revisar",
+        "callback", "verificar"
+    ),
+    "extract_entities": (
+        "media hora", "una hora", "nueve", "noche", "mañana temprano",
+        "luz naranja", "ajuste", "realizó", "no estoy en mi casa", "casa"
+    ),
+    "generate_recommendations": (
+        "devuelvo la llamada", "ajuste", "realizó", "luz naranja",
+        "varios aparatos", "técnico", "lentitud"
+    ),
+    "generate_summary": ("lentitud", "ajuste", "devuelvo"),
+}
+
+
+class KeywordMatcher:
+    """
+    Detector de palabras clave sobre un conjunto precalculado
+    
+    Convierte la transcripción a minúsculas una única vez y revisa cada
+    palabra clave del conjunto (deduplicado) con `palabra in texto`, es
+    decir, una búsqueda de subcadena por palabra clave. Todas las reglas
+    consumen el conjunto de palabras presentes que devuelve.
+    """
+    
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords = tuple(sorted(set(keywords)))
+    
+    def features(self, conversation: str) -> FrozenSet[str]:
+        """Palabras clave presentes en la conversación"""
+        text = (conversation or "").lower()
+        return frozenset(keyword for keyword in self.keywords if keyword in text)
+
+
+keyword_matcher = KeywordMatcher(
+    [keyword for keywords in RULE_KEYWORDS.values() for keyword in keywords]
+)
+
+
+def conversation_features(conversation: str) -> FrozenSet[str]:
+    """Extraer el conjunto de palabras clave de una conversación"""
+    return keyword_matcher.features(conversation)
+
+
+# 🧠 Funciones de análisis de conversaciones
+def extract_problem_type(features: FrozenSet[str]) -> str:
+    """Extraer tipo de problema de la conversación"""
+    if "lentitud" in features or "lento" in features:
+        return "lentitud_servicio"
+    elif "no funciona" in features or "no conecta" in features:
+        return "falta_servicio"
+    elif "intermitente" in features:
+        return "servicio_intermitente"
+    elif "luz naranja" in features or "indicador" in features:
+        return "problema_conectividad"
+    else:
+        return "problema_general"
+
+
+def extract_urgency(features: FrozenSet[str]) -> str:
+    """Determinar nivel de urgencia basado en contexto"""
+    if "urgente" in features or "inmediato" in features:
+        return "high"
+    elif "varios aparatos" in features or "trabajo" in features:
+        return "medium"
+    elif "cuando pueda" in features or "no hay prisa" in features:
+        return "low"
+    else:
+        return "medium"
+
+
+def analyze_sentiment(features: FrozenSet[str]) -> str:
+    """Analizar sentimiento del cliente"""
+    negative_words = ["problema", "lento", "no funciona", "molesto", "frustrante"]
+    positive_words = ["gracias", "muy bien", "perfecto", "excelente"]
+    neutral_words = ["okay", "entiendo", "está bien"]
+    
+    negative_count = sum(1 for word in negative_words if word in features)
+    positive_count = sum(1 for word in positive_words if word in features)
+    neutral_count = sum(1 for word in neutral_words if word in features)
+    
+    if negative_count > positive_count + neutral_count:
+        return "frustrated"
+    elif positive_count > negative_count:
+        return "satisfied"
+    else:
+        return "neutral"
+
+
+def extract_resolution_status(features: FrozenSet[str]) -> str:
+    """Determinar estado de resolución"""
+    if "ajuste" in features and "realizó" in features:
+        return "potentially_resolved"
+    elif "devuelvo la llamada" in features or "callback" in features:
+        return "pending_verification"
+    elif "técnico" in features and "venir" in features:
+        return "requires_technician"
+    else:
+        return "unresolved"
+
+
+def check_follow_up_needed(features: FrozenSet[str]) -> bool:
+    """Verificar si se necesita seguimiento"""
+    follow_up_indicators = [
+        "devuelvo la llamada",
+        "mañana temprano", 
+        "en media hora",
+        "revisar",
+        "callback",
+        "verificar"
+    ]
+    
+    return any(indicator in features for indicator in follow_up_indicators)
+
+
+def extract_entities(features: FrozenSet[str]) -> Dict[str, Any]:
+    """Extraer entidades importantes de la conversación"""
+    entities = {
+        "tiempo_estimado": None,
+        "hora_callback": None,
+        "problema_especifico": None,
+        "estado_servicio": None,
+        "ajustes_realizados": False,
+        "ubicacion_cliente": None
+    }
+    
+    # Extraer tiempo estimado
+    if "media hora" in features:
+        entities["tiempo_estimado"] = "30 minutos"
+    elif "una hora" in features:
+        entities["tiempo_estimado"] = "60 minutos"
+    
+    # Extraer hora de callback
+    if "nueve" in features and "noche" in features:
+        entities["hora_callback"] = "21:00"
+    elif "mañana temprano" in features:
+        entities["hora_callback"] = "08:00"
+    
+    # Extraer problema específico
+    if "luz naranja" in features:
+        entities["problema_especifico"] = "indicador_conexion_baja"
+        entities["estado_servicio"] = "degradado"
+    
+    # Verificar si se realizaron ajustes
+    if "ajuste" in features and "realizó" in features:
+        entities["ajustes_realizados"] = True
+    
+    # Extraer ubicación
+    if "no estoy en mi casa" in features:
+        entities["ubicacion_cliente"] = "fuera_domicilio"
+    elif "casa" in features:
+        entities["ubicacion_cliente"] = "domicilio"
+    
+    return entities
+
+
+def generate_recommendations(features: FrozenSet[str]) -> List[str]:
+    """Generar recomendaciones basadas en la conversación"""
+    recommendations = []
+    
+    if "devuelvo la llamada" in features:
+        recommendations.append("programar_callback")
+    
+    if "ajuste" in features and "realizó" in features:
+        recommendations.append("verificar_ajustes_realizados")
+    
+    if "luz naranja" in features:
+        recommendations.append("revisar_niveles_señal")
+        recommendations.append("diagnostico_remoto")
+    
+    if "varios aparatos" in features:
+        recommendations.append("optimizar_ancho_banda")
+    
+    if "técnico" in features:
+        recommendations.append("programar_visita_tecnica")
+    
+    if "lentitud" in features:
+        recommendations.append("monitoreo_velocidad")
+        recommendations.append("verificar_configuracion")
+    
+    return recommendations
+
+
+def generate_summary(features: FrozenSet[str]) -> str:
+    """Generar resumen inteligente de la conversación"""
+    # Detectar elementos clave
+    problem = "lentitud de servicio" if "lentitud" in features else "problema técnico"
+    action_taken = "ajustes realizados" if "ajuste" in features else "diagnóstico inicial"
+    next_step = "callback programado" if "devuelvo" in features else "seguimiento requerido"
+    
+    return f"""
+    📋 Resumen Automático:
+    • Problema: {problem}
+    • Acción realizada: {action_taken}
+    • Estado: Pendiente de verificación
+    • Próximo paso: {next_step}
+    • Cliente: Cooperativo, disponible para seguimiento
+    """.strip()
+
+
+def _rule_literals(rule) -> Set[str]:
+    """
+    Palabras que una regla consulta con `... in features`
+    
+    Se leen del AST de la función: literales directos y listas recorridas
+    con una variable (`word in features for word in negative_words`).
+    """
+    tree = ast.parse(textwrap.dedent(inspect.getsource(rule)))
+    lists = {
+        node.targets[0].id: node.value
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Name)
+    }
+    literals = set()
+    
+    def visit(node, loops):
+        # Cada comprensión/for liga su propia variable (varias reglas reutilizan `word`)
+        if isinstance(node, (ast.GeneratorExp, ast.ListComp, ast.SetComp)):
+            loops = {**loops, **{
+                generator.target.id: generator.iter
+                for generator in node.generators if isinstance(generator.target, ast.Name)
+            }}
+        elif isinstance(node, ast.For) and isinstance(node.target, ast.Name):
+            loops = {**loops, node.target.id: node.iter}
+        
+        if (
+            isinstance(node, ast.Compare)
+            and isinstance(node.ops[0], ast.In)
+            and isinstance(node.comparators[0], ast.Name)
+            and node.comparators[0].id == "features"
+        ):
+            keyword = node.left
+            if isinstance(keyword, ast.Name) and keyword.id in loops:
+                keyword = loops[keyword.id]
+                if isinstance(keyword, ast.Name):
+                    keyword = lists.get(keyword.id)
+            if isinstance(keyword, ast.Constant) and isinstance(keyword.value, str):
+                literals.add(keyword.value)
+            elif isinstance(keyword, (ast.List, ast.Tuple)) and all(
+                isinstance(item, ast.Constant) and isinstance(item.value, str) for item in keyword.elts
+            ):
+                literals.update(item.value for item in keyword.elts)
+            else:
+                raise RuntimeError(
+                    f"{rule.__name__}: consulta a `features` no verificable en la línea {node.lineno}; "
+                    "usa un literal o una lista de literales"
+                )
+        
+        for child in ast.iter_child_nodes(node):
+            visit(child, loops)
+    
+    visit(tree, {})
+    return literals
+
+
+def _check_rule_keywords():
+    """Cada regla debe consultar exactamente las palabras que declara en RULE_KEYWORDS"""
+    for name, declared in RULE_KEYWORDS.items():
+        try:
+            used = _rule_literals(globals()[name])
+        except OSError:
+            # Sin código fuente (p. ej. solo .pyc) no hay nada que verificar
+            return
+        if used != set(declared):
+            raise RuntimeError(
+                f"RULE_KEYWORDS['{name}'] no coincide con la regla: "
+                f"faltan {sorted(used - set(declared))}, sobran {sorted(set(declared) - used)}"
+            )
+
+
+_check_rule_keywords()
+
+
+def analyze_conversation_text(conversation: str) -> Dict[str, Any]:
+    """Ejecutar todas las reglas sobre el conjunto de palabras clave de una conversación"""
+    features = conversation_features(conversation)
+    
+    return {
+        "call_analysis": {
+            "problem_type": extract_problem_type(features),
+            "urgency_level": extract_urgency(features),
+            "customer_sentiment": analyze_sentiment(features),
+            "resolution_status": extract_resolution_status(features),
+            "follow_up_required": check_follow_up_needed(features)
+        },
+        "extracted_entities": extract_entities(features),
+        "recommended_actions": generate_recommendations(features),
+        "summary": generate_summary(features)
+    }
+
+
+# Mapeo del análisis a las columnas de uanl.calls
+SENTIMENT_TO_SENTIMIENTO = {
+    "frustrated": "negativo",
+    "satisfied": "positivo",
+    "neutral": "neutral"
+}
+
+URGENCY_TO_URGENCIA = {
+    "high": "alta",
+    "medium": "media",
+    "low": "baja"
+}
+
+PROBLEM_TYPE_TO_IMPACTO = {
+    "falta_servicio": "alto",
+    "servicio_intermitente": "medio",
+    "lentitud_servicio": "medio",
+    "problema_conectividad": "medio",
+    "problema_general": "bajo"
+}
+
+
+def to_call_fields(analysis: Dict[str, Any]) -> Dict[str, str]:
+    """Convertir un análisis en los valores de sentimiento/impacto/urgencia/tema"""
+    call_analysis = analysis["call_analysis"]
+    problem_type = call_analysis["problem_type"]
+    urgency = call_analysis["urgency_level"]
+    
+    impacto = PROBLEM_TYPE_TO_IMPACTO.get(problem_type, "bajo")
+    if urgency == "high":
+        impacto = "alto"
+    
+    return {
+        "sentimiento": SENTIMENT_TO_SENTIMIENTO.get(call_analysis["customer_sentiment"], "neutral"),
+        "impacto": impacto,
+        "urgencia": URGENCY_TO_URGENCIA.get(urgency, "media"),
+        "tema": problem_type
+    }
+
+
+def conversation_hash(conversation: str) -> str:
+    """
+    Hash sha256 de la conversación normalizada
+    
+    Solo se normaliza lo que no altera el resultado de las reglas
+    (mayúsculas y espacios en los extremos).
+    """
+    normalized = (conversation or "").strip().lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def analysis_cache_key(conversation: str) -> str:
+    """Llave de caché: versión de reglas + hash de la conversación"""
+    return f"{ANALYSIS_RULES_VERSION}:{conversation_hash(conversation)}"
+
+
+def _build_analysis_cache() -> TieredCache:
+    """Caché de análisis configurado desde Settings"""
+    redis_cache = None
+    if settings.ANALYSIS_CACHE_REDIS_ENABLED:
+        redis_cache = RedisCache(
+            settings.REDIS_URL,
+            prefix="analysis",
+            ttl=settings.ANALYSIS_CACHE_TTL_SECONDS
+        )
+    
+    return TieredCache(
+        TTLCache(
+            maxsize=settings.ANALYSIS_CACHE_MAX_SIZE,
+            ttl=settings.ANALYSIS_CACHE_TTL_SECONDS
+        ),
+        redis_cache
+    )
+
+
+def analyze_chunk(conversations: Sequence[str]) -> List[Dict[str, Any]]:
+    """Analizar un bloque de conversaciones (unidad de trabajo del pool de procesos)"""
+    return [analyze_conversation_text(conversation or "") for conversation in conversations]
+
+
+class ConversationAnalysisService:
+    """Servicio para análisis individual y masivo de conversaciones"""
+    
+    def __init__(
+        self,
+        max_workers: int = settings.ANALYSIS_MAX_WORKERS,
+        chunk_size: int = settings.ANALYSIS_CHUNK_SIZE,
+        cache: Optional[TieredCache] = None
+    ):
+        self.max_workers = max_workers
+        self.chunk_size = max(chunk_size, 1)
+        self.cache = cache if cache is not None else _build_analysis_cache()
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        """Crear el pool de procesos de forma perezosa"""
+        if self.max_workers <= 0:
+            return None
+        
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+    
+    async def close(self):
+        """Detener el pool de procesos y cerrar el caché"""
+        if self._executor is not None:
+            # Esperar a los procesos (en un hilo) evita errores del pool en el atexit
+            await asyncio.to_thread(self._executor.shutdown, wait=True, cancel_futures=True)
+            self._executor = None
+        await self.cache.close()
+    
+    async def analyze(self, conversation: str) -> Dict[str, Any]:
+        """Analizar una conversación, reutilizando el resultado si ya está en caché"""
+        key = analysis_cache_key(conversation)
+        
+        analysis = await self.cache.get(key)
+        if analysis is None:
+            analysis = analyze_conversation_text(conversation)
+            await self.cache.set(key, analysis)
+        
+        return analysis
+    
+    async def analyze_many(
+        self,
+        conversations: Sequence[str],
+        use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Analizar varias conversaciones
+        
+        Con `use_cache` se consultan primero los análisis en caché y las
+        conversaciones repetidas dentro del lote se analizan una sola vez.
+        """
+        if not use_cache:
+            return await self._analyze_uncached(conversations)
+        
+        keys = [analysis_cache_key(conversation) for conversation in conversations]
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, str] = {}
+        
+        for key, conversation in zip(keys, conversations):
+            if key in results or key in pending:
+                continue
+            cached = await self.cache.get(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending[key] = conversation
+        
+        if pending:
+            analyses = await self._analyze_uncached(list(pending.values()))
+            for key, analysis in zip(pending.keys(), analyses):
+                results[key] = analysis
+                await self.cache.set(key, analysis)
+        
+        return [results[key] for key in keys]
+    
+    async def _analyze_uncached(self, conversations: Sequence[str]) -> List[Dict[str, Any]]:
+        """Analizar conversaciones repartiéndolas en el pool de procesos"""
+        if not conversations:
+            return []
+        
+        executor = self._get_executor()
+        
+        # Lotes pequeños no compensan el costo de enviar trabajo a otro proceso
+        if executor is None or len(conversations) <= self.chunk_size:
+            return analyze_chunk(conversations)
+        
+        loop = asyncio.get_running_loop()
+        chunks = [
+            conversations[i:i + self.chunk_size]
+            for i in range(0, len(conversations), self.chunk_size)
+        ]
+        results = await asyncio.gather(*[
+            loop.run_in_executor(executor, analyze_chunk, chunk) for chunk in chunks
+        ])
+        
+        return [analysis for chunk_result in results for analysis in chunk_result]
+    
+    async def save_call_analyses(
+        self,
+        db: AsyncSession,
+        analyses: Sequence[Tuple[int, Dict[str, Any]]],
+        conversations: Optional[Sequence[str]] = None
+    ) -> int:
+        """
+        Guardar análisis en uanl.calls y uanl.call_analyses
+        
+        Las columnas de resumen se escriben con un UPDATE masivo por llave
+        primaria y el análisis completo con un único INSERT ... ON CONFLICT.
+        `conversations` (mismo orden que `analyses`) permite registrar el hash
+        del contenido para no volver a analizar la llamada. Todos los
+        `call_id` deben existir (ver `existing_call_ids`); si uno se repite
+        gana su último análisis.
+        """
+        hashes = (
+            [conversation_hash(conversation) for conversation in conversations]
+            if conversations is not None else [""] * len(analyses)
+        )
+        # ON CONFLICT no admite la misma llave dos veces en una sentencia
+        latest = {call_id: (analysis, content_hash) for (call_id, analysis), content_hash in zip(analyses, hashes)}
+        if not latest:
+            return 0
+        
+        await db.execute(
+            update(Call),
+            [{"call_id": call_id, **to_call_fields(analysis)} for call_id, (analysis, _) in latest.items()]
+        )
+        
+        await self._upsert_call_analyses(db, [
+            {
+                "call_id": call_id,
+                "rules_version": ANALYSIS_RULES_VERSION,
+                "content_hash": content_hash,
+                "analysis": analysis
+            }
+            for call_id, (analysis, content_hash) in latest.items()
+        ])
+        
+        return len(latest)
+    
+    async def existing_call_ids(self, db: AsyncSession, call_ids: Sequence[int]) -> Set[int]:
+        """Cuáles de estos call_id existen en uanl.calls (una sola consulta)"""
+        if not call_ids:
+            return set()
+        found = await db.execute(select(Call.call_id).where(Call.call_id.in_(set(call_ids))))
+        return set(found.scalars())
+    
+    async def _upsert_call_analyses(self, db: AsyncSession, rows: List[Dict[str, Any]]):
+        """INSERT ... ON CONFLICT (call_id) DO UPDATE en uanl.call_analyses"""
+        statement = insert(CallAnalysis).values(rows)
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=[CallAnalysis.call_id],
+            set_={
+                "rules_version": statement.excluded.rules_version,
+                "content_hash": statement.excluded.content_hash,
+                "analysis": statement.excluded.analysis,
+                "analyzed_at": func.now()
+            }
+        ))
+    
+    async def analyze_and_store_call(
+        self,
+        db: AsyncSession,
+        conversation: str,
+        operator_id: int,
+        client_ref: str,
+        call_date: Optional[date] = None,
+        call_label: Optional[str] = None,
+        call_id: Optional[int] = None
+    ) -> Tuple[int, Dict[str, Any]]:
+        """
+        Analizar una conversación y guardar la llamada con su análisis
+        
+        Si `call_id` existe se actualiza esa llamada; si no, se inserta una
+        nueva. Cuando la llamada ya tiene un análisis de la misma versión de
+        reglas para el mismo contenido, se devuelve sin volver a analizar.
+        """
+        content_hash = conversation_hash(conversation)
+        
+        if call_id is not None:
+            stored = await db.get(CallAnalysis, call_id)
+            if (
+                stored is not None
+                and stored.rules_version == ANALYSIS_RULES_VERSION
+                and stored.content_hash == content_hash
+            ):
+                return call_id, stored.analysis
+        
+        analysis = await self.analyze(conversation)
+        
+        if await db.get(Operator, operator_id) is None:
+            raise ValueError(f"Operador {operator_id} no encontrado")
+        
+        client_id = await client_service.get_or_create_client_id(db, client_ref)
+        
+        if call_id is not None:
+            call = await db.get(Call, call_id)
+            if call is None:
+                raise ValueError(f"Llamada {call_id} no encontrada")
+        else:
+            call = Call()
+            db.add(call)
+        
+        call.operator_id = operator_id
+        call.client_id = client_id
+        call.conversation = conversation
+        call.call_date = call_date or call.call_date or date.today()
+        call.call_label = call_label or call.call_label
+        for field, value in to_call_fields(analysis).items():
+            setattr(call, field, value)
+        
+        await db.flush()
+        
+        await self._upsert_call_analyses(db, [{
+            "call_id": call.call_id,
+            "rules_version": ANALYSIS_RULES_VERSION,
+            "content_hash": content_hash,
+            "analysis": analysis
+        }])
+        await db.commit()
+        
+        logger.info(f"Análisis guardado para llamada {call.call_id}")
+        return call.call_id, analysis
+    
+    async def backfill_calls(
+        self,
+        db: AsyncSession,
+        call_id_start: Optional[int] = None,
+        call_id_end: Optional[int] = None,
+        only_unanalyzed: bool = True,
+        batch_size: int = settings.ANALYSIS_BATCH_SIZE,
+        on_batch: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Analizar las llamadas de un rango de call_id y guardar los resultados
+        
+        Recorre el rango con paginación por llave (call_id > último procesado)
+        y confirma la transacción al final de cada lote. `on_batch` recibe
+        (procesadas, último call_id) después de cada lote confirmado.
+        """
+        last_call_id = call_id_start - 1 if call_id_start is not None else None
+        processed = 0
+        
+        while True:
+            query = select(Call.call_id, Call.conversation).where(
+                Call.conversation.isnot(None)
+            )
+            if last_call_id is not None:
+                query = query.where(Call.call_id > last_call_id)
+            if call_id_end is not None:
+                query = query.where(Call.call_id <= call_id_end)
+            if only_unanalyzed:
+                query = query.where(Call.sentimiento.is_(None))
+            
+            rows = (await db.execute(
+                query.order_by(Call.call_id).limit(batch_size)
+            )).all()
+            if not rows:
+                break
+            
+            # Los históricos rara vez se repiten: no vale la pena llenar el caché con ellos
+            analyses = await self.analyze_many(
+                [conversation for _, conversation in rows],
+                use_cache=False
+            )
+            processed += await self.save_call_analyses(
+                db,
+                [(row.call_id, analysis) for row, analysis in zip(rows, analyses)],
+                conversations=[row.conversation for row in rows]
+            )
+            await db.commit()
+            
+            last_call_id = rows[-1].call_id
+            logger.info(f"Análisis masivo: {processed} llamadas procesadas (hasta call_id {last_call_id})")
+            if on_batch is not None:
+                on_batch(processed, last_call_id)
+            
+            if len(rows) < batch_size:
+                break
+        
+        return {
+            "processed": processed,
+            "last_call_id": last_call_id
+        }
+
+
+# Instancia compartida (el pool de procesos se cierra en el shutdown de la app)
+conversation_analysis_service = ConversationAnalysisService()
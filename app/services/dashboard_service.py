@@ -1,7 +1,7 @@
 from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from datetime import date, datetime, time, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, select
 from loguru import logger
 
 from app.models.calls import Call
@@ -13,30 +13,41 @@ from app.models.clients import Client
 class DashboardService:
     """Servicio para datos de dashboard"""
     
-    async def get_main_metrics(self, db: Session) -> Dict[str, Any]:
+    async def _count(self, db: AsyncSession, column, *criteria) -> int:
+        """Contar filas que cumplen los criterios dados"""
+        query = select(func.count(column))
+        if criteria:
+            query = query.where(*criteria)
+        return (await db.scalar(query)) or 0
+    
+    async def get_main_metrics(self, db: AsyncSession) -> Dict[str, Any]:
         """Obtener métricas principales"""
         today = datetime.now().date()
         
         # Métricas básicas
-        total_calls_today = db.query(Call).filter(Call.call_date == today).count()
-        total_tickets_open = db.query(Ticket).filter(
+        total_calls_today = await self._count(db, Call.call_id, Call.call_date == today)
+        total_tickets_open = await self._count(
+            db,
+            Ticket.ticket_id,
             Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS])
-        ).count()
-        total_operators_active = db.query(Operator).count()
-        total_clients = db.query(Client).count()
+        )
+        total_operators_active = await self._count(db, Operator.operator_id)
+        total_clients = await self._count(db, Client.client_id)
         
         # Tasa de resolución de tickets
-        total_tickets = db.query(Ticket).count()
-        resolved_tickets = db.query(Ticket).filter(
-            Ticket.status == TicketStatus.RESOLVED
-        ).count()
+        total_tickets = await self._count(db, Ticket.ticket_id)
+        resolved_tickets = await self._count(
+            db, Ticket.ticket_id, Ticket.status == TicketStatus.RESOLVED
+        )
         
         resolution_rate = (resolved_tickets / total_tickets * 100) if total_tickets > 0 else 0
         
         # Duración promedio de llamadas
-        avg_duration = db.query(func.avg(Call.duration_seconds)).filter(
-            Call.duration_seconds.isnot(None)
-        ).scalar() or 0
+        avg_duration = await db.scalar(
+            select(func.avg(Call.duration_seconds)).where(
+                Call.duration_seconds.isnot(None)
+            )
+        ) or 0
         
         return {
             "total_calls_today": total_calls_today,
@@ -44,28 +55,33 @@ class DashboardService:
             "total_operators_active": total_operators_active,
             "total_clients": total_clients,
             "ticket_resolution_rate": round(resolution_rate, 2),
-            "average_call_duration": round(avg_duration, 2)
+            "average_call_duration": round(float(avg_duration), 2)
         }
     
     async def get_calls_by_date_chart(
         self, 
-        db: Session, 
-        days: int = 30
+        db: AsyncSession, 
+        days: int = 30,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
     ) -> Dict[str, Any]:
-        """Datos para gráfico de llamadas por fecha"""
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=days)
+        """Datos para gráfico de llamadas por fecha (por defecto, los últimos `days` días)"""
+        end_date = end_date or datetime.now().date()
+        start_date = start_date or end_date - timedelta(days=days)
+        days = (end_date - start_date).days
         
         # Consultar llamadas por fecha
-        calls_data = db.query(
-            Call.call_date,
-            func.count(Call.call_id).label('count')
-        ).filter(
-            and_(
-                Call.call_date >= start_date,
-                Call.call_date <= end_date
-            )
-        ).group_by(Call.call_date).order_by(Call.call_date).all()
+        calls_data = (await db.execute(
+            select(
+                Call.call_date,
+                func.count(Call.call_id).label('count')
+            ).where(
+                and_(
+                    Call.call_date >= start_date,
+                    Call.call_date <= end_date
+                )
+            ).group_by(Call.call_date).order_by(Call.call_date)
+        )).all()
         
         # Generar todas las fechas en el rango
         all_dates = []
@@ -87,12 +103,14 @@ class DashboardService:
             "title": f"Llamadas de los últimos {days} días"
         }
     
-    async def get_tickets_by_status_chart(self, db: Session) -> Dict[str, Any]:
+    async def get_tickets_by_status_chart(self, db: AsyncSession) -> Dict[str, Any]:
         """Datos para gráfico de tickets por estado"""
-        tickets_data = db.query(
-            Ticket.status,
-            func.count(Ticket.ticket_id).label('count')
-        ).group_by(Ticket.status).all()
+        tickets_data = (await db.execute(
+            select(
+                Ticket.status,
+                func.count(Ticket.ticket_id).label('count')
+            ).group_by(Ticket.status)
+        )).all()
         
         status_labels = {
             TicketStatus.OPEN: "Abierto",
@@ -125,16 +143,18 @@ class DashboardService:
             "title": "Distribución de Tickets por Estado"
         }
     
-    async def get_calls_by_operator_chart(self, db: Session) -> Dict[str, Any]:
+    async def get_calls_by_operator_chart(self, db: AsyncSession) -> Dict[str, Any]:
         """Datos para gráfico de llamadas por operador"""
-        calls_data = db.query(
-            Operator.name,
-            func.count(Call.call_id).label('count')
-        ).join(
-            Call, Call.operator_id == Operator.operator_id
-        ).group_by(Operator.name).order_by(
-            func.count(Call.call_id).desc()
-        ).all()
+        calls_data = (await db.execute(
+            select(
+                Operator.name,
+                func.count(Call.call_id).label('count')
+            ).join(
+                Call, Call.operator_id == Operator.operator_id
+            ).group_by(Operator.name).order_by(
+                func.count(Call.call_id).desc()
+            )
+        )).all()
         
         labels = [name for name, count in calls_data]
         data = [count for name, count in calls_data]
@@ -146,7 +166,7 @@ class DashboardService:
             "title": "Llamadas por Operador"
         }
     
-    async def get_real_time_data(self, db: Session) -> Dict[str, Any]:
+    async def get_real_time_data(self, db: AsyncSession) -> Dict[str, Any]:
         """Datos en tiempo real para dashboard"""
         now = datetime.now()
         today = now.date()
@@ -155,20 +175,26 @@ class DashboardService:
         active_calls = 0
         
         # Tickets pendientes
-        pending_tickets = db.query(Ticket).filter(
+        pending_tickets = await self._count(
+            db,
+            Ticket.ticket_id,
             Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS])
-        ).count()
+        )
         
         # Operadores online (simulado)
-        operators_online = db.query(Operator).count()
+        operators_online = await self._count(db, Operator.operator_id)
         
         # Llamadas de hoy
-        calls_today = db.query(Call).filter(Call.call_date == today).count()
+        calls_today = await self._count(db, Call.call_id, Call.call_date == today)
         
         # Tickets creados hoy
-        tickets_today = db.query(Ticket).filter(
-            func.date(Ticket.created_at) == today
-        ).count()
+        day_start = datetime.combine(today, time.min).astimezone()
+        tickets_today = await self._count(
+            db,
+            Ticket.ticket_id,
+            Ticket.created_at >= day_start,
+            Ticket.created_at < day_start + timedelta(days=1)
+        )
         
         return {
             "active_calls": active_calls,
@@ -181,64 +207,99 @@ class DashboardService:
     
     async def get_performance_summary(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         period_days: int = 7
     ) -> Dict[str, Any]:
-        """Resumen de rendimiento"""
+        """
+        Resumen de rendimiento
+        
+        Todo se calcula en una sola sentencia: los tiempos de resolución se
+        agregan en PostgreSQL (promedio y percentiles p50/p90/p99) con ROLLUP
+        por operador, así que la memoria no crece con los tickets resueltos.
+        Los filtros son rangos sobre las columnas timestamp para usar índices.
+        """
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=period_days)
         
-        # Llamadas en el período
-        calls_period = db.query(Call).filter(
-            and_(
-                Call.call_date >= start_date,
-                Call.call_date <= end_date
-            )
-        ).count()
+        # [inicio del primer día, inicio del día siguiente al último) en hora local
+        period_start = datetime.combine(start_date, time.min).astimezone()
+        period_end = datetime.combine(end_date + timedelta(days=1), time.min).astimezone()
         
-        # Tickets en el período
-        tickets_period = db.query(Ticket).filter(
-            and_(
-                func.date(Ticket.created_at) >= start_date,
-                func.date(Ticket.created_at) <= end_date
-            )
-        ).count()
+        calls_period = select(func.count(Call.call_id)).where(
+            Call.call_date >= start_date,
+            Call.call_date <= end_date
+        ).scalar_subquery()
         
-        # Tickets resueltos en el período
-        resolved_period = db.query(Ticket).filter(
-            and_(
-                func.date(Ticket.resolved_at) >= start_date,
-                func.date(Ticket.resolved_at) <= end_date
-            )
-        ).count()
-        
-        # Tiempo promedio de resolución
-        resolved_tickets = db.query(Ticket).filter(
-            and_(
-                Ticket.resolved_at.isnot(None),
-                func.date(Ticket.resolved_at) >= start_date,
-                func.date(Ticket.resolved_at) <= end_date
-            )
-        ).all()
-        
-        if resolved_tickets:
-            resolution_times = []
-            for ticket in resolved_tickets:
-                if ticket.resolved_at and ticket.created_at:
-                    delta = ticket.resolved_at - ticket.created_at
-                    resolution_times.append(delta.total_seconds() / 3600)  # Horas
-            
-            avg_resolution_time = sum(resolution_times) / len(resolution_times)
-        else:
-            avg_resolution_time = 0
+        tickets_period = select(func.count(Ticket.ticket_id)).where(
+            Ticket.created_at >= period_start,
+            Ticket.created_at < period_end
+        ).scalar_subquery()
+        
+        resolved = select(
+            Ticket.assigned_operator_id.label("operator_id"),
+            (func.date_part("epoch", Ticket.resolved_at - Ticket.created_at) / 3600).label("hours")
+        ).where(
+            Ticket.resolved_at >= period_start,
+            Ticket.resolved_at < period_end
+        ).cte("resolved")
+        
+        hours = resolved.c.hours
+        by_operator = select(
+            func.grouping(resolved.c.operator_id).label("is_total"),
+            resolved.c.operator_id,
+            func.count().label("resolved"),
+            func.avg(hours).label("avg_hours"),
+            func.percentile_cont(0.5).within_group(hours).label("p50_hours"),
+            func.percentile_cont(0.9).within_group(hours).label("p90_hours"),
+            func.percentile_cont(0.99).within_group(hours).label("p99_hours")
+        ).group_by(func.rollup(resolved.c.operator_id)).subquery("by_operator")
+        
+        rows = (await db.execute(
+            select(
+                by_operator,
+                Operator.name.label("operator_name"),
+                calls_period.label("calls_period"),
+                tickets_period.label("tickets_period")
+            ).join(
+                Operator, Operator.operator_id == by_operator.c.operator_id, isouter=True
+            ).order_by(by_operator.c.is_total.desc(), by_operator.c.resolved.desc())
+        )).all()
+        
+        # La fila de ROLLUP (is_total = 1) siempre existe, aun sin tickets resueltos
+        total = rows[0]
+        calls_count = total.calls_period or 0
+        tickets_count = total.tickets_period or 0
+        resolved_count = total.resolved
         
         return {
             "period_days": period_days,
-            "calls_period": calls_period,
-            "tickets_period": tickets_period,
-            "resolved_period": resolved_period,
-            "resolution_rate": (resolved_period / tickets_period * 100) if tickets_period > 0 else 0,
-            "avg_resolution_time_hours": round(avg_resolution_time, 2),
-            "daily_average_calls": round(calls_period / period_days, 1),
-            "daily_average_tickets": round(tickets_period / period_days, 1)
+            "calls_period": calls_count,
+            "tickets_period": tickets_count,
+            "resolved_period": resolved_count,
+            "resolution_rate": (resolved_count / tickets_count * 100) if tickets_count > 0 else 0,
+            "avg_resolution_time_hours": _round_hours(total.avg_hours) or 0,
+            "resolution_time_percentiles_hours": {
+                "p50": _round_hours(total.p50_hours),
+                "p90": _round_hours(total.p90_hours),
+                "p99": _round_hours(total.p99_hours)
+            },
+            "operators": [
+                {
+                    "operator_id": row.operator_id,
+                    "operator_name": row.operator_name or "Sin asignar",
+                    "resolved": row.resolved,
+                    "avg_resolution_time_hours": _round_hours(row.avg_hours),
+                    "p50_hours": _round_hours(row.p50_hours),
+                    "p90_hours": _round_hours(row.p90_hours),
+                    "p99_hours": _round_hours(row.p99_hours)
+                }
+                for row in rows[1:]
+            ],
+            "daily_average_calls": round(calls_count / period_days, 1),
+            "daily_average_tickets": round(tickets_count / period_days, 1)
         }
+
+
+def _round_hours(value: Optional[float]) -> Optional[float]:
+    """Redondear horas a dos decimales conservando None"""
+    return round(float(value), 2) if value is not None else None
@@ -1,12 +1,18 @@
-import smtplib
+import asyncio
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 from typing import List, Optional, Dict, Any
-from jinja2 import Template
 from loguru import logger
 from app.config.settings import settings
+from app.core.smtp_pool import SMTPConnectionPool
+from app.services.email_templates import TemplateNotFoundError, email_template_registry
+
+
+def _read_file(file_path: str) -> bytes:
+    with open(file_path, "rb") as attachment:
+        return attachment.read()
 
 
 class EmailService:
@@ -18,6 +24,17 @@ class EmailService:
         self.smtp_user = settings.SMTP_USER
         self.smtp_password = settings.SMTP_PASSWORD
         self.email_from = settings.EMAIL_FROM
+        self.pool = SMTPConnectionPool(
+            hostname=self.smtp_server,
+            port=self.smtp_port,
+            username=self.smtp_user,
+            password=self.smtp_password,
+            start_tls=settings.SMTP_START_TLS,
+            size=settings.SMTP_POOL_SIZE,
+            timeout=settings.SMTP_TIMEOUT_SECONDS,
+            max_messages_per_connection=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+            idle_timeout=settings.SMTP_IDLE_TIMEOUT_SECONDS
+        )
     
     async def send_email(
         self,
@@ -31,30 +48,7 @@ class EmailService:
     ) -> bool:
         """Enviar email"""
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.email_from
-            msg['To'] = ", ".join(to_emails)
-            msg['Subject'] = subject
-            
-            if cc_emails:
-                msg['Cc'] = ", ".join(cc_emails)
-            
-            # Agregar cuerpo del mensaje
-            msg.attach(MIMEText(body, 'html' if is_html else 'plain', 'utf-8'))
-            
-            # Agregar archivos adjuntos
-            if attachments:
-                for file_path in attachments:
-                    await self._attach_file(msg, file_path)
-            
-            # Enviar email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                
-                all_recipients = to_emails + (cc_emails or []) + (bcc_emails or [])
-                server.send_message(msg, to_addrs=all_recipients)
-            
+            await self.deliver(to_emails, subject, body, is_html, cc_emails, bcc_emails, attachments)
             logger.info(f"Email enviado exitosamente a {to_emails}")
             return True
             
@@ -62,12 +56,42 @@ class EmailService:
             logger.error(f"Error enviando email: {str(e)}")
             return False
     
+    async def deliver(
+        self,
+        to_emails: List[str],
+        subject: str,
+        body: str,
+        is_html: bool = False,
+        cc_emails: Optional[List[str]] = None,
+        bcc_emails: Optional[List[str]] = None,
+        attachments: Optional[List[str]] = None
+    ):
+        """Enviar email propagando el error (para quien reintenta, como el outbox)"""
+        msg = MIMEMultipart()
+        msg['From'] = self.email_from
+        msg['To'] = ", ".join(to_emails)
+        msg['Subject'] = subject
+        
+        if cc_emails:
+            msg['Cc'] = ", ".join(cc_emails)
+        
+        # Agregar cuerpo del mensaje
+        msg.attach(MIMEText(body, 'html' if is_html else 'plain', 'utf-8'))
+        
+        # Agregar archivos adjuntos
+        if attachments:
+            for file_path in attachments:
+                await self._attach_file(msg, file_path)
+        
+        # Enviar email por una conexión del pool (sin handshake por mensaje)
+        all_recipients = to_emails + (cc_emails or []) + (bcc_emails or [])
+        await self.pool.send_message(msg, all_recipients)
+    
     async def _attach_file(self, msg: MIMEMultipart, file_path: str):
         """Adjuntar archivo al email"""
         try:
-            with open(file_path, "rb") as attachment:
-                part = MIMEBase('application', 'octet-stream')
-                part.set_payload(attachment.read())
+            part = MIMEBase('application', 'octet-stream')
+            part.set_payload(await asyncio.to_thread(_read_file, file_path))
             
             encoders.encode_base64(part)
             part.add_header(
@@ -85,50 +109,13 @@ class EmailService:
         recipient_email: str,
         template_type: str = "ticket_created"
     ) -> bool:
-        """Enviar notificación de ticket"""
-        templates = {
-            "ticket_created": {
-                "subject": "Nuevo Ticket Creado - #{ticket_id}",
-                "body": """
-                <h2>Nuevo Ticket Creado</h2>
-                <p><strong>Ticket ID:</strong> #{ticket_id}</p>
-                <p><strong>Título:</strong> {title}</p>
-                <p><strong>Prioridad:</strong> {priority}</p>
-                <p><strong>Descripción:</strong></p>
-                <p>{description}</p>
-                <p><strong>Fecha de creación:</strong> {created_at}</p>
-                """
-            },
-            "ticket_assigned": {
-                "subject": "Ticket Asignado - #{ticket_id}",
-                "body": """
-                <h2>Ticket Asignado</h2>
-                <p>Se le ha asignado un nuevo ticket:</p>
-                <p><strong>Ticket ID:</strong> #{ticket_id}</p>
-                <p><strong>Título:</strong> {title}</p>
-                <p><strong>Prioridad:</strong> {priority}</p>
-                """
-            },
-            "ticket_resolved": {
-                "subject": "Ticket Resuelto - #{ticket_id}",
-                "body": """
-                <h2>Ticket Resuelto</h2>
-                <p>Su ticket ha sido resuelto:</p>
-                <p><strong>Ticket ID:</strong> #{ticket_id}</p>
-                <p><strong>Título:</strong> {title}</p>
-                <p><strong>Fecha de resolución:</strong> {resolved_at}</p>
-                """
-            }
-        }
-        
-        if template_type not in templates:
+        """Enviar notificación de ticket (`template_type` admite `nombre@vN`)"""
+        try:
+            subject, body = email_template_registry.render(template_type, ticket_data)
+        except TemplateNotFoundError:
             logger.error(f"Template de email no encontrado: {template_type}")
             return False
         
-        template = templates[template_type]
-        subject = Template(template["subject"]).render(**ticket_data)
-        body = Template(template["body"]).render(**ticket_data)
-        
         return await self.send_email(
             to_emails=[recipient_email],
             subject=subject,
@@ -141,26 +128,36 @@ class EmailService:
         recipients: List[str],
         subject: str,
         template: str,
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        recipient_contexts: Optional[Dict[str, Dict[str, Any]]] = None
     ) -> Dict[str, int]:
-        """Enviar notificación masiva"""
+        """
+        Enviar notificación masiva
+        
+        La plantilla se compila una vez; `recipient_contexts` agrega datos
+        propios de cada destinatario al contexto común. Un mensaje por
+        destinatario, con tantos envíos en paralelo como conexiones tiene el pool.
+        """
         results = {"sent": 0, "failed": 0}
         
-        body = Template(template).render(**context)
+        compiled = email_template_registry.from_string(template)
+        shared_body = None if recipient_contexts else compiled.render(context)
+        pending = iter(recipients)
         
-        for email in recipients:
-            success = await self.send_email(
-                to_emails=[email],
-                subject=subject,
-                body=body,
-                is_html=True
-            )
-            
-            if success:
-                results["sent"] += 1
-            else:
-                results["failed"] += 1
+        async def worker():
+            for email in pending:
+                body = shared_body
+                if body is None:
+                    body = compiled.render({**context, **recipient_contexts.get(email, {})})
+                success = await self.send_email(
+                    to_emails=[email],
+                    subject=subject,
+                    body=body,
+                    is_html=True
+                )
+                results["sent" if success else "failed"] += 1
         
+        await asyncio.gather(*(worker() for _ in range(min(self.pool.size, len(recipients)))))
         return results
     
     async def send_report_email(
@@ -171,24 +168,10 @@ class EmailService:
         summary: Dict[str, Any]
     ) -> bool:
         """Enviar reporte por email"""
-        subject = f"Reporte: {report_name}"
-        
-        body = f"""
-        <h2>Reporte Generado</h2>
-        <p><strong>Nombre:</strong> {report_name}</p>
-        <p><strong>Fecha de generación:</strong> {summary.get('generated_at', 'N/A')}</p>
-        <p><strong>Resumen:</strong></p>
-        <ul>
-        """
-        
-        for key, value in summary.items():
-            if key != 'generated_at':
-                body += f"<li><strong>{key}:</strong> {value}</li>"
-        
-        body += """
-        </ul>
-        <p>El reporte completo se encuentra adjunto.</p>
-        """
+        subject, body = email_template_registry.render(
+            "report_ready",
+            {"report_name": report_name, "summary": summary}
+        )
         
         return await self.send_email(
             to_emails=[recipient_email],
@@ -197,3 +180,11 @@ class EmailService:
             is_html=True,
             attachments=[report_path]
         )
+    
+    async def close(self):
+        """Cerrar las conexiones SMTP del pool (shutdown)"""
+        await self.pool.close()
+
+
+# Instancia compartida (sus conexiones se cierran en el shutdown de la app)
+email_service = EmailService()
@@ -0,0 +1,127 @@
+"""
+✉️ Registro de plantillas de email precompiladas
+
+Las plantillas viven en EMAIL_TEMPLATES_DIR con nombres versionados:
+
+    ticket_created.v1.subject.txt   (asunto)
+    ticket_created.v1.html          (cuerpo)
+
+Se compilan una sola vez al arrancar en un `jinja2.Environment` compartido
+con caché de bytecode, así que el siguiente arranque ni siquiera vuelve a
+parsearlas. `render("ticket_created", ...)` usa la versión más reciente y
+`render("ticket_created@v1", ...)` fija una versión.
+"""
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
+from loguru import logger
+
+from app.config.settings import settings
+from app.core.cache import TTLCache
+
+
+TEMPLATE_FILE_PATTERN = re.compile(r"^(?P<name>[a-z0-9_]+)\.v(?P<version>\d+)\.(?P<part>subject\.txt|html)$")
+
+
+class TemplateNotFoundError(KeyError):
+    """Plantilla (o versión) que no existe en el registro"""
+
+
+@dataclass(frozen=True)
+class EmailTemplate:
+    """Asunto y cuerpo compilados de una versión de plantilla"""
+    name: str
+    version: int
+    subject: Template
+    body: Template
+    
+    def render(self, context: Dict[str, Any]) -> Tuple[str, str]:
+        return self.subject.render(context).strip(), self.body.render(context)
+
+
+class EmailTemplateRegistry:
+    """Plantillas compiladas una vez y renderizadas por destinatario"""
+    
+    def __init__(self, templates_dir: str, bytecode_cache_dir: Optional[str] = None):
+        self.templates_dir = templates_dir
+        if bytecode_cache_dir:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+        self.environment = Environment(
+            loader=FileSystemLoader(templates_dir),
+            bytecode_cache=FileSystemBytecodeCache(bytecode_cache_dir),
+            autoescape=select_autoescape(["html"]),
+            auto_reload=False
+        )
+        self._templates: Dict[Tuple[str, int], EmailTemplate] = {}
+        self._latest: Dict[str, int] = {}
+        # Plantillas ad hoc (envíos masivos) compiladas por hash de su texto
+        self._inline = TTLCache(maxsize=128)
+        self.loaded = False
+    
+    def load(self):
+        """Compilar todas las plantillas del directorio (startup)"""
+        parts: Dict[Tuple[str, int], Dict[str, str]] = {}
+        for filename in sorted(os.listdir(self.templates_dir)):
+            match = TEMPLATE_FILE_PATTERN.match(filename)
+            if match:
+                key = (match["name"], int(match["version"]))
+                parts.setdefault(key, {})[match["part"]] = filename
+        
+        templates, latest = {}, {}
+        for (name, version), files in parts.items():
+            if set(files) != {"subject.txt", "html"}:
+                logger.warning(f"Plantilla de email incompleta: {name}.v{version} ({', '.join(files)})")
+                continue
+            templates[(name, version)] = EmailTemplate(
+                name=name,
+                version=version,
+                subject=self.environment.get_template(files["subject.txt"]),
+                body=self.environment.get_template(files["html"])
+            )
+            latest[name] = max(version, latest.get(name, 0))
+        
+        self._templates, self._latest = templates, latest
+        self.loaded = True
+        logger.info(f"✉️ {len(templates)} plantillas de email compiladas")
+    
+    def get(self, template_name: str) -> EmailTemplate:
+        """`nombre` (última versión) o `nombre@vN`"""
+        if not self.loaded:
+            self.load()
+        
+        name, _, version = template_name.partition("@")
+        try:
+            key = (name, int(version.lstrip("v")) if version else self._latest[name])
+            return self._templates[key]
+        except (KeyError, ValueError):
+            raise TemplateNotFoundError(template_name) from None
+    
+    def render(self, template_name: str, context: Dict[str, Any]) -> Tuple[str, str]:
+        """Renderizar (asunto, cuerpo) sin recompilar"""
+        return self.get(template_name).render(context)
+    
+    def from_string(self, source: str) -> Template:
+        """Compilar una plantilla en texto una sola vez (por contenido)"""
+        key = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        template = self._inline.get(key)
+        if template is None:
+            template = self.environment.from_string(source)
+            self._inline.set(key, template)
+        return template
+    
+    def versions(self) -> Dict[str, int]:
+        """Versión vigente de cada plantilla"""
+        if not self.loaded:
+            self.load()
+        return dict(self._latest)
+
+
+# Registro compartido (se carga en el startup de la app)
+email_template_registry = EmailTemplateRegistry(
+    settings.EMAIL_TEMPLATES_DIR,
+    settings.EMAIL_TEMPLATE_BYTECODE_DIR
+)
@@ -0,0 +1,261 @@
+"""
+📬 Outbox de notificaciones respaldado por `uanl.notifications`
+
+- `enqueue` agrega la notificación a la sesión del llamador: se guarda en la
+  misma transacción que el ticket (o se pierde con su rollback) y la
+  solicitud no espera al servidor SMTP.
+- Un dispatcher asyncio toma lotes con `FOR UPDATE SKIP LOCKED`, así que
+  varias instancias pueden compartir el outbox sin enviar dos veces la misma
+  fila, y los envía en paralelo por el pool SMTP.
+- Los fallos se reintentan con backoff exponencial hasta
+  NOTIFICATION_MAX_ATTEMPTS; las filas que quedan en 'sending' por una
+  instancia caída se vuelven a tomar después de NOTIFICATION_LEASE_SECONDS
+  (entrega al menos una vez).
+"""
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import database
+from app.config.settings import settings
+from app.models.clients import Client
+from app.models.notifications import Notification
+from app.models.operators import Operator
+from app.services.email_service import EmailService, email_service
+from app.services.email_templates import email_template_registry
+
+
+# Tabla de la que sale el email de cada tipo de destinatario
+RECIPIENT_MODELS = {
+    "client": (Client, Client.client_id),
+    "operator": (Operator, Operator.operator_id)
+}
+
+
+class PermanentDeliveryError(Exception):
+    """Fallo que no se arregla reintentando (sin dirección, canal no soportado)"""
+
+
+class NotificationOutbox:
+    """Outbox transaccional de notificaciones con un dispatcher en segundo plano"""
+    
+    def __init__(
+        self,
+        sender: EmailService,
+        batch_size: int = settings.NOTIFICATION_BATCH_SIZE,
+        poll_interval_seconds: float = settings.NOTIFICATION_POLL_INTERVAL_SECONDS,
+        max_attempts: int = settings.NOTIFICATION_MAX_ATTEMPTS,
+        retry_base_seconds: float = settings.NOTIFICATION_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = settings.NOTIFICATION_RETRY_MAX_SECONDS,
+        lease_seconds: int = settings.NOTIFICATION_LEASE_SECONDS
+    ):
+        self.sender = sender
+        self.batch_size = batch_size
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.lease_seconds = lease_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+    
+    def enqueue(
+        self,
+        db: AsyncSession,
+        recipient_type: str,
+        recipient_id: int,
+        title: str,
+        message: str,
+        notification_type: str = "email"
+    ) -> Notification:
+        """Agregar una notificación a la transacción del llamador (no hace commit)"""
+        notification = Notification(
+            recipient_type=recipient_type,
+            recipient_id=recipient_id,
+            notification_type=notification_type,
+            title=title[:255],
+            message=message,
+            status="pending",
+            attempts=0
+        )
+        db.add(notification)
+        return notification
+    
+    def enqueue_template(
+        self,
+        db: AsyncSession,
+        recipient_type: str,
+        recipient_id: int,
+        template_name: str,
+        context: Dict[str, Any]
+    ) -> Notification:
+        """Renderizar una plantilla de email y encolarla"""
+        subject, body = email_template_registry.render(template_name, context)
+        return self.enqueue(db, recipient_type, recipient_id, subject, body)
+    
+    def wake(self):
+        """Avisar al dispatcher que hay notificaciones nuevas (después del commit)"""
+        self._wakeup.set()
+    
+    def start(self):
+        """Arrancar el dispatcher (idempotente)"""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._dispatcher(), name="notification-dispatcher")
+        logger.info("📬 Dispatcher de notificaciones iniciado")
+    
+    async def stop(self):
+        """Detener el dispatcher; lo que estaba en 'sending' se retoma al vencer el lease"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+    
+    async def _dispatcher(self):
+        while True:
+            # Se limpia antes de buscar para no perder un aviso que llegue durante la búsqueda
+            self._wakeup.clear()
+            try:
+                if await self.dispatch_batch() == self.batch_size:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error en el dispatcher de notificaciones: {e}")
+            
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def dispatch_batch(self) -> int:
+        """Tomar, enviar y registrar un lote; regresa cuántas notificaciones tomó"""
+        claimed = await self._claim_batch()
+        if not claimed:
+            return 0
+        
+        addresses = await self._resolve_addresses(claimed)
+        errors = await asyncio.gather(
+            *(self._deliver(notification, addresses) for notification in claimed),
+            return_exceptions=True
+        )
+        await self._record(claimed, errors)
+        return len(claimed)
+    
+    async def _claim_batch(self) -> List[Notification]:
+        """Marcar un lote vencido como 'sending' en una sola sentencia, sin bloquear a otros dispatchers"""
+        due = select(Notification.notification_id).where(
+            Notification.status.in_(("pending", "sending")),
+            Notification.next_attempt_at <= func.now()
+        ).order_by(
+            Notification.next_attempt_at, Notification.notification_id
+        ).limit(self.batch_size).with_for_update(skip_locked=True).scalar_subquery()
+        
+        async with database.get_async_session_factory()() as db:
+            result = await db.execute(
+                update(Notification).where(
+                    Notification.notification_id.in_(due)
+                ).values(
+                    status="sending",
+                    attempts=Notification.attempts + 1,
+                    next_attempt_at=func.now() + timedelta(seconds=self.lease_seconds)
+                ).returning(Notification).execution_options(synchronize_session=False)
+            )
+            claimed = list(result.scalars())
+            await db.commit()
+            return claimed
+    
+    async def _resolve_addresses(self, notifications: List[Notification]) -> Dict[tuple, Optional[str]]:
+        """Emails de los destinatarios del lote (una consulta por tipo)"""
+        wanted: Dict[str, set] = {}
+        for notification in notifications:
+            wanted.setdefault(notification.recipient_type, set()).add(notification.recipient_id)
+        
+        addresses = {}
+        async with database.get_async_session_factory()() as db:
+            for recipient_type, recipient_ids in wanted.items():
+                if recipient_type not in RECIPIENT_MODELS:
+                    continue
+                model, id_column = RECIPIENT_MODELS[recipient_type]
+                rows = await db.execute(select(id_column, model.email).where(id_column.in_(recipient_ids)))
+                for recipient_id, email in rows:
+                    addresses[(recipient_type, recipient_id)] = email
+        return addresses
+    
+    async def _deliver(self, notification: Notification, addresses: Dict[tuple, Optional[str]]):
+        if notification.notification_type != "email":
+            raise PermanentDeliveryError(f"Canal no soportado: {notification.notification_type}")
+        
+        email = addresses.get((notification.recipient_type, notification.recipient_id))
+        if not email:
+            raise PermanentDeliveryError(
+                f"Destinatario sin email: {notification.recipient_type} {notification.recipient_id}"
+            )
+        
+        await self.sender.deliver([email], notification.title, notification.message, is_html=True)
+    
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempts - 1))
+        # Jitter para que un lote fallido no vuelva a chocar al mismo tiempo
+        return delay * random.uniform(0.8, 1.2)
+    
+    async def _record(self, notifications: List[Notification], errors: List[Optional[BaseException]]):
+        """
+        Guardar el resultado de todo el lote en un solo UPDATE por llave primaria
+        
+        Todas las filas llevan las mismas columnas para que SQLAlchemy las
+        mande juntas como un executemany (un grupo por conjunto de columnas).
+        """
+        now = datetime.now().astimezone()
+        changes = []
+        for notification, error in zip(notifications, errors):
+            change = {
+                "notification_id": notification.notification_id,
+                "sent_at": None,
+                "next_attempt_at": notification.next_attempt_at,
+                "last_error": str(error) if error is not None else None
+            }
+            if error is None:
+                change.update(status="sent", sent_at=now)
+                self.sent += 1
+            elif isinstance(error, PermanentDeliveryError) or notification.attempts >= self.max_attempts:
+                change["status"] = "failed"
+                self.failed += 1
+                logger.error(f"📬 Notificación {notification.notification_id} fallida: {error}")
+            else:
+                change.update(
+                    status="pending",
+                    next_attempt_at=now + timedelta(seconds=self._retry_delay(notification.attempts))
+                )
+                self.retried += 1
+                logger.warning(
+                    f"📬 Notificación {notification.notification_id} reintentará "
+                    f"(intento {notification.attempts}/{self.max_attempts}): {error}"
+                )
+            changes.append(change)
+        
+        async with database.get_async_session_factory()() as db:
+            await db.execute(update(Notification), changes)
+            await db.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed
+        }
+
+
+# Instancia compartida (se arranca y detiene en el ciclo de vida de la app)
+notification_outbox = NotificationOutbox(email_service)
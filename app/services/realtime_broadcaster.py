@@ -0,0 +1,137 @@
+"""
+📡 Difusión de datos en tiempo real para dashboards
+
+Un único productor calcula la foto de `DashboardService.get_real_time_data`
+en cada tick y la reparte a todos los dashboards conectados (SSE o
+WebSocket). Solo se envían los campos que cambiaron, así que la carga en la
+base de datos no depende del número de espectadores.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from loguru import logger
+
+from app.config import database
+from app.config.settings import settings
+from app.services.dashboard_service import DashboardService
+from app.utils.helpers import safe_json_dumps
+
+
+# Campos que cambian en cada tick y no cuentan como cambio por sí solos
+VOLATILE_FIELDS = ("last_updated",)
+
+
+class _Subscriber:
+    """Cola acotada de mensajes ya serializados para un dashboard conectado"""
+    
+    def __init__(self, maxsize: int):
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=maxsize)
+    
+    def push(self, message: str, resync_message: Optional[str]):
+        if self.queue.full():
+            # Cliente lento: se descartan sus deltas pendientes y se le reenvía la foto completa
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            if resync_message is not None:
+                self.queue.put_nowait(resync_message)
+            return
+        self.queue.put_nowait(message)
+
+
+class RealTimeBroadcaster:
+    """Productor único de la foto en tiempo real con reparto por deltas"""
+    
+    def __init__(
+        self,
+        dashboard_service: DashboardService,
+        interval_seconds: float = settings.DASHBOARD_STREAM_INTERVAL_SECONDS,
+        queue_size: int = 32
+    ):
+        self.dashboard_service = dashboard_service
+        self.interval_seconds = interval_seconds
+        self.queue_size = queue_size
+        self._subscribers: Set[_Subscriber] = set()
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_message: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self.ticks = 0
+        self.messages_sent = 0
+    
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator["asyncio.Queue[str]"]:
+        """Registrar un dashboard; el productor arranca con el primer suscriptor"""
+        subscriber = _Subscriber(self.queue_size)
+        if self._snapshot_message is not None:
+            subscriber.push(self._snapshot_message, None)
+        
+        self._subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._produce(), name="dashboard-real-time-producer")
+        try:
+            yield subscriber.queue
+        finally:
+            self._subscribers.discard(subscriber)
+    
+    async def _produce(self):
+        """Calcular la foto una vez por tick mientras haya suscriptores"""
+        logger.info("📡 Productor de tiempo real iniciado")
+        while self._subscribers:
+            try:
+                await self._tick()
+            except Exception as e:
+                logger.error(f"Error calculando datos en tiempo real: {e}")
+            await asyncio.sleep(self.interval_seconds)
+        logger.info("📡 Productor de tiempo real detenido (sin suscriptores)")
+    
+    async def _tick(self):
+        async with database.get_async_session_factory()() as db:
+            snapshot = await self.dashboard_service.get_real_time_data(db)
+        self.ticks += 1
+        
+        previous = self._snapshot
+        self._snapshot = snapshot
+        self._snapshot_message = safe_json_dumps({"type": "snapshot", "data": snapshot})
+        
+        if previous is None:
+            message = self._snapshot_message
+        else:
+            changes = {
+                field: value for field, value in snapshot.items()
+                if field not in VOLATILE_FIELDS and previous.get(field) != value
+            }
+            if not changes:
+                return
+            for field in VOLATILE_FIELDS:
+                if field in snapshot:
+                    changes[field] = snapshot[field]
+            message = safe_json_dumps({"type": "delta", "data": changes})
+        
+        # Se serializa una vez y el mismo texto se reparte a todos
+        for subscriber in list(self._subscribers):
+            subscriber.push(message, self._snapshot_message)
+        self.messages_sent += len(self._subscribers)
+    
+    async def stop(self):
+        """Detener el productor (shutdown de la app)"""
+        self._subscribers.clear()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "interval_seconds": self.interval_seconds,
+            "producer_running": self._task is not None and not self._task.done(),
+            "ticks": self.ticks,
+            "messages_sent": self.messages_sent
+        }
+
+
+# Instancia compartida (se detiene en el shutdown de la app)
+real_time_broadcaster = RealTimeBroadcaster(DashboardService())
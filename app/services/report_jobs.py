@@ -0,0 +1,262 @@
+"""
+🗂️ Motor de trabajos de reportes respaldado por `uanl.reports`
+
+- `submit` inserta la fila del trabajo (status='queued') y regresa de
+  inmediato; si ya existe un trabajo con los mismos parámetros pendiente o
+  terminado dentro de la ventana de deduplicación, se reutiliza.
+- Un pool de workers asyncio dentro de la app toma trabajos con
+  `FOR UPDATE SKIP LOCKED`, así que varias instancias pueden compartir la
+  cola sin procesar dos veces el mismo reporte.
+- Los trabajos que quedan en 'generating' por una instancia caída se vuelven
+  a tomar después de REPORT_JOB_TIMEOUT_SECONDS.
+"""
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import database
+from app.config.settings import settings
+from app.models.reports import Report
+from app.services.report_service import ReportService, report_service
+
+
+REPORT_NAMES = {
+    "calls": "Reporte de llamadas",
+    "tickets": "Reporte de tickets"
+}
+
+# Filtros válidos por tipo de reporte (los demás se ignoran al canonizar)
+REPORT_FILTERS = {
+    "calls": ("start_date", "end_date", "operator_id", "client_id"),
+    "tickets": ("start_date", "end_date", "status", "priority")
+}
+
+
+def canonical_parameters(report_type: str, file_format: str, filters: Dict[str, Any]) -> str:
+    """JSON canónico (llaves ordenadas, sin filtros vacíos) que identifica un reporte"""
+    relevant = {
+        key: value for key, value in filters.items()
+        if key in REPORT_FILTERS[report_type] and value is not None
+    }
+    return json.dumps(
+        {"report_type": report_type, "format": file_format, "filters": relevant},
+        sort_keys=True,
+        default=str,
+        ensure_ascii=False
+    )
+
+
+def _parse_filters(parameters: str) -> Dict[str, Any]:
+    """Recuperar los filtros guardados (las fechas vuelven a ser `date`)"""
+    filters = json.loads(parameters)["filters"]
+    for key in ("start_date", "end_date"):
+        if filters.get(key):
+            filters[key] = datetime.strptime(filters[key], "%Y-%m-%d").date()
+    return filters
+
+
+def _remove_partial(path: str):
+    """Borrar el archivo a medio escribir de un trabajo interrumpido"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class ReportJobEngine:
+    """Cola de reportes en base de datos con un pool de workers asyncio"""
+    
+    def __init__(
+        self,
+        reports: ReportService,
+        workers: int = settings.REPORT_WORKERS,
+        poll_interval_seconds: float = settings.REPORT_POLL_INTERVAL_SECONDS,
+        dedup_window_seconds: int = settings.REPORT_DEDUP_WINDOW_SECONDS,
+        job_timeout_seconds: int = settings.REPORT_JOB_TIMEOUT_SECONDS,
+        reports_dir: str = settings.REPORTS_DIR
+    ):
+        self.reports = reports
+        self.workers = workers
+        self.poll_interval_seconds = poll_interval_seconds
+        self.dedup_window_seconds = dedup_window_seconds
+        self.job_timeout_seconds = job_timeout_seconds
+        self.reports_dir = reports_dir
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self.completed = 0
+        self.failed = 0
+    
+    async def submit(
+        self,
+        db: AsyncSession,
+        report_type: str,
+        file_format: str,
+        filters: Dict[str, Any],
+        generated_by: Optional[int] = None
+    ) -> Tuple[Report, bool]:
+        """
+        Encolar un reporte y devolver (trabajo, deduplicado)
+        
+        Un candado de transacción por hash de parámetros evita que dos
+        solicitudes idénticas simultáneas creen dos trabajos.
+        """
+        parameters = canonical_parameters(report_type, file_format, filters)
+        parameters_hash = hashlib.sha256(parameters.encode("utf-8")).hexdigest()
+        
+        await db.execute(
+            select(func.pg_advisory_xact_lock(func.hashtext(parameters_hash)))
+        )
+        
+        window_start = datetime.now().astimezone() - timedelta(seconds=self.dedup_window_seconds)
+        existing = (await db.execute(
+            select(Report).where(
+                Report.parameters_hash == parameters_hash,
+                or_(
+                    Report.status.in_(("queued", "generating")),
+                    (Report.status == "completed") & (Report.completed_at >= window_start)
+                )
+            ).order_by(Report.report_id.desc()).limit(1)
+        )).scalar_one_or_none()
+        
+        if existing is not None and (
+            existing.status != "completed" or (existing.file_path and os.path.exists(existing.file_path))
+        ):
+            await db.commit()
+            return existing, True
+        
+        report = Report(
+            report_type=report_type,
+            report_name=f"{REPORT_NAMES[report_type]} ({datetime.now():%Y-%m-%d %H:%M})",
+            parameters=parameters,
+            parameters_hash=parameters_hash,
+            file_format=file_format,
+            generated_by=generated_by,
+            status="queued"
+        )
+        db.add(report)
+        await db.commit()
+        await db.refresh(report)
+        
+        self._wakeup.set()
+        logger.info(f"🗂️ Reporte {report.report_id} encolado ({report_type}/{file_format})")
+        return report, False
+    
+    async def get(self, db: AsyncSession, report_id: int) -> Optional[Report]:
+        return await db.get(Report, report_id)
+    
+    def start(self):
+        """Arrancar el pool de workers (idempotente)"""
+        if any(not task.done() for task in self._tasks):
+            return
+        os.makedirs(self.reports_dir, exist_ok=True)
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"report-worker-{index}")
+            for index in range(self.workers)
+        ]
+        logger.info(f"🗂️ Pool de reportes iniciado ({self.workers} workers)")
+    
+    async def stop(self):
+        """Cancelar los workers; los trabajos en curso vuelven a la cola"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    async def _worker(self):
+        while True:
+            # Se limpia antes de buscar para no perder un aviso que llegue durante la búsqueda
+            self._wakeup.clear()
+            try:
+                report_id = await self._claim_next()
+                if report_id is not None:
+                    await self._run(report_id)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error en el worker de reportes: {e}")
+            
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _claim_next(self) -> Optional[int]:
+        """Tomar el siguiente trabajo pendiente (o abandonado) sin bloquear a otros workers"""
+        abandoned_before = datetime.now().astimezone() - timedelta(seconds=self.job_timeout_seconds)
+        
+        async with database.get_async_session_factory()() as db:
+            report = (await db.execute(
+                select(Report).where(
+                    or_(
+                        Report.status == "queued",
+                        (Report.status == "generating") & (Report.started_at < abandoned_before)
+                    )
+                ).order_by(Report.report_id).limit(1).with_for_update(skip_locked=True)
+            )).scalar_one_or_none()
+            if report is None:
+                await db.rollback()
+                return None
+            
+            report.status = "generating"
+            report.started_at = func.now()
+            report.error_message = None
+            await db.commit()
+            return report.report_id
+    
+    async def _run(self, report_id: int):
+        """Generar el archivo de un trabajo ya tomado y registrar el resultado"""
+        async with database.get_async_session_factory()() as db:
+            report = await db.get(Report, report_id)
+            filters = _parse_filters(report.parameters)
+            path = os.path.join(self.reports_dir, f"reporte_{report.report_id}.{report.file_format}")
+            
+            try:
+                if report.file_format == "xlsx":
+                    row_count = await self.reports.write_xlsx(report.report_type, filters, path)
+                else:
+                    row_count = await self.reports.write_csv(report.report_type, filters, path)
+            except asyncio.CancelledError:
+                # Shutdown: el trabajo regresa a la cola para otro worker/instancia
+                _remove_partial(path)
+                report.status = "queued"
+                report.started_at = None
+                await asyncio.shield(db.commit())
+                raise
+            except Exception as e:
+                logger.error(f"Error generando reporte {report_id}: {e}")
+                _remove_partial(path)
+                report.status = "failed"
+                report.error_message = str(e)
+                report.completed_at = func.now()
+                await db.commit()
+                self.failed += 1
+                return
+            
+            report.status = "completed"
+            report.file_path = path
+            report.row_count = row_count
+            report.completed_at = func.now()
+            await db.commit()
+            self.completed += 1
+            logger.info(f"🗂️ Reporte {report_id} generado ({row_count} filas)")
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": sum(1 for task in self._tasks if not task.done()),
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+
+# Instancia compartida (se arranca y detiene en el ciclo de vida de la app)
+report_job_engine = ReportJobEngine(report_service)
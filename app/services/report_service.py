@@ -0,0 +1,341 @@
+"""
+📑 Servicio de reportes exportables (JSON, CSV y XLSX)
+
+Las filas se leen con un cursor del lado del servidor (`yield_per`) y se
+escriben por lotes: el CSV se emite lote por lote hacia la respuesta y el
+XLSX se arma con openpyxl en modo write-only. Ningún formato acumula el
+reporte completo en memoria.
+"""
+import asyncio
+import csv
+import io
+import os
+import tempfile
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from openpyxl import Workbook
+from sqlalchemy import func, select, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import database
+from app.models.calls import Call
+from app.models.clients import Client
+from app.models.operators import Operator
+from app.models.tickets import Ticket, TicketStatus, TicketPriority
+
+
+# Filas por lote del cursor del servidor (y por escritura hacia el cliente)
+STREAM_BATCH_SIZE = 2000
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+
+
+@dataclass(frozen=True)
+class ReportDefinition:
+    """Columnas, consulta de filas y consulta de resumen de un tipo de reporte"""
+    columns: Sequence[Tuple[str, str]]  # (llave, encabezado)
+    rows_query: Callable[[Dict[str, Any]], Select]
+    summary_query: Callable[[Dict[str, Any]], Select]
+    summarize: Callable[[Any], Dict[str, Any]]
+
+
+def _day_range(filters: Dict[str, Any]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Rango [inicio, fin) en hora local para filtrar columnas timestamp"""
+    start_date, end_date = filters.get("start_date"), filters.get("end_date")
+    start = datetime.combine(start_date, time.min).astimezone() if start_date else None
+    end = datetime.combine(end_date + timedelta(days=1), time.min).astimezone() if end_date else None
+    return start, end
+
+
+def _call_criteria(filters: Dict[str, Any]) -> List[Any]:
+    criteria = []
+    if filters.get("start_date"):
+        criteria.append(Call.call_date >= filters["start_date"])
+    if filters.get("end_date"):
+        criteria.append(Call.call_date <= filters["end_date"])
+    if filters.get("operator_id"):
+        criteria.append(Call.operator_id == filters["operator_id"])
+    if filters.get("client_id"):
+        criteria.append(Call.client_id == filters["client_id"])
+    return criteria
+
+
+def _calls_rows_query(filters: Dict[str, Any]) -> Select:
+    return select(
+        Call.call_id,
+        Call.call_label,
+        Call.call_date,
+        Operator.name.label("operator_name"),
+        Client.external_ref.label("client_ref"),
+        Call.duration_seconds,
+        Call.sentimiento,
+        Call.impacto,
+        Call.urgencia,
+        Call.tema
+    ).join(
+        Operator, Operator.operator_id == Call.operator_id
+    ).join(
+        Client, Client.client_id == Call.client_id
+    ).where(*_call_criteria(filters)).order_by(Call.call_id)
+
+
+def _calls_summary_query(filters: Dict[str, Any]) -> Select:
+    return select(
+        func.count(Call.call_id).label("total_calls"),
+        func.coalesce(func.sum(Call.duration_seconds), 0).label("total_duration"),
+        func.avg(Call.duration_seconds).label("average_duration")
+    ).where(*_call_criteria(filters))
+
+
+def _summarize_calls(row: Any) -> Dict[str, Any]:
+    return {
+        "total_calls": row.total_calls,
+        "total_duration": int(row.total_duration),
+        "average_duration": round(float(row.average_duration), 2) if row.average_duration is not None else 0
+    }
+
+
+def _ticket_criteria(filters: Dict[str, Any]) -> List[Any]:
+    start, end = _day_range(filters)
+    criteria = []
+    if start:
+        criteria.append(Ticket.created_at >= start)
+    if end:
+        criteria.append(Ticket.created_at < end)
+    if filters.get("status"):
+        criteria.append(Ticket.status == TicketStatus(filters["status"]))
+    if filters.get("priority"):
+        criteria.append(Ticket.priority == TicketPriority(filters["priority"]))
+    return criteria
+
+
+def _tickets_rows_query(filters: Dict[str, Any]) -> Select:
+    return select(
+        Ticket.ticket_id,
+        Ticket.title,
+        Ticket.status,
+        Ticket.priority,
+        Client.external_ref.label("client_ref"),
+        Operator.name.label("operator_name"),
+        Ticket.call_id,
+        Ticket.created_at,
+        Ticket.resolved_at
+    ).join(
+        Client, Client.client_id == Ticket.client_id
+    ).join(
+        Operator, Operator.operator_id == Ticket.assigned_operator_id, isouter=True
+    ).where(*_ticket_criteria(filters)).order_by(Ticket.ticket_id)
+
+
+def _tickets_summary_query(filters: Dict[str, Any]) -> Select:
+    resolution_hours = func.date_part("epoch", Ticket.resolved_at - Ticket.created_at) / 3600
+    return select(
+        func.count().label("total_tickets"),
+        func.count(Ticket.resolved_at).label("resolved_tickets"),
+        func.avg(resolution_hours).label("average_resolution_time")
+    ).select_from(Ticket).where(*_ticket_criteria(filters))
+
+
+def _summarize_tickets(row: Any) -> Dict[str, Any]:
+    total, resolved = row.total_tickets, row.resolved_tickets
+    return {
+        "total_tickets": total,
+        "resolved_tickets": resolved,
+        "resolution_rate": round(resolved / total * 100, 2) if total else 0.0,
+        "average_resolution_time": (
+            round(float(row.average_resolution_time), 2)
+            if row.average_resolution_time is not None else 0
+        )
+    }
+
+
+REPORTS: Dict[str, ReportDefinition] = {
+    "calls": ReportDefinition(
+        columns=(
+            ("call_id", "ID llamada"),
+            ("call_label", "Etiqueta"),
+            ("call_date", "Fecha"),
+            ("operator_name", "Operador"),
+            ("client_ref", "Cliente (ref)"),
+            ("duration_seconds", "Duración (s)"),
+            ("sentimiento", "Sentimiento"),
+            ("impacto", "Impacto"),
+            ("urgencia", "Urgencia"),
+            ("tema", "Tema")
+        ),
+        rows_query=_calls_rows_query,
+        summary_query=_calls_summary_query,
+        summarize=_summarize_calls
+    ),
+    "tickets": ReportDefinition(
+        columns=(
+            ("ticket_id", "ID ticket"),
+            ("title", "Título"),
+            ("status", "Estado"),
+            ("priority", "Prioridad"),
+            ("client_ref", "Cliente (ref)"),
+            ("operator_name", "Operador asignado"),
+            ("call_id", "ID llamada"),
+            ("created_at", "Creado"),
+            ("resolved_at", "Resuelto")
+        ),
+        rows_query=_tickets_rows_query,
+        summary_query=_tickets_summary_query,
+        summarize=_summarize_tickets
+    )
+}
+
+
+def _cell(value: Any) -> Any:
+    """Valor exportable: enums por su valor y fechas con zona sin tzinfo (Excel no las admite)"""
+    if hasattr(value, "value") and not isinstance(value, (date, datetime)):
+        return value.value
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+class ReportService:
+    """Servicio para generar reportes sin materializarlos en memoria"""
+    
+    def __init__(self, batch_size: int = STREAM_BATCH_SIZE):
+        self.batch_size = batch_size
+    
+    def get_definition(self, report_type: str) -> ReportDefinition:
+        return REPORTS[report_type]
+    
+    async def get_summary(
+        self,
+        db: AsyncSession,
+        report_type: str,
+        filters: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Resumen agregado del reporte calculado en SQL"""
+        definition = self.get_definition(report_type)
+        row = (await db.execute(definition.summary_query(filters))).one()
+        return definition.summarize(row)
+    
+    async def get_preview(
+        self,
+        db: AsyncSession,
+        report_type: str,
+        filters: Dict[str, Any],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Primeras filas del reporte (formato JSON)"""
+        definition = self.get_definition(report_type)
+        rows = (await db.execute(definition.rows_query(filters).limit(limit))).all()
+        return [row._asdict() for row in rows]
+    
+    async def iter_row_batches(
+        self,
+        db: AsyncSession,
+        report_type: str,
+        filters: Dict[str, Any]
+    ) -> AsyncIterator[List[Tuple[Any, ...]]]:
+        """Lotes de filas leídos con un cursor del servidor"""
+        definition = self.get_definition(report_type)
+        result = await db.stream(
+            definition.rows_query(filters).execution_options(yield_per=self.batch_size)
+        )
+        async for partition in result.partitions():
+            yield [tuple(_cell(value) for value in row) for row in partition]
+    
+    async def iter_csv(
+        self,
+        report_type: str,
+        filters: Dict[str, Any]
+    ) -> AsyncIterator[bytes]:
+        """
+        CSV emitido lote por lote
+        
+        Abre su propia sesión porque se consume mientras se envía la respuesta.
+        """
+        definition = self.get_definition(report_type)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        
+        # BOM para que Excel detecte UTF-8 (acentos en encabezados y nombres)
+        buffer.write("\ufeff")
+        writer.writerow([header for _, header in definition.columns])
+        yield buffer.getvalue().encode("utf-8")
+        
+        async with database.get_async_session_factory()() as db:
+            async for batch in self.iter_row_batches(db, report_type, filters):
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(batch)
+                yield buffer.getvalue().encode("utf-8")
+    
+    async def write_csv(
+        self,
+        report_type: str,
+        filters: Dict[str, Any],
+        path: str
+    ) -> int:
+        """Escribir el reporte completo en un archivo CSV. Devuelve el número de filas"""
+        definition = self.get_definition(report_type)
+        total_rows = 0
+        
+        with open(path, "w", newline="", encoding="utf-8-sig") as output:
+            writer = csv.writer(output)
+            writer.writerow([header for _, header in definition.columns])
+            
+            async with database.get_async_session_factory()() as db:
+                async for batch in self.iter_row_batches(db, report_type, filters):
+                    writer.writerows(batch)
+                    total_rows += len(batch)
+        
+        return total_rows
+    
+    async def write_xlsx(
+        self,
+        report_type: str,
+        filters: Dict[str, Any],
+        path: str
+    ) -> int:
+        """
+        Escribir el reporte en un XLSX con openpyxl en modo write-only
+        
+        En write-only las filas se vuelcan a un archivo temporal de la hoja en
+        lugar de quedarse en memoria; el formato zip obliga a terminar el
+        archivo antes de poder enviarlo. Devuelve el número de filas.
+        """
+        definition = self.get_definition(report_type)
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(title=report_type)
+        sheet.append([header for _, header in definition.columns])
+        
+        def append_rows(rows: List[Tuple[Any, ...]]):
+            for row in rows:
+                sheet.append(row)
+        
+        total_rows = 0
+        async with database.get_async_session_factory()() as db:
+            async for batch in self.iter_row_batches(db, report_type, filters):
+                # openpyxl es CPU puro: fuera del event loop
+                await asyncio.to_thread(append_rows, batch)
+                total_rows += len(batch)
+        
+        await asyncio.to_thread(workbook.save, path)
+        return total_rows
+    
+    async def export_xlsx_tempfile(self, report_type: str, filters: Dict[str, Any]) -> str:
+        """Generar el XLSX en un archivo temporal; quien lo envía debe borrarlo"""
+        fd, path = tempfile.mkstemp(prefix=f"reporte_{report_type}_", suffix=".xlsx")
+        os.close(fd)
+        try:
+            await self.write_xlsx(report_type, filters, path)
+        except Exception:
+            os.unlink(path)
+            raise
+        return path
+
+
+# Instancia compartida
+report_service = ReportService()
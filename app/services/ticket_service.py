@@ -1,13 +1,34 @@
-from typing import List, Optional, Dict, Any
+import copy
+from typing import Optional, Dict, Any
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, select, func, type_coerce
+from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.orm import selectinload
 from loguru import logger
 
+from app.config.settings import settings
+from app.core.cache import TTLCache
 from app.models.tickets import Ticket, TicketStatus, TicketPriority
 from app.models.clients import Client
 from app.models.operators import Operator
 from app.schemas.tickets import TicketCreate, TicketUpdate
+from app.services.notification_outbox import notification_outbox
+from app.utils.pagination import KeysetPage, TotalMode, keyset_paginate
+
+
+TICKET_STATS_CACHE_KEY = "ticket_stats"
+
+# Foto de estadísticas compartida por todas las instancias del servicio
+_ticket_stats_cache = TTLCache(maxsize=1, ttl=settings.TICKET_STATS_CACHE_TTL_SECONDS)
+_stats_generation = 0
+
+
+def invalidate_ticket_stats():
+    """Descartar la foto de estadísticas después de un cambio en tickets"""
+    global _stats_generation
+    _stats_generation += 1
+    _ticket_stats_cache.delete(TICKET_STATS_CACHE_KEY)
 
 
 class TicketService:
@@ -16,7 +37,7 @@ class TicketService:
     async def create_ticket(
         self, 
         ticket_data: TicketCreate, 
-        db: Session
+        db: AsyncSession
     ) -> Ticket:
         """Crear nuevo ticket"""
         try:
@@ -24,7 +45,7 @@ class TicketService:
             ticket = Ticket(
                 title=ticket_data.title,
                 description=ticket_data.description,
-                priority=ticket_data.priority,
+                priority=TicketPriority(ticket_data.priority.value),
                 client_id=ticket_data.client_id,
                 call_id=ticket_data.call_id,
                 assigned_operator_id=ticket_data.assigned_operator_id,
@@ -33,30 +54,33 @@ class TicketService:
             )
             
             db.add(ticket)
-            db.commit()
-            db.refresh(ticket)
+            await db.flush()
             
-            logger.info(f"Ticket creado: {ticket.ticket_id}")
+            # Las notificaciones se guardan en la misma transacción; el envío es asíncrono
+            self._enqueue_ticket_notifications(ticket, db)
+            await db.commit()
+            invalidate_ticket_stats()
+            notification_outbox.wake()
+            await db.refresh(ticket)
             
-            # Enviar notificaciones si es necesario
-            await self._send_ticket_notifications(ticket, db)
+            logger.info(f"Ticket creado: {ticket.ticket_id}")
             
             return ticket
-            
+        
         except Exception as e:
             logger.error(f"Error creando ticket: {str(e)}")
-            db.rollback()
+            await db.rollback()
             raise
     
     async def update_ticket(
         self, 
         ticket_id: int, 
         ticket_data: TicketUpdate, 
-        db: Session
+        db: AsyncSession
     ) -> Optional[Ticket]:
         """Actualizar ticket"""
         try:
-            ticket = db.query(Ticket).filter(Ticket.ticket_id == ticket_id).first()
+            ticket = await db.get(Ticket, ticket_id)
             
             if not ticket:
                 return None
@@ -69,97 +93,167 @@ class TicketService:
             if ticket_data.status == TicketStatus.RESOLVED and not ticket.resolved_at:
                 ticket.resolved_at = datetime.now()
             
-            db.commit()
-            db.refresh(ticket)
+            await db.commit()
+            invalidate_ticket_stats()
+            await db.refresh(ticket)
             
             logger.info(f"Ticket actualizado: {ticket.ticket_id}")
             
             return ticket
-            
+        
         except Exception as e:
             logger.error(f"Error actualizando ticket: {str(e)}")
-            db.rollback()
+            await db.rollback()
             raise
     
     async def get_ticket_by_id(
         self, 
         ticket_id: int, 
-        db: Session
+        db: AsyncSession
     ) -> Optional[Ticket]:
         """Obtener ticket por ID"""
-        return db.query(Ticket).filter(Ticket.ticket_id == ticket_id).first()
+        return await db.get(Ticket, ticket_id)
     
     async def get_tickets_list(
         self,
-        db: Session,
-        skip: int = 0,
+        db: AsyncSession,
+        cursor: Optional[str] = None,
         limit: int = 20,
         status: Optional[TicketStatus] = None,
         priority: Optional[TicketPriority] = None,
         client_id: Optional[int] = None,
-        assigned_operator_id: Optional[int] = None
-    ) -> List[Ticket]:
-        """Obtener lista de tickets con filtros"""
-        query = db.query(Ticket)
+        assigned_operator_id: Optional[int] = None,
+        total_mode: TotalMode = "none"
+    ) -> KeysetPage:
+        """
+        Obtener una página de tickets con filtros (más recientes primero)
+        
+        Paginación por cursor sobre (created_at, ticket_id): cualquier página
+        cuesta lo mismo que la primera.
+        """
+        # Detalles (operador, cliente, llamada) en una consulta por relación, solo para la página
+        query = select(Ticket).options(
+            selectinload(Ticket.assigned_operator),
+            selectinload(Ticket.client),
+            selectinload(Ticket.call)
+        )
         
         # Aplicar filtros
         if status:
-            query = query.filter(Ticket.status == status)
+            query = query.where(Ticket.status == status)
         
         if priority:
-            query = query.filter(Ticket.priority == priority)
+            query = query.where(Ticket.priority == priority)
         
         if client_id:
-            query = query.filter(Ticket.client_id == client_id)
+            query = query.where(Ticket.client_id == client_id)
         
         if assigned_operator_id:
-            query = query.filter(Ticket.assigned_operator_id == assigned_operator_id)
+            query = query.where(Ticket.assigned_operator_id == assigned_operator_id)
+        
+        return await keyset_paginate(
+            db,
+            query,
+            listing="tickets",
+            columns=(Ticket.created_at, Ticket.ticket_id),
+            limit=limit,
+            cursor=cursor,
+            descending=True,
+            total_mode=total_mode
+        )
+    
+    async def get_ticket_stats(
+        self,
+        db: AsyncSession,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Obtener estadísticas de tickets
         
-        return query.order_by(Ticket.created_at.desc()).offset(skip).limit(limit).all()
+        Se calculan en un solo viaje a la base de datos y se guardan en un
+        caché corto que se invalida con cada cambio de tickets hecho por este
+        servicio (el TTL acota el desfase ante cambios de otros procesos).
+        """
+        if use_cache:
+            cached = _ticket_stats_cache.get(TICKET_STATS_CACHE_KEY)
+            if cached is not None:
+                return copy.deepcopy(cached)
+        
+        generation = _stats_generation
+        stats = await self._compute_ticket_stats(db)
+        
+        # Un cambio durante el cálculo deja la foto vieja fuera del caché
+        if generation == _stats_generation:
+            _ticket_stats_cache.set(TICKET_STATS_CACHE_KEY, stats)
+        return copy.deepcopy(stats)
     
-    async def get_ticket_stats(self, db: Session) -> Dict[str, Any]:
-        """Obtener estadísticas de tickets"""
-        total_tickets = db.query(Ticket).count()
-        open_tickets = db.query(Ticket).filter(Ticket.status == TicketStatus.OPEN).count()
-        in_progress_tickets = db.query(Ticket).filter(
-            Ticket.status == TicketStatus.IN_PROGRESS
-        ).count()
-        resolved_tickets = db.query(Ticket).filter(
-            Ticket.status == TicketStatus.RESOLVED
-        ).count()
-        closed_tickets = db.query(Ticket).filter(Ticket.status == TicketStatus.CLOSED).count()
-        
-        # Estadísticas por prioridad
-        priorities = db.query(Ticket.priority, db.func.count(Ticket.ticket_id)).group_by(
-            Ticket.priority
-        ).all()
-        
-        tickets_by_priority = {priority.value: count for priority, count in priorities}
-        
-        # Estadísticas por operador
-        operators = db.query(
-            Operator.name, 
-            db.func.count(Ticket.ticket_id)
+    async def _compute_ticket_stats(self, db: AsyncSession) -> Dict[str, Any]:
+        """Conteos por estado y prioridad, tiempo de resolución y carga por operador en una consulta"""
+        # date_part devuelve double precision; extract() devuelve numeric y es más lento
+        resolution_hours = func.date_part("epoch", Ticket.resolved_at - Ticket.created_at) / 3600
+        
+        # Se agrupa por id antes del join para no unir fila por fila contra operadores
+        tickets_per_operator = select(
+            Ticket.assigned_operator_id.label("operator_id"),
+            func.count().label("tickets")
+        ).group_by(Ticket.assigned_operator_id).subquery()
+        
+        operator_counts = select(
+            Operator.name.label("name"),
+            func.coalesce(func.sum(tickets_per_operator.c.tickets), 0).label("tickets")
         ).join(
-            Ticket, Ticket.assigned_operator_id == Operator.operator_id, isouter=True
-        ).group_by(Operator.name).all()
+            tickets_per_operator,
+            tickets_per_operator.c.operator_id == Operator.operator_id,
+            isouter=True
+        ).group_by(Operator.name).subquery()
         
-        tickets_by_operator = {name: count for name, count in operators}
+        tickets_by_operator = select(
+            func.json_object_agg(operator_counts.c.name, operator_counts.c.tickets)
+        ).scalar_subquery()
+        
+        row = (await db.execute(
+            select(
+                func.count().label("total_tickets"),
+                *[
+                    func.count().filter(Ticket.status == ticket_status).label(f"status_{ticket_status.value}")
+                    for ticket_status in TicketStatus
+                ],
+                *[
+                    func.count().filter(Ticket.priority == priority).label(f"priority_{priority.value}")
+                    for priority in TicketPriority
+                ],
+                func.avg(resolution_hours).filter(
+                    Ticket.resolved_at.isnot(None)
+                ).label("average_resolution_time"),
+                type_coerce(tickets_by_operator, JSON).label("tickets_by_operator")
+            ).select_from(Ticket)
+        )).one()
+        
+        average_resolution_time = row.average_resolution_time
         
         return {
-            "total_tickets": total_tickets,
-            "open_tickets": open_tickets,
-            "in_progress_tickets": in_progress_tickets,
-            "resolved_tickets": resolved_tickets,
-            "closed_tickets": closed_tickets,
-            "tickets_by_priority": tickets_by_priority,
-            "tickets_by_operator": tickets_by_operator
+            "total_tickets": row.total_tickets,
+            "open_tickets": row.status_open,
+            "in_progress_tickets": row.status_in_progress,
+            "resolved_tickets": row.status_resolved,
+            "closed_tickets": row.status_closed,
+            "tickets_by_priority": {
+                priority.value: getattr(row, f"priority_{priority.value}")
+                for priority in TicketPriority
+                if getattr(row, f"priority_{priority.value}")
+            },
+            "tickets_by_operator": row.tickets_by_operator or {},
+            # Horas promedio entre creación y resolución
+            "average_resolution_time": (
+                round(float(average_resolution_time), 2)
+                if average_resolution_time is not None else None
+            )
         }
     
     async def auto_assign_ticket(
         self, 
         ticket_id: int, 
-        db: Session
+        db: AsyncSession
     ) -> Optional[Ticket]:
         """Asignar automáticamente ticket a operador disponible"""
         try:
@@ -169,52 +263,57 @@ class TicketService:
             
             # Lógica de asignación automática
             # Por ejemplo, asignar al operador con menos tickets activos
-            operator = db.query(Operator).join(
-                Ticket, 
-                and_(
-                    Ticket.assigned_operator_id == Operator.operator_id,
-                    Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS])
-                ),
-                isouter=True
-            ).group_by(Operator.operator_id).order_by(
-                db.func.count(Ticket.ticket_id)
-            ).first()
+            operator = (await db.execute(
+                select(Operator).join(
+                    Ticket, 
+                    and_(
+                        Ticket.assigned_operator_id == Operator.operator_id,
+                        Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS])
+                    ),
+                    isouter=True
+                ).group_by(Operator.operator_id).order_by(
+                    func.count(Ticket.ticket_id)
+                ).limit(1)
+            )).scalars().first()
             
             if operator:
                 ticket.assigned_operator_id = operator.operator_id
-                db.commit()
-                db.refresh(ticket)
+                await db.commit()
+                invalidate_ticket_stats()
+                await db.refresh(ticket)
                 
                 logger.info(f"Ticket {ticket_id} asignado automáticamente a {operator.name}")
             
             return ticket
-            
+        
         except Exception as e:
             logger.error(f"Error en asignación automática: {str(e)}")
             raise
     
-    async def _send_ticket_notifications(
+    def _enqueue_ticket_notifications(
         self, 
         ticket: Ticket, 
-        db: Session
+        db: AsyncSession
     ):
-        """Enviar notificaciones de ticket"""
-        # Implementar notificaciones por email/SMS
-        logger.info(f"Enviando notificaciones para ticket {ticket.ticket_id}")
-        
-        # Aquí iría la lógica de envío de emails, SMS, etc.
-        # Por ejemplo:
-        # - Notificar al cliente que se creó el ticket
-        # - Notificar al operador asignado
-        # - Notificar a supervisores si es prioridad alta
-        
-        pass
+        """Encolar en el outbox el aviso al cliente y al operador asignado"""
+        context = {
+            "ticket_id": ticket.ticket_id,
+            "title": ticket.title,
+            "priority": ticket.priority.value,
+            "description": ticket.description,
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M")
+        }
+        notification_outbox.enqueue_template(db, "client", ticket.client_id, "ticket_created", context)
+        if ticket.assigned_operator_id:
+            notification_outbox.enqueue_template(
+                db, "operator", ticket.assigned_operator_id, "ticket_assigned", context
+            )
     
     async def escalate_ticket(
         self, 
         ticket_id: int, 
         reason: str, 
-        db: Session
+        db: AsyncSession
     ) -> Optional[Ticket]:
         """Escalar ticket a prioridad mayor"""
         try:
@@ -236,13 +335,14 @@ class TicketService:
             else:
                 ticket.description = f"[ESCALADO] {reason} - {datetime.now().isoformat()}"
             
-            db.commit()
-            db.refresh(ticket)
+            await db.commit()
+            invalidate_ticket_stats()
+            await db.refresh(ticket)
             
             logger.info(f"Ticket {ticket_id} escalado a {ticket.priority.value}")
             
             return ticket
-            
+        
         except Exception as e:
             logger.error(f"Error escalando ticket: {str(e)}")
             raise
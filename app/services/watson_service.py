@@ -1,15 +1,70 @@
-import httpx
 import json
-from typing import Dict, Any, Optional, List
-from datetime import datetime
-from sqlalchemy.orm import Session
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
 from app.config.settings import settings
+from app.core.cache import RedisCache, TieredCache, TTLCache
+from app.core.http_client import outbound_http
+from app.core.idempotency import IdempotencyCache, request_fingerprint
 from app.schemas.tickets import WatsonTicketRequest, TicketCreate
 from app.models.tickets import Ticket, TicketPriority
 from app.models.clients import Client
+from app.services.client_service import client_service
 from app.services.ticket_service import TicketService
+from app.services.report_jobs import REPORT_NAMES, report_job_engine
+from app.services.activity_writer import activity_writer
+from app.utils.helpers import safe_json_dumps
+
+
+# Días cubiertos por cada periodo que Watson puede pedir en `generar_reporte`
+REPORT_PERIOD_DAYS = {
+    "diario": 1,
+    "semanal": 7,
+    "mensual": 30,
+    "anual": 365
+}
+
+
+def _is_replayable(response: Dict[str, Any]) -> bool:
+    """Las respuestas de error no se guardan: el reintento debe volver a ejecutar"""
+    return "error" not in response.get("context_update", {})
+
+
+def _build_webhook_idempotency() -> IdempotencyCache:
+    """Respuestas del webhook por llave de idempotencia, configuradas desde Settings"""
+    redis_cache = None
+    if settings.WATSON_IDEMPOTENCY_REDIS_ENABLED:
+        redis_cache = RedisCache(
+            settings.REDIS_URL,
+            prefix="watson_webhook",
+            ttl=settings.WATSON_IDEMPOTENCY_TTL_SECONDS
+        )
+    
+    return IdempotencyCache(
+        TieredCache(
+            TTLCache(
+                maxsize=settings.WATSON_IDEMPOTENCY_MAX_SIZE,
+                ttl=settings.WATSON_IDEMPOTENCY_TTL_SECONDS
+            ),
+            redis_cache
+        ),
+        should_store=_is_replayable
+    )
+
+
+# Compartido por todas las instancias del servicio (se cierra en el shutdown)
+webhook_idempotency = _build_webhook_idempotency()
+
+
+def webhook_idempotency_key(request, idempotency_key: Optional[str] = None) -> str:
+    """Llave explícita (header Idempotency-Key) o sesión + hash del mensaje"""
+    if idempotency_key:
+        return f"key:{idempotency_key}"
+    fingerprint = request_fingerprint(request.user_id, request.message, request.intent, request.entities)
+    return f"session:{request.session_id}:{fingerprint}"
 
 
 class WatsonService:
@@ -21,10 +76,31 @@ class WatsonService:
         self.version = settings.WATSON_VERSION
         self.ticket_service = TicketService()
     
+    async def process_watson_webhook_once(
+        self,
+        request, # WatsonWebhookRequest
+        db: AsyncSession,
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Procesar el webhook una sola vez por solicitud; regresa (respuesta, repetida)
+        
+        Watson reintenta cuando la respuesta tarda: el reintento recibe la
+        respuesta ya calculada (o espera a la ejecución en curso) en lugar de
+        volver a crear el ticket.
+        """
+        key = webhook_idempotency_key(request, idempotency_key)
+        response_data, replayed = await webhook_idempotency.run(
+            key, lambda: self.process_watson_webhook(request, db)
+        )
+        if replayed:
+            logger.info(f"🔁 Webhook Watson repetido, respuesta reutilizada: {request.session_id}")
+        return response_data, replayed
+    
     async def process_watson_webhook(
         self, 
         request, # WatsonWebhookRequest
-        db: Session
+        db: AsyncSession
     ) -> Dict[str, Any]:
         """
         🤖 Procesar webhook de Watson Orchestrate
@@ -85,24 +161,26 @@ class WatsonService:
                 )
             
             # Registrar actividad
-            await self._log_watson_activity(request, response_data, db)
+            await self._log_watson_activity(request, response_data, db, intent)
             
             return response_data
             
         except Exception as e:
             logger.error(f"❌ Error procesando webhook Watson: {str(e)}")
-            return {
+            error_response = {
                 "response": "❌ Lo siento, ocurrió un error procesando tu solicitud. Por favor intenta de nuevo.",
                 "actions": [],
                 "context_update": {"error": str(e)},
                 "should_end_session": False
             }
+            await self._log_watson_activity(request, error_response, db)
+            return error_response
     
     async def _handle_create_ticket_intent(
         self, 
         request, 
         entities: Dict[str, Any], 
-        db: Session
+        db: AsyncSession
     ) -> Dict[str, Any]:
         """🎫 Manejar intención de crear ticket"""
         try:
@@ -111,15 +189,15 @@ class WatsonService:
             prioridad = entities.get("prioridad", "medium")
             cliente_ref = request.context.get("cliente_id") or entities.get("cliente_id", "CLI-DEFAULT")
             
-            # Buscar o crear cliente
-            client = await self._get_or_create_client(cliente_ref, db)
+            # Buscar o crear cliente (se confirma junto con el ticket)
+            client_id = await client_service.get_or_create_client_id(db, cliente_ref)
             
             # Crear ticket
             ticket_data = TicketCreate(
                 title=f"Solicitud desde Watson - {request.session_id[:8]}",
                 description=problema,
-                priority=self._map_priority(prioridad),
-                client_id=client.client_id,
+                priority=await self._map_priority(prioridad),
+                client_id=client_id,
                 watson_session_id=request.session_id,
                 watson_metadata={"user_id": request.user_id, "entities": entities}
             )
@@ -153,7 +231,7 @@ class WatsonService:
         self, 
         request, 
         entities: Dict[str, Any], 
-        db: Session
+        db: AsyncSession
     ) -> Dict[str, Any]:
         """📅 Manejar intención de programar visita"""
         try:
@@ -197,7 +275,7 @@ class WatsonService:
         self, 
         request, 
         entities: Dict[str, Any], 
-        db: Session
+        db: AsyncSession
     ) -> Dict[str, Any]:
         """📊 Manejar consulta de estado"""
         try:
@@ -244,24 +322,53 @@ class WatsonService:
         self, 
         request, 
         entities: Dict[str, Any], 
-        db: Session
+        db: AsyncSession
     ) -> Dict[str, Any]:
         """📈 Manejar generación de reportes"""
         try:
-            tipo_reporte = entities.get("tipo", "general")
+            message_lower = (request.message or "").lower()
+            tipo_reporte = entities.get("tipo_reporte")
+            if not isinstance(tipo_reporte, str) or tipo_reporte not in REPORT_NAMES:
+                # Sin tipo o con uno desconocido: se deduce del mensaje
+                if tipo_reporte:
+                    logger.warning(f"Tipo de reporte desconocido desde Watson: {tipo_reporte!r}")
+                tipo_reporte = "calls" if "llamada" in message_lower else "tickets"
             periodo = entities.get("periodo", "semanal")
             
-            # Simular generación de reporte
-            report_id = f"RPT-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            # El reporte se genera en segundo plano; aquí solo se encola
+            end_date = datetime.now().date()
+            start_date = end_date - timedelta(days=REPORT_PERIOD_DAYS.get(periodo, 7))
+            report, deduplicated = await report_job_engine.submit(
+                db,
+                tipo_reporte,
+                "xlsx",
+                {"start_date": start_date, "end_date": end_date}
+            )
+            report_id = report.report_id
+            
+            # Watson no manda un correo del usuario: se responde con las URLs del trabajo
+            status_url = f"{settings.API_V1_STR}/reports/jobs/{report_id}"
+            download_url = f"{status_url}/download"
+            if report.status == "completed":
+                response_text = f"📊 El reporte {tipo_reporte} {periodo} #{report_id} ya está listo. Descárgalo en {download_url}"
+            else:
+                response_text = (
+                    f"📊 Generando reporte {tipo_reporte} {periodo} (#{report_id}). "
+                    f"Consulta su estado en {status_url}; al terminar se descarga en {download_url}"
+                )
             
             return {
-                "response": f"📊 Generando reporte {tipo_reporte} {periodo}... Te enviaré el reporte #{report_id} por email cuando esté listo.",
+                "response": response_text,
                 "actions": [
                     {
                         "type": "report_generated",
                         "report_id": report_id,
-                        "type": tipo_reporte,
-                        "period": periodo
+                        "report_type": tipo_reporte,
+                        "period": periodo,
+                        "status": report.status,
+                        "deduplicated": deduplicated,
+                        "status_url": status_url,
+                        "download_url": download_url
                     }
                 ],
                 "context_update": {
@@ -282,7 +389,7 @@ class WatsonService:
         self, 
         request, 
         entities: Dict[str, Any], 
-        db: Session
+        db: AsyncSession
     ) -> Dict[str, Any]:
         """📧 Manejar envío de notificaciones"""
         try:
@@ -320,7 +427,7 @@ class WatsonService:
         self, 
         action_type: str, 
         action_data: Dict[str, Any], 
-        db: Session
+        db: AsyncSession
     ) -> Dict[str, Any]:
         """⚡ Ejecutar acción específica (para API calls directas)"""
         try:
@@ -397,25 +504,6 @@ class WatsonService:
         }
         return priority_map.get(priority_str.lower(), TicketPriority.MEDIUM)
     
-    async def _get_or_create_client(
-        self, 
-        external_ref: str, 
-        db: Session
-    ) -> Client:
-        """Obtener o crear cliente"""
-        client = db.query(Client).filter(
-            Client.external_ref == external_ref
-        ).first()
-        
-        if not client:
-            client = Client(external_ref=external_ref)
-            db.add(client)
-            db.commit()
-            db.refresh(client)
-            logger.info(f"Cliente creado: {external_ref}")
-        
-        return client
-    
     async def _analyze_user_input(
         self, 
         user_input: str, 
@@ -456,7 +544,7 @@ class WatsonService:
         self, 
         request: WatsonTicketRequest, 
         client: Client, 
-        db: Session
+        db: AsyncSession
     ) -> Ticket:
         """Crear ticket basado en solicitud de Watson"""
         ticket_data = TicketCreate(
@@ -484,7 +572,7 @@ class WatsonService:
         self, 
         request: WatsonTicketRequest, 
         client: Client, 
-        db: Session
+        db: AsyncSession
     ) -> Dict[str, Any]:
         """Programar visita"""
         # Implementar lógica de programación de visitas
@@ -501,7 +589,7 @@ class WatsonService:
         self, 
         request: WatsonTicketRequest, 
         client: Client, 
-        db: Session
+        db: AsyncSession
     ) -> Dict[str, Any]:
         """Generar reporte automático"""
         # Implementar generación de reportes
@@ -518,12 +606,33 @@ class WatsonService:
         self, 
         request: WatsonTicketRequest, 
         result: Dict[str, Any], 
-        db: Session
+        db: AsyncSession,
+        intent: Optional[str] = None
     ):
-        """Registrar actividad de Watson"""
-        # Implementar logging de actividades
-        logger.info(f"Actividad Watson registrada: {request.session_id}")
-        pass
+        """Registrar actividad de Watson (buffer en memoria, se escribe en lotes)"""
+        actions = result.get("actions") or []
+        action_taken = (
+            result.get("context_update", {}).get("action_completed")
+            or (actions[0].get("type") if actions else None)
+            or ("error" if "error" in result.get("context_update", {}) else None)
+        )
+        await activity_writer.record({
+            "session_id": request.session_id,
+            "client_id": None,
+            "user_input": request.message,
+            "bot_response": result.get("response"),
+            "action_taken": action_taken[:100] if action_taken else None,
+            "context_data": safe_json_dumps(request.context),
+            "metadata_json": safe_json_dumps({
+                "user_id": request.user_id,
+                "intent": intent or request.intent,
+                "entities": request.entities,
+                "actions": actions,
+                "context_update": result.get("context_update", {})
+            }),
+            # Hora de la interacción, no la de la escritura del lote
+            "created_at": datetime.now().astimezone()
+        })
     
     async def get_integration_status(self) -> Dict[str, Any]:
         """Obtener estado de la integración"""
@@ -531,19 +640,22 @@ class WatsonService:
             "status": "active" if self.api_key else "inactive",
             "version": self.version,
             "last_connection": datetime.now().isoformat(),
-            "endpoints": 4
+            "endpoints": 4,
+            "activity_log": activity_writer.stats()
         }
     
     async def get_recent_sessions(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         limit: int = 50
     ) -> List[Dict[str, Any]]:
         """Obtener sesiones recientes de Watson"""
         # Consultar tickets con watson_session_id
-        tickets = db.query(Ticket).filter(
-            Ticket.watson_session_id.isnot(None)
-        ).order_by(Ticket.created_at.desc()).limit(limit).all()
+        tickets = (await db.execute(
+            select(Ticket).where(
+                Ticket.watson_session_id.isnot(None)
+            ).order_by(Ticket.created_at.desc()).limit(limit)
+        )).scalars().all()
         
         sessions = []
         for ticket in tickets:
@@ -557,25 +669,25 @@ class WatsonService:
         
         return sessions
     
+    async def _watson_request(self, method: str, path: str, **kwargs):
+        """Llamada autenticada a Watson por el cliente HTTP compartido (keep-alive + circuit breaker)"""
+        headers = {"Authorization": f"Bearer {self.api_key}", **kwargs.pop("headers", {})}
+        return await outbound_http.request(method, f"{self.base_url}{path}", headers=headers, **kwargs)
+    
     async def test_connection(self) -> Optional[Dict[str, Any]]:
         """Probar conexión con Watson"""
         if not self.api_key or not self.base_url:
             return None
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/health",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    return {
-                        "status": "success",
-                        "timestamp": datetime.now().isoformat(),
-                        "response_time": response.elapsed.total_seconds()
-                    }
+            response = await self._watson_request("GET", "/health")
+            
+            if response.status_code == 200:
+                return {
+                    "status": "success",
+                    "timestamp": datetime.now().isoformat(),
+                    "response_time": response.elapsed.total_seconds()
+                }
                 
         except Exception as e:
             logger.error(f"Error probando conexión Watson: {str(e)}")
@@ -585,7 +697,7 @@ class WatsonService:
     async def create_ticket_from_watson(
         self, 
         ticket_data: TicketCreate, 
-        db: Session
+        db: AsyncSession
     ) -> Ticket:
         """Crear ticket desde Watson manualmente"""
         return await self.ticket_service.create_ticket(ticket_data, db)
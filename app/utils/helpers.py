@@ -3,6 +3,8 @@ from datetime import datetime, date
 import json
 import re
 
+from app.core import serialization as json_codec
+
 
 def format_response(
     data: Any, 
@@ -22,10 +24,11 @@ def paginate_response(
     items: List[Any],
     page: int,
     page_size: int,
-    total: int
+    total: Optional[int],
+    has_next: Optional[bool] = None
 ) -> Dict[str, Any]:
-    """Formatear respuesta paginada"""
-    total_pages = (total + page_size - 1) // page_size
+    """Formatear respuesta paginada (sin total, `has_next` debe venir del llamador)"""
+    total_pages = (total + page_size - 1) // page_size if total is not None else None
     
     return {
         "items": items,
@@ -34,7 +37,7 @@ def paginate_response(
             "page_size": page_size,
             "total": total,
             "total_pages": total_pages,
-            "has_next": page < total_pages,
+            "has_next": has_next if has_next is not None else page < (total_pages or 0),
             "has_prev": page > 1
         }
     }
@@ -79,7 +82,7 @@ def safe_json_loads(json_string: Optional[str]) -> Optional[Dict[str, Any]]:
         return None
     
     try:
-        return json.loads(json_string)
+        return json_codec.loads(json_string)
     except (json.JSONDecodeError, TypeError):
         return None
 
@@ -87,7 +90,7 @@ def safe_json_loads(json_string: Optional[str]) -> Optional[Dict[str, Any]]:
 def safe_json_dumps(data: Any) -> str:
     """Convertir a JSON de forma segura"""
     try:
-        return json.dumps(data, default=str, ensure_ascii=False)
+        return json_codec.dumps(data).decode("utf-8")
     except (TypeError, ValueError):
         return "{}"
 
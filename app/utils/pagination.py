@@ -0,0 +1,155 @@
+"""
+📄 Paginación por cursor (keyset)
+
+En lugar de `OFFSET n`, cada página continúa desde la última fila de la
+anterior con una comparación de tuplas sobre columnas indexadas
+(`(created_at, ticket_id) < (:c, :id)`), así que la página 1000 cuesta lo
+mismo que la primera. El cursor es opaco para el cliente: base64 de un JSON
+con el nombre del listado y los valores de la última fila.
+
+El total es opcional:
+- `exact`:    COUNT(*) con los mismos filtros
+- `estimate`: filas estimadas por el planificador (EXPLAIN con los filtros
+              como parámetros enlazados), sin recorrer la tabla; si la
+              estimación es pequeña se cuenta exacto (es barato). Solo en
+              PostgreSQL; en otros motores se cuenta exacto.
+- `none`:     sin total; `has_next` sale de pedir una fila de más
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, List, Literal, Optional, Sequence
+
+from sqlalchemy import func, select, tuple_, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+TotalMode = Literal["exact", "estimate", "none"]
+
+# Debajo de esta estimación el COUNT exacto es barato y más útil
+EXACT_COUNT_THRESHOLD = 10000
+
+
+class InvalidCursorError(ValueError):
+    """Cursor mal formado o de otro listado"""
+
+
+def encode_cursor(listing: str, values: Sequence[Any]) -> str:
+    """Cursor opaco con los valores de la llave de orden de la última fila"""
+    values = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    payload = json.dumps({"l": listing, "v": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, listing: str, columns: Sequence[Any]) -> List[Any]:
+    """Recuperar los valores de un cursor, convertidos al tipo de cada columna"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        raw_values = payload["v"]
+        if payload["l"] != listing or len(raw_values) != len(columns):
+            raise InvalidCursorError("El cursor no corresponde a este listado")
+        
+        values = []
+        for column, raw in zip(columns, raw_values):
+            python_type = column.type.python_type
+            if python_type is datetime:
+                values.append(datetime.fromisoformat(raw))
+            elif python_type is date:
+                values.append(date.fromisoformat(raw))
+            else:
+                values.append(python_type(raw))
+        return values
+    except InvalidCursorError:
+        raise
+    except Exception as e:
+        raise InvalidCursorError("Cursor inválido") from e
+
+
+@dataclass
+class KeysetPage:
+    """Página de resultados con el cursor de la siguiente"""
+    items: List[Any]
+    next_cursor: Optional[str]
+    has_next: bool
+    total: Optional[int] = None
+
+
+class _Explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON) <consulta>` como sentencia ejecutable de SQLAlchemy"""
+    inherit_cache = False
+    
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    # La consulta se compila en la misma pasada: sus filtros quedan como parámetros enlazados
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+async def planner_estimate(db: AsyncSession, query: Select) -> int:
+    """
+    Filas que el planificador de PostgreSQL estima para `query`
+    
+    No lee la tabla, solo estadísticas. Los filtros viajan como parámetros
+    del driver (procesados por el tipo de cada columna), nunca como texto SQL.
+    """
+    plan = (await db.execute(_Explain(query))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(db: AsyncSession, query: Select, mode: TotalMode) -> Optional[int]:
+    """Total de filas del listado según el modo pedido"""
+    if mode == "none":
+        return None
+    
+    query = query.order_by(None)
+    if mode == "estimate" and (await db.connection()).dialect.name == "postgresql":
+        estimate = await planner_estimate(db, query)
+        if estimate >= EXACT_COUNT_THRESHOLD:
+            return estimate
+    
+    return await db.scalar(select(func.count()).select_from(query.subquery()))
+
+
+async def keyset_paginate(
+    db: AsyncSession,
+    query: Select,
+    listing: str,
+    columns: Sequence[Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    total_mode: TotalMode = "none"
+) -> KeysetPage:
+    """
+    Ejecutar una página de `query` ordenada por `columns` (llave única)
+    
+    `query` trae solo los filtros; el orden y el límite se agregan aquí.
+    Lanza InvalidCursorError si el cursor no es válido.
+    """
+    total = await count_rows(db, query, total_mode)
+    
+    key = tuple_(*columns)
+    if cursor is not None:
+        after = tuple_(*decode_cursor(cursor, listing, columns))
+        query = query.where(key < after if descending else key > after)
+    
+    order = [column.desc() if descending else column.asc() for column in columns]
+    rows = (await db.execute(query.order_by(*order).limit(limit + 1))).scalars().all()
+    
+    has_next = len(rows) > limit
+    items = list(rows[:limit])
+    next_cursor = None
+    if has_next:
+        last = items[-1]
+        next_cursor = encode_cursor(listing, [getattr(last, column.key) for column in columns])
+    
+    return KeysetPage(items=items, next_cursor=next_cursor, has_next=has_next, total=total)
@@ -0,0 +1,93 @@
+"""
+Respuestas JSON precalculadas (serializadas y comprimidas una sola vez)
+
+Para documentos que solo cambian con un despliegue, como las
+especificaciones OpenAPI que Watson consulta seguido: el cuerpo se arma en
+la primera solicitud, se guardan los bytes planos y en gzip con un ETag
+fuerte, y una solicitud con `If-None-Match` vigente recibe 304 sin cuerpo.
+"""
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from fastapi import Request, Response
+
+
+@dataclass(frozen=True)
+class _Payload:
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    gzip_etag: str
+
+
+def _accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip() != "gzip":
+            continue
+        params = params.replace(" ", "")
+        try:
+            return not params.startswith("q=") or float(params[2:]) > 0
+        except ValueError:
+            return True
+    return False
+
+
+def _etag_matches(request: Request, payload: _Payload) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Comparación débil (RFC 9110): se ignora el prefijo W/ que agregan algunos proxies
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return payload.etag in candidates or payload.gzip_etag in candidates
+
+
+class PrecomputedJSON:
+    """Documento JSON construido una vez y servido con ETag, gzip y 304"""
+    
+    def __init__(self, build: Callable[[], Any], cache_control: str = "no-cache"):
+        self.build = build
+        # no-cache: el cliente guarda la copia pero revalida (304) en cada consulta
+        self.cache_control = cache_control
+        self._payload: Optional[_Payload] = None
+    
+    def load(self) -> _Payload:
+        """Construir y serializar el documento si aún no existe"""
+        if self._payload is None:
+            body = json.dumps(
+                self.build(), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+            ).encode("utf-8")
+            digest = hashlib.sha256(body).hexdigest()[:32]
+            self._payload = _Payload(
+                body=body,
+                # mtime=0: mismos bytes en cada instancia y en cada arranque
+                gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+                etag=f'"{digest}"',
+                gzip_etag=f'"{digest}-gzip"'
+            )
+        return self._payload
+    
+    def invalidate(self):
+        self._payload = None
+    
+    def response(self, request: Request) -> Response:
+        payload = self.load()
+        use_gzip = _accepts_gzip(request)
+        headers = {
+            "ETag": payload.gzip_etag if use_gzip else payload.etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding"
+        }
+        
+        if _etag_matches(request, payload):
+            return Response(status_code=304, headers=headers)
+        
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=payload.gzip_body, media_type="application/json", headers=headers)
+        return Response(content=payload.body, media_type="application/json", headers=headers)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark de carga masiva de llamadas
+
+Genera un NDJSON sintético en memoria y lo carga con cada estrategia:
+
+- copy:       CallIngestionService (validación + resolución por lote + COPY)
+- executemany: mismo pipeline pero con INSERT ... executemany por lote
+- orm:        un objeto Call por fila con session.add (esquema anterior)
+
+Las filas insertadas se borran al terminar cada modo.
+
+    python scripts/bench_call_ingest.py --rows 100000
+    python scripts/bench_call_ingest.py --rows 20000 --modes copy orm
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ("copy", "executemany", "orm")
+BENCH_TOPIC = "bench_ingest"
+
+
+def _build_ndjson(rows: int, operators: list, clients: list) -> bytes:
+    lines = []
+    for index in range(rows):
+        lines.append(json.dumps({
+            "operator_name": operators[index % len(operators)],
+            "client_external_ref": clients[index % len(clients)],
+            "call_date": "2024-01-15",
+            "duration_seconds": 60 + index % 900,
+            "conversation": (
+                f"Cliente: hola, llamada de prueba {index}\n"
+                "Operador: con gusto le ayudo"
+            ),
+            "tema": BENCH_TOPIC
+        }, ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+async def _run_mode(mode: str, payload: bytes, rows: int) -> dict:
+    from sqlalchemy import delete, insert, select
+    from app.config import database
+    from app.models.calls import Call
+    from app.models.clients import Client
+    from app.models.operators import Operator
+    from app.services.call_ingestion_service import (
+        CallIngestionService, COPY_COLUMNS
+    )
+
+    session_factory = database.get_async_session_factory()
+    started = time.perf_counter()
+
+    async with session_factory() as db:
+        if mode == "orm":
+            operator_ids = dict((await db.execute(
+                select(Operator.name, Operator.operator_id)
+            )).all())
+            client_ids = dict((await db.execute(
+                select(Client.external_ref, Client.client_id)
+            )).all())
+            for line in payload.splitlines():
+                data = json.loads(line)
+                db.add(Call(
+                    operator_id=operator_ids[data["operator_name"]],
+                    client_id=client_ids[data["client_external_ref"]],
+                    call_date=date.fromisoformat(data["call_date"]),
+                    duration_seconds=data["duration_seconds"],
+                    conversation=data["conversation"],
+                    tema=data["tema"]
+                ))
+                await db.flush()
+            await db.commit()
+            inserted = rows
+        else:
+            service = CallIngestionService()
+            if mode == "executemany":
+                async def load(session, records):
+                    await session.execute(insert(Call), [
+                        dict(zip(COPY_COLUMNS, record)) for record in records
+                    ])
+                service._load = load
+            result = await service.ingest(db, io.BytesIO(payload), "ndjson")
+            inserted = result["inserted"]
+
+    elapsed = time.perf_counter() - started
+
+    async with session_factory() as db:
+        await db.execute(delete(Call).where(Call.tema == BENCH_TOPIC))
+        await db.commit()
+
+    return {
+        "mode": mode,
+        "rows": inserted,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(inserted / elapsed) if elapsed else 0
+    }
+
+
+async def _main(args):
+    from sqlalchemy import select
+    from app.config import database
+    from app.models.clients import Client
+    from app.models.operators import Operator
+    # Solo por su efecto: registra las relaciones de Call en el mapper
+    import app.services.report_service  # noqa: F401
+
+    database.initialize_database()
+    async with database.get_async_session_factory()() as db:
+        operators = list(
+            (await db.execute(select(Operator.name))).scalars()
+        )
+        clients = list(
+            (await db.execute(select(Client.external_ref))).scalars()
+        )
+    payload = _build_ndjson(args.rows, operators, clients)
+
+    print(f"{'modo':<12} {'filas':>10} {'seg':>8} {'filas/s':>10}")
+    for mode in args.modes:
+        # La carga ORM fila por fila se limita para no tardar minutos
+        mode_rows = args.rows
+        mode_payload = payload
+        if mode == "orm" and args.orm_rows < args.rows:
+            mode_rows = args.orm_rows
+            mode_payload = b"\n".join(payload.splitlines()[:mode_rows]) + b"\n"
+        result = await _run_mode(mode, mode_payload, mode_rows)
+        print(
+            f"{result['mode']:<12} {result['rows']:>10} "
+            f"{result['seconds']:>8} {result['rows_per_second']:>10}"
+        )
+
+    await database.dispose_database()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark de carga masiva de llamadas"
+    )
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument(
+        "--orm-rows", type=int, default=5000,
+        help="Filas para el modo orm (es lento)"
+    )
+    parser.add_argument(
+        "--modes", nargs="+", choices=MODES, default=list(MODES)
+    )
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
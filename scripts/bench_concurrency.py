@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark de throughput concurrente contra una instancia de la API
+
+Lanza N solicitudes concurrentes contra endpoints que consultan la base de
+datos y reporta solicitudes/segundo y latencias. Para comparar "antes" y
+"después" basta con levantar el servidor en cada revisión y ejecutar:
+
+    python scripts/bench_concurrency.py \\
+        --base-url http://localhost:8000/api/v1 \\
+        --requests 2000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+DEFAULT_ENDPOINTS = [
+    "/operators/",
+    "/watson/calls/recent?limit=20",
+    "/watson/analytics/dashboard",
+]
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    queue: "asyncio.Queue[str]",
+    latencies: List[float],
+    errors: Dict[str, int]
+):
+    """Consumir rutas de la cola y registrar la latencia de cada solicitud"""
+    while True:
+        try:
+            path = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                key = str(response.status_code)
+                errors[key] = errors.get(key, 0) + 1
+        except httpx.HTTPError as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_benchmark(
+    base_url: str,
+    endpoints: List[str],
+    total_requests: int,
+    concurrency: int
+) -> Dict[str, float]:
+    """Ejecutar el benchmark y devolver las métricas agregadas"""
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    for i in range(total_requests):
+        queue.put_nowait(endpoints[i % len(endpoints)])
+
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60.0
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            _worker(client, queue, latencies, errors)
+            for _ in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+        "errors": sum(errors.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark de concurrencia de la API"
+    )
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--endpoint", action="append", dest="endpoints")
+    args = parser.parse_args()
+
+    endpoints = args.endpoints or DEFAULT_ENDPOINTS
+    print(f"🚀 {args.requests} solicitudes, concurrencia {args.concurrency}")
+    print(f"📋 Endpoints: {', '.join(endpoints)}")
+
+    results = asyncio.run(
+        run_benchmark(
+            args.base_url, endpoints, args.requests, args.concurrency
+        )
+    )
+    for key, value in results.items():
+        print(f"• {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
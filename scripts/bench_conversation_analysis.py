@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+⏱️ Micro-benchmark del análisis de conversaciones
+
+Compara el pipeline actual (una sola conversión a minúsculas y un conjunto
+precalculado de palabras clave, consumido por todas las reglas) contra el
+esquema anterior, donde cada regla volvía a llamar `conversation.lower()`
+y buscaba sus propias palabras clave sobre la transcripción completa.
+
+    python scripts/bench_conversation_analysis.py --repeat 5000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_conversation_analysis import SAMPLE_CONVERSATION  # noqa: E402
+from app.services.conversation_analysis_service import (  # noqa: E402
+    RULE_KEYWORDS,
+    analyze_conversation_text,
+    conversation_features
+)
+
+
+def per_rule_scan(conversation: str) -> int:
+    """Costo del esquema anterior: cada regla baja a minúsculas y escanea"""
+    hits = 0
+    for keywords in RULE_KEYWORDS.values():
+        conversation_lower = conversation.lower()
+        hits += sum(1 for keyword in keywords if keyword in conversation_lower)
+    return hits
+
+
+def bench(label: str, fn, repeat: int) -> float:
+    seconds = timeit.timeit(fn, number=repeat) / repeat
+    print(f"• {label:<38} {seconds * 1e6:10.1f} µs")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark del análisis de conversaciones"
+    )
+    parser.add_argument("--repeat", type=int, default=5000)
+    args = parser.parse_args()
+
+    for multiplier in (1, 4, 16):
+        text = SAMPLE_CONVERSATION * multiplier
+        print(f"\n📄 Transcripción de {len(text)} caracteres")
+
+        legacy = bench(
+            "reglas con lower()/escaneo propio",
+            lambda: per_rule_scan(text), args.repeat
+        )
+        single = bench(
+            "minúsculas 1 vez + conjunto (features)",
+            lambda: conversation_features(text), args.repeat
+        )
+        bench(
+            "análisis completo",
+            lambda: analyze_conversation_text(text), args.repeat
+        )
+        print(f"  ⚡ speedup del escaneo: {legacy / single:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark de envío masivo de emails contra un SMTP local (aiosmtpd)
+
+- legacy: smtplib bloqueante, una conexión por mensaje y en secuencia
+          (esquema anterior de EmailService.send_email)
+- pool-N: EmailService.send_bulk_notification con un pool de N conexiones
+
+El servidor aiosmtpd corre en otro proceso y solo cuenta los mensajes;
+`--latency-ms` agrega una espera por mensaje para simular un servidor remoto.
+
+    python scripts/bench_email.py --recipients 10000
+    python scripts/bench_email.py --recipients 10000 --latency-ms 20 \\
+        --pool-sizes 1 5 10
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import smtplib
+import sys
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SENDER = "bench@uanl.test"
+TEMPLATE = (
+    "<h2>Aviso</h2>"
+    "<p>Hola, {{ nombre }}: su ticket #{{ ticket_id }} fue actualizado.</p>"
+)
+
+
+class CountingHandler:
+    """Handler de aiosmtpd que cuenta los mensajes recibidos"""
+
+    def __init__(self, counter, latency_seconds: float):
+        self.counter = counter
+        self.latency_seconds = latency_seconds
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        with self.counter.get_lock():
+            self.counter.value += 1
+        return "250 OK"
+
+
+def _serve(port: int, counter, latency_seconds: float, ready, stop):
+    from aiosmtpd.controller import Controller
+
+    controller = Controller(
+        CountingHandler(counter, latency_seconds),
+        hostname="127.0.0.1", port=port
+    )
+    controller.start()
+    ready.set()
+    stop.wait()
+    controller.stop()
+
+
+def _run_legacy(port: int, recipients: list) -> None:
+    for email in recipients:
+        msg = MIMEMultipart()
+        msg["From"] = SENDER
+        msg["To"] = email
+        msg["Subject"] = "Aviso"
+        msg.attach(MIMEText(TEMPLATE, "html", "utf-8"))
+        with smtplib.SMTP("127.0.0.1", port) as server:
+            server.send_message(msg, to_addrs=[email])
+
+
+async def _run_pool(port: int, recipients: list, size: int) -> dict:
+    from app.core.smtp_pool import SMTPConnectionPool
+    from app.services.email_service import EmailService
+
+    service = EmailService()
+    service.email_from = SENDER
+    service.pool = SMTPConnectionPool(
+        hostname="127.0.0.1", port=port, start_tls=False, size=size
+    )
+    try:
+        return await service.send_bulk_notification(
+            recipients, "Aviso", TEMPLATE,
+            {"nombre": "Cliente", "ticket_id": 123}
+        )
+    finally:
+        await service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark de envío masivo de emails"
+    )
+    parser.add_argument("--recipients", type=int, default=10000)
+    parser.add_argument(
+        "--legacy-recipients", type=int, default=1000,
+        help="Mensajes para el modo legacy (es lento)"
+    )
+    parser.add_argument(
+        "--pool-sizes", type=int, nargs="+", default=[1, 5, 10]
+    )
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument(
+        "--latency-ms", type=float, default=0,
+        help="Espera del servidor por mensaje"
+    )
+    args = parser.parse_args()
+
+    from loguru import logger
+
+    # Un log por mensaje distorsiona la medición
+    logger.disable("app")
+
+    counter = multiprocessing.Value("i", 0)
+    ready, stop = multiprocessing.Event(), multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=_serve,
+        args=(args.port, counter, args.latency_ms / 1000, ready, stop),
+        daemon=True
+    )
+    server.start()
+    ready.wait()
+    recipients = [
+        f"cliente{index}@uanl.test" for index in range(args.recipients)
+    ]
+
+    print(
+        f"{'modo':<10} {'mensajes':>9} {'recibidos':>10} "
+        f"{'seg':>8} {'msg/s':>9}"
+    )
+    try:
+        modes = [("legacy", None)]
+        modes += [(f"pool-{size}", size) for size in args.pool_sizes]
+        for name, size in modes:
+            before = counter.value
+            batch = recipients
+            if size is None:
+                batch = recipients[:args.legacy_recipients]
+            started = time.perf_counter()
+            if size is None:
+                _run_legacy(args.port, batch)
+            else:
+                asyncio.run(_run_pool(args.port, batch, size))
+            elapsed = time.perf_counter() - started
+            received = counter.value - before
+            print(
+                f"{name:<10} {len(batch):>9} {received:>10} "
+                f"{elapsed:>8.2f} {received / elapsed:>9.0f}"
+            )
+    finally:
+        stop.set()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark de render de plantillas de email
+
+- inline:   `Template(texto).render(...)` por mensaje (esquema anterior:
+            se parsea y compila la plantilla en cada envío)
+- registry: EmailTemplateRegistry, compilada una vez y renderizada por
+            destinatario con su propio contexto
+
+    python scripts/bench_email_templates.py --messages 50000
+    python scripts/bench_email_templates.py --template ticket_assigned
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _contexts(messages: int) -> list:
+    return [
+        {
+            "ticket_id": index,
+            "title": f"Falla en servicio {index}",
+            "priority": ("low", "medium", "high")[index % 3],
+            "description": (
+                "El cliente reporta intermitencia en el servicio "
+                "<b>desde ayer</b>"
+            ),
+            "created_at": datetime(2024, 1, 15, 10, 30).isoformat(),
+            "assigned_operator": f"Operador {index % 50}",
+            "resolution": "Se reinició el equipo del cliente"
+        }
+        for index in range(messages)
+    ]
+
+
+def _measure(name: str, render, contexts: list) -> None:
+    started = time.perf_counter()
+    for context in contexts:
+        render(context)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<10} {len(contexts):>9} {elapsed:>8.2f} "
+        f"{len(contexts) / elapsed:>10.0f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark de render de plantillas de email"
+    )
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument(
+        "--inline-messages", type=int, default=2000,
+        help="Mensajes para el modo inline (es lento)"
+    )
+    parser.add_argument("--template", default="ticket_created")
+    args = parser.parse_args()
+
+    from jinja2 import Template
+    from app.services.email_templates import email_template_registry
+
+    email_template_registry.load()
+    template = email_template_registry.get(args.template)
+    templates_dir = email_template_registry.templates_dir
+    with open(
+        os.path.join(templates_dir, template.body.name), encoding="utf-8"
+    ) as source_file:
+        body_source = source_file.read()
+    with open(
+        os.path.join(templates_dir, template.subject.name), encoding="utf-8"
+    ) as source_file:
+        subject_source = source_file.read()
+
+    contexts = _contexts(args.messages)
+
+    print(f"{'modo':<10} {'mensajes':>9} {'seg':>8} {'render/s':>10}")
+    _measure(
+        "inline",
+        lambda context: (
+            Template(subject_source).render(context),
+            Template(body_source).render(context)
+        ),
+        contexts[:args.inline_messages]
+    )
+    _measure("registry", template.render, contexts)
+
+
+if __name__ == "__main__":
+    main()
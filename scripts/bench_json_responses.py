@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark de serialización de respuestas JSON
+
+Mide el tiempo de armar el cuerpo de las respuestas más pesadas con datos
+reales de la base:
+
+- /watson/calls/recent?limit=100 (dict sin response_model, transcripciones
+  completas): jsonable_encoder + JSONResponse (esquema anterior),
+  jsonable_encoder + FastJSONResponse (clase por defecto) y
+  FastJSONResponse directa (como responde ahora el endpoint)
+- /tickets/?limit=100 (TicketList con response_model): el modelo se
+  serializa con pydantic-core y luego se renderiza con cada clase
+
+    python scripts/bench_json_responses.py --iterations 500
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def _load_payloads(limit: int):
+    from sqlalchemy import select
+    from app.config import database
+    from app.models.calls import Call
+    from app.models.clients import Client
+    from app.models.operators import Operator
+    from app.schemas.tickets import TicketList
+    from app.services.ticket_service import TicketService
+    # Solo por su efecto: registra las relaciones de Call en el mapper
+    import app.services.report_service  # noqa: F401
+
+    database.initialize_database()
+    async with database.get_async_session_factory()() as db:
+        rows = (await db.execute(
+            select(Call, Operator.name, Client.external_ref)
+            .join(Operator).join(Client)
+            .order_by(Call.call_date.desc(), Call.call_id.desc())
+            .limit(limit)
+        )).all()
+        calls = {
+            "calls": [
+                {
+                    "call_id": call.call_id,
+                    "call_label": call.call_label,
+                    "operator_name": operator_name,
+                    "client_ref": client_ref,
+                    "call_date": call.call_date.isoformat(),
+                    "conversation": call.conversation,
+                    "sentimiento": call.sentimiento,
+                    "impacto": call.impacto,
+                    "urgencia": call.urgencia,
+                    "tema": call.tema
+                }
+                for call, operator_name, client_ref in rows
+            ],
+            "total": len(rows),
+            "source": "postgresql"
+        }
+
+        page = await TicketService().get_tickets_list(
+            db, limit=limit, total_mode="none"
+        )
+        tickets = TicketList(
+            tickets=[_ticket_details(ticket) for ticket in page.items],
+            total=page.total,
+            limit=limit,
+            next_cursor=page.next_cursor
+        )
+    await database.dispose_database()
+    return calls, tickets
+
+
+def _ticket_details(ticket):
+    from app.schemas.tickets import TicketWithDetails
+
+    operator = ticket.assigned_operator
+    client, call = ticket.client, ticket.call
+    return TicketWithDetails.model_validate(ticket).model_copy(update={
+        "assigned_operator_name": operator.name if operator else None,
+        "client_external_ref": client.external_ref if client else None,
+        "call_label": call.call_label if call else None
+    })
+
+
+def _measure(name: str, render, iterations: int) -> None:
+    size = len(render())
+    started = time.perf_counter()
+    for _ in range(iterations):
+        render()
+    elapsed_us = (time.perf_counter() - started) / iterations * 1e6
+    print(f"{name:<44} {size:>9} {elapsed_us:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark de serialización de respuestas JSON"
+    )
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from loguru import logger
+    from app.core.serialization import FastJSONResponse
+
+    logger.disable("app")
+    calls, tickets = asyncio.run(_load_payloads(args.limit))
+
+    print(f"{'respuesta':<44} {'bytes':>9} {'us/resp':>10}")
+    ticket_content = tickets.model_dump(mode="json")
+    cases = [
+        ("calls/recent  jsonable_encoder + JSONResponse",
+         lambda: JSONResponse(jsonable_encoder(calls)).body),
+        ("calls/recent  jsonable_encoder + FastJSON",
+         lambda: FastJSONResponse(jsonable_encoder(calls)).body),
+        ("calls/recent  FastJSONResponse directa",
+         lambda: FastJSONResponse(calls).body),
+        ("tickets       model_dump + JSONResponse",
+         lambda: JSONResponse(tickets.model_dump(mode="json")).body),
+        ("tickets       model_dump + FastJSON",
+         lambda: FastJSONResponse(tickets.model_dump(mode="json")).body),
+        ("tickets       solo render JSONResponse",
+         lambda: JSONResponse(ticket_content).body),
+        ("tickets       solo render FastJSON",
+         lambda: FastJSONResponse(ticket_content).body),
+    ]
+    for name, render in cases:
+        _measure(name, render, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
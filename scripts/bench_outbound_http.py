@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark de llamadas HTTP salientes contra un servidor stub local
+
+- fresh:  un `httpx.AsyncClient` nuevo por llamada (esquema anterior de
+          WatsonService.test_connection: conexión nueva cada vez)
+- shared: OutboundHTTPClient compartido (keep-alive, límite por host)
+
+Al final se apunta el stub a `/fail` (503) para ver cómo el circuit breaker
+corta las llamadas después de N fallos seguidos. El stub (uvicorn) corre en
+otro proceso; `--latency-ms` simula el tiempo de respuesta del servicio.
+
+    python scripts/bench_outbound_http.py --requests 2000 --concurrency 20
+    python scripts/bench_outbound_http.py --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _stub_app(latency_seconds: float):
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if latency_seconds:
+            await asyncio.sleep(latency_seconds)
+        status = 503 if scope["path"] == "/fail" else 200
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")]
+        })
+        await send({
+            "type": "http.response.body", "body": b'{"status": "ok"}'
+        })
+    return app
+
+
+def _serve(port: int, latency_seconds: float):
+    import uvicorn
+
+    uvicorn.run(
+        _stub_app(latency_seconds),
+        host="127.0.0.1", port=port, log_level="warning"
+    )
+
+
+async def _wait_for_stub(url: str):
+    import httpx
+
+    for _ in range(50):
+        try:
+            async with httpx.AsyncClient() as client:
+                await client.get(url)
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("El servidor stub no arrancó")
+
+
+async def _run(mode: str, url: str, requests: int, concurrency: int) -> dict:
+    import httpx
+    from app.core.http_client import OutboundHTTPClient
+
+    shared = OutboundHTTPClient(
+        max_connections_per_host=concurrency, http2=False
+    )
+    pending = iter(range(requests))
+
+    async def worker():
+        for _ in pending:
+            if mode == "fresh":
+                async with httpx.AsyncClient() as client:
+                    await client.get(url)
+            else:
+                await shared.get(url)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await shared.close()
+
+    latency = shared.stats()["hosts"].get("127.0.0.1", {}).get("latency", {})
+    return {
+        "mode": mode,
+        "seconds": elapsed,
+        "rps": requests / elapsed,
+        "p50": latency.get("p50_ms"),
+        "p95": latency.get("p95_ms")
+    }
+
+
+async def _run_circuit(url: str, requests: int) -> dict:
+    from app.core.http_client import CircuitOpenError, OutboundHTTPClient
+
+    client = OutboundHTTPClient(
+        failure_threshold=5, reset_timeout=30, http2=False
+    )
+    short_circuited = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        try:
+            await client.get(url)
+        except CircuitOpenError:
+            short_circuited += 1
+    elapsed = time.perf_counter() - started
+    await client.close()
+    return {
+        "short_circuited": short_circuited,
+        "seconds": elapsed,
+        "stats": client.stats()["hosts"]
+    }
+
+
+async def _main(args):
+    base_url = f"http://127.0.0.1:{args.port}"
+    await _wait_for_stub(f"{base_url}/health")
+
+    print(
+        f"{'modo':<8} {'solicitudes':>11} {'seg':>8} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8}"
+    )
+    for mode in ("fresh", "shared"):
+        result = await _run(
+            mode, f"{base_url}/health", args.requests, args.concurrency
+        )
+        print(
+            f"{mode:<8} {args.requests:>11} {result['seconds']:>8.2f} "
+            f"{result['rps']:>9.0f} {str(result['p50'] or '-'):>8} "
+            f"{str(result['p95'] or '-'):>8}"
+        )
+
+    circuit = await _run_circuit(f"{base_url}/fail", 100)
+    print(
+        f"\ncircuit breaker: {circuit['short_circuited']}/100 llamadas "
+        "cortadas sin tocar el stub"
+    )
+    print(json.dumps(circuit["stats"], indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark del cliente HTTP saliente compartido"
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument(
+        "--latency-ms", type=float, default=0,
+        help="Latencia simulada del servicio"
+    )
+    args = parser.parse_args()
+
+    from loguru import logger
+
+    logger.disable("app")
+
+    server = multiprocessing.Process(
+        target=_serve, args=(args.port, args.latency_ms / 1000), daemon=True
+    )
+    server.start()
+    try:
+        asyncio.run(_main(args))
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark de exportación de reportes (memoria pico y filas/segundo)
+
+Cada modo corre en un proceso aparte para que el RSS pico (ru_maxrss) sea
+solo suyo:
+
+- stream-csv:  ReportService.iter_csv (cursor del servidor, lote por lote)
+- stream-xlsx: ReportService.write_xlsx (openpyxl write-only)
+- naive-csv:   esquema "todo en memoria" (.all() + DataFrame + to_csv)
+
+    python scripts/bench_report_export.py --seed-rows 1000000
+    python scripts/bench_report_export.py --modes stream-csv naive-csv \\
+        --report calls
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ("stream-csv", "stream-xlsx", "naive-csv")
+
+SEED_SQL = """
+    INSERT INTO uanl.calls (
+        operator_id, client_id, call_date, duration_seconds,
+        conversation, sentimiento, urgencia, tema
+    )
+    SELECT
+        (SELECT array_agg(operator_id) FROM uanl.operators)
+            [1 + g % (SELECT count(*) FROM uanl.operators)],
+        (SELECT min(client_id) FROM uanl.clients),
+        CURRENT_DATE - (g % 365),
+        60 + g % 900,
+        'Llamada de prueba ' || g,
+        (ARRAY['positivo', 'neutral', 'negativo'])[1 + g % 3],
+        (ARRAY['alta', 'media', 'baja'])[1 + g % 3],
+        'problema_general'
+    FROM generate_series(1, :missing) AS g
+"""
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _seed(rows: int):
+    from sqlalchemy import func, select, text
+    from app.config import database
+    from app.models.calls import Call
+    # Solo por su efecto: registra las relaciones de Call en el mapper
+    import app.services.report_service  # noqa: F401
+
+    database.initialize_database()
+    async with database.get_async_session_factory()() as db:
+        existing = await db.scalar(select(func.count(Call.call_id)))
+        if existing < rows:
+            print(f"🌱 Sembrando {rows - existing} llamadas...")
+            await db.execute(text(SEED_SQL), {"missing": rows - existing})
+            await db.commit()
+    await database.dispose_database()
+
+
+async def _run_mode(mode: str, report_type: str) -> dict:
+    from app.config import database
+    from app.services.report_service import report_service, REPORTS
+
+    database.initialize_database()
+    started = time.perf_counter()
+    rows = 0
+    size = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"reporte.{mode}")
+        if mode == "stream-csv":
+            with open(path, "wb") as output:
+                async for chunk in report_service.iter_csv(report_type, {}):
+                    output.write(chunk)
+                    rows += chunk.count(b"\n")
+            rows -= 1  # encabezado
+        elif mode == "stream-xlsx":
+            rows = await report_service.write_xlsx(report_type, {}, path)
+        else:
+            import pandas as pd
+            definition = REPORTS[report_type]
+            async with database.get_async_session_factory()() as db:
+                result = (await db.execute(definition.rows_query({}))).all()
+            frame = pd.DataFrame(
+                result, columns=[key for key, _ in definition.columns]
+            )
+            frame.to_csv(path, index=False)
+            rows = len(frame)
+        size = os.path.getsize(path)
+
+    elapsed = time.perf_counter() - started
+    await database.dispose_database()
+    return {
+        "mode": mode,
+        "rows": rows,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(rows / elapsed) if elapsed else 0,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "file_mb": round(size / 1024 / 1024, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark de exportación de reportes"
+    )
+    parser.add_argument(
+        "--report", choices=("calls", "tickets"), default="calls"
+    )
+    parser.add_argument(
+        "--modes", nargs="+", choices=MODES, default=list(MODES)
+    )
+    parser.add_argument(
+        "--seed-rows", type=int, default=0,
+        help="Llamadas a tener sembradas"
+    )
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_run_mode(args.child, args.report))))
+        return
+
+    if args.seed_rows:
+        asyncio.run(_seed(args.seed_rows))
+
+    print(
+        f"{'modo':<12} {'filas':>10} {'seg':>8} {'filas/s':>10} "
+        f"{'RSS pico MB':>12} {'archivo MB':>11}"
+    )
+    for mode in args.modes:
+        output = subprocess.run(
+            [
+                sys.executable, __file__,
+                "--report", args.report, "--child", mode
+            ],
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        print(
+            f"{result['mode']:<12} {result['rows']:>10} "
+            f"{result['seconds']:>8} {result['rows_per_second']:>10} "
+            f"{result['peak_rss_mb']:>12} {result['file_mb']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
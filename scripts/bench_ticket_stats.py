@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark de TicketService.get_ticket_stats
+
+Siembra `uanl.tickets` con generate_series hasta tener N filas y compara el
+esquema anterior (cinco count() por estado, GROUP BY por prioridad y join
+por operador: siete viajes) contra la consulta única con agregación
+condicional y contra la foto en caché. Usa DATABASE_URL de la configuración:
+
+    python scripts/bench_ticket_stats.py --rows 1000000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select, text  # noqa: E402
+
+from app.config import database  # noqa: E402
+# Solo por su efecto: registra Call para las relaciones de Ticket
+import app.models.calls  # noqa: E402,F401
+from app.models.operators import Operator  # noqa: E402
+from app.models.tickets import Ticket, TicketStatus  # noqa: E402
+from app.services.ticket_service import TicketService  # noqa: E402
+
+SEED_SQL = text("""
+    INSERT INTO uanl.tickets (
+        title, status, priority, client_id, assigned_operator_id,
+        created_at, resolved_at
+    )
+    SELECT
+        'Ticket de prueba ' || g,
+        (ARRAY['open', 'in_progress', 'resolved', 'closed'])[1 + g % 4],
+        (ARRAY['low', 'medium', 'high', 'urgent'])[1 + (g / 4) % 4],
+        (SELECT min(client_id) FROM uanl.clients),
+        (SELECT array_agg(operator_id) FROM uanl.operators)
+            [1 + g % (SELECT count(*) FROM uanl.operators)],
+        NOW() - make_interval(hours => g % 720),
+        CASE WHEN g % 4 = 2 THEN
+            NOW() - make_interval(hours => g % 720)
+                + make_interval(mins => 30 + g % 600)
+        END
+    FROM generate_series(1, :missing) AS g
+""")
+
+
+async def legacy_stats(db) -> dict:
+    """Esquema anterior: siete consultas por llamada"""
+    async def count(*criteria):
+        return await db.scalar(
+            select(func.count(Ticket.ticket_id)).where(*criteria)
+        )
+
+    stats = {"total_tickets": await count()}
+    for ticket_status in TicketStatus:
+        stats[f"{ticket_status.value}_tickets"] = await count(
+            Ticket.status == ticket_status
+        )
+    stats["tickets_by_priority"] = dict((await db.execute(
+        select(Ticket.priority, func.count(Ticket.ticket_id))
+        .group_by(Ticket.priority)
+    )).all())
+    stats["tickets_by_operator"] = dict((await db.execute(
+        select(Operator.name, func.count(Ticket.ticket_id)).join(
+            Ticket, Ticket.assigned_operator_id == Operator.operator_id,
+            isouter=True
+        ).group_by(Operator.name)
+    )).all())
+    return stats
+
+
+async def bench(label: str, fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - started)
+    p50 = statistics.median(timings)
+    print(
+        f"• {label:<32} p50 {p50 * 1000:9.2f} ms   "
+        f"max {max(timings) * 1000:9.2f} ms"
+    )
+    return p50
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark de estadísticas de tickets"
+    )
+    parser.add_argument(
+        "--rows", type=int, default=1_000_000,
+        help="Tickets a tener sembrados"
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    database.initialize_database()
+    service = TicketService()
+
+    async with database.get_async_session_factory()() as db:
+        existing = await db.scalar(select(func.count(Ticket.ticket_id)))
+        if existing < args.rows:
+            print(f"🌱 Sembrando {args.rows - existing} tickets...")
+            await db.execute(SEED_SQL, {"missing": args.rows - existing})
+            await db.commit()
+            await db.execute(text("ANALYZE uanl.tickets"))
+            await db.commit()
+        print(f"📄 {max(existing, args.rows)} tickets\n")
+
+        legacy = await bench(
+            "siete consultas (anterior)",
+            lambda: legacy_stats(db), args.repeat
+        )
+        single = await bench(
+            "una consulta condicional",
+            lambda: service.get_ticket_stats(db, use_cache=False), args.repeat
+        )
+        cached = await bench(
+            "foto en caché",
+            lambda: service.get_ticket_stats(db), args.repeat
+        )
+        print(
+            f"\n  ⚡ consulta única: {legacy / single:.2f}x   "
+            f"caché: {legacy / cached:.0f}x"
+        )
+
+    await database.dispose_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
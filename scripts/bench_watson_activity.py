@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark de la bitácora de Watson (`uanl.watson_activities`)
+
+- direct:   un INSERT + commit por registro (lo que costaría registrar cada
+            webhook dentro de la solicitud)
+- buffered: ActivityBatchWriter (buffer en memoria + un COPY por lote)
+
+Reporta la espera promedio del llamador por registro y el tiempo total
+hasta que todo quedó escrito. Las filas del benchmark se borran al final.
+
+    python scripts/bench_watson_activity.py --records 20000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCH_SESSION_PREFIX = "bench-activity-"
+
+
+def _activity(index: int) -> dict:
+    return {
+        "session_id": f"{BENCH_SESSION_PREFIX}{index % 500}",
+        "client_id": None,
+        "user_input": f"Necesito ayuda con mi servicio {index}",
+        "bot_response": "📊 Estado general: todo en orden",
+        "action_taken": "general_status_provided",
+        "context_data": "{}",
+        "metadata_json": '{"intent": "consultar_estado"}',
+        "created_at": datetime.now().astimezone()
+    }
+
+
+async def _run(
+    mode: str, records: int, concurrency: int, batch_size: int
+) -> dict:
+    from app.services.activity_writer import ActivityBatchWriter
+
+    writer = ActivityBatchWriter(batch_size=batch_size)
+    if mode == "buffered":
+        writer.start()
+
+    pending = iter(range(records))
+    waited = 0.0
+
+    async def worker():
+        nonlocal waited
+        for index in pending:
+            started = time.perf_counter()
+            await writer.record(_activity(index))
+            waited += time.perf_counter() - started
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    await writer.stop()
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "seconds": elapsed,
+        "wait_us": waited / records * 1e6,
+        "written": writer.written,
+        "batches": writer.batches,
+        "dropped": writer.dropped
+    }
+
+
+async def _main(args):
+    from sqlalchemy import delete
+    from app.config import database
+    from app.models.watson_activities import WatsonActivity
+
+    database.initialize_database()
+    print(
+        f"{'modo':<10} {'registros':>10} {'lotes':>7} {'seg':>8} "
+        f"{'reg/s':>9} {'espera us':>10} {'descart.':>9}"
+    )
+    for mode in ("direct", "buffered"):
+        records = args.records
+        if mode == "direct":
+            records = min(args.records, args.direct_records)
+        result = await _run(mode, records, args.concurrency, args.batch_size)
+        print(
+            f"{mode:<10} {result['written']:>10} {result['batches']:>7} "
+            f"{result['seconds']:>8.2f} "
+            f"{result['written'] / result['seconds']:>9.0f} "
+            f"{result['wait_us']:>10.1f} {result['dropped']:>9}"
+        )
+
+    async with database.get_async_session_factory()() as db:
+        await db.execute(delete(WatsonActivity).where(
+            WatsonActivity.session_id.like(f"{BENCH_SESSION_PREFIX}%")
+        ))
+        await db.commit()
+    await database.dispose_database()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark de la bitácora de Watson en lotes"
+    )
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument(
+        "--direct-records", type=int, default=5000,
+        help="Registros para el modo direct (es lento)"
+    )
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    from loguru import logger
+
+    logger.disable("app")
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -40,10 +40,34 @@ CREATE TABLE IF NOT EXISTS uanl.calls (
   conversation TEXT,
   call_type VARCHAR(50) DEFAULT 'incoming',
   status VARCHAR(50) DEFAULT 'completed',
+  sentimiento TEXT, -- positivo, negativo, neutral
+  impacto TEXT, -- alto, medio, bajo
+  urgencia TEXT, -- alta, media, baja
+  tema TEXT, -- tema principal de la llamada
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
   updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Crear tabla de análisis completo de llamadas
+CREATE TABLE IF NOT EXISTS uanl.call_analyses (
+  call_id BIGINT PRIMARY KEY REFERENCES uanl.calls(call_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  rules_version TEXT NOT NULL,
+  content_hash VARCHAR(64) NOT NULL, -- sha256 de la conversación normalizada
+  analysis JSONB NOT NULL, -- call_analysis, entidades, recomendaciones y resumen
+  analyzed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Crear tabla de agregados diarios de llamadas (mantenida por triggers)
+-- dimension: 'total' (value = ''), 'sentimiento', 'urgencia' o 'tema'
+CREATE TABLE IF NOT EXISTS uanl.call_stats_daily (
+  stat_date DATE NOT NULL,
+  operator_id INTEGER NOT NULL,
+  dimension TEXT NOT NULL,
+  value TEXT NOT NULL,
+  call_count BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (stat_date, operator_id, dimension, value)
+);
+
 -- Crear tabla de tickets
 CREATE TABLE IF NOT EXISTS uanl.tickets (
   ticket_id SERIAL PRIMARY KEY,
@@ -84,7 +108,10 @@ CREATE TABLE IF NOT EXISTS uanl.notifications (
   notification_type VARCHAR(100) NOT NULL, -- 'email', 'sms', 'push'
   title VARCHAR(255) NOT NULL,
   message TEXT NOT NULL,
-  status VARCHAR(50) DEFAULT 'pending', -- 'pending', 'sent', 'failed'
+  status VARCHAR(50) DEFAULT 'pending', -- 'pending', 'sending', 'sent', 'failed'
+  attempts INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(), -- reintento con backoff
+  last_error TEXT,
   sent_at TIMESTAMP WITH TIME ZONE,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -95,11 +122,15 @@ CREATE TABLE IF NOT EXISTS uanl.reports (
   report_type VARCHAR(100) NOT NULL,
   report_name VARCHAR(255) NOT NULL,
   parameters TEXT, -- JSON con parámetros del reporte
+  parameters_hash VARCHAR(64), -- sha256 de parameters (deduplicación)
   file_path VARCHAR(500),
   file_format VARCHAR(10),
   generated_by INTEGER REFERENCES uanl.operators(operator_id) ON UPDATE CASCADE ON DELETE SET NULL,
-  status VARCHAR(50) DEFAULT 'generating',
+  status VARCHAR(50) DEFAULT 'queued', -- 'queued', 'generating', 'completed', 'failed'
+  row_count INTEGER,
+  error_message TEXT,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  started_at TIMESTAMP WITH TIME ZONE,
   completed_at TIMESTAMP WITH TIME ZONE
 );
 
@@ -116,17 +147,31 @@ CREATE TABLE IF NOT EXISTS uanl.watson_activities (
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Crear tabla de marcas de agua de procesos en segundo plano
+CREATE TABLE IF NOT EXISTS uanl.processing_checkpoints (
+  name TEXT PRIMARY KEY,
+  last_id BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 -- Crear índices para mejorar performance
-CREATE INDEX IF NOT EXISTS idx_calls_date ON uanl.calls(call_date);
+CREATE INDEX IF NOT EXISTS idx_calls_date ON uanl.calls(call_date, call_id);
 CREATE INDEX IF NOT EXISTS idx_calls_operator ON uanl.calls(operator_id);
 CREATE INDEX IF NOT EXISTS idx_calls_client ON uanl.calls(client_id);
+CREATE INDEX IF NOT EXISTS idx_calls_pending_analysis ON uanl.calls(call_id) WHERE sentimiento IS NULL;
 CREATE INDEX IF NOT EXISTS idx_tickets_status ON uanl.tickets(status);
 CREATE INDEX IF NOT EXISTS idx_tickets_priority ON uanl.tickets(priority);
 CREATE INDEX IF NOT EXISTS idx_tickets_client ON uanl.tickets(client_id);
 CREATE INDEX IF NOT EXISTS idx_tickets_operator ON uanl.tickets(assigned_operator_id);
+CREATE INDEX IF NOT EXISTS idx_tickets_call ON uanl.tickets(call_id);
 CREATE INDEX IF NOT EXISTS idx_tickets_watson_session ON uanl.tickets(watson_session_id);
+CREATE INDEX IF NOT EXISTS idx_reports_pending ON uanl.reports(report_id) WHERE status IN ('queued', 'generating');
+CREATE INDEX IF NOT EXISTS idx_reports_parameters_hash ON uanl.reports(parameters_hash, created_at);
+CREATE INDEX IF NOT EXISTS idx_tickets_created_at ON uanl.tickets(created_at, ticket_id);
+CREATE INDEX IF NOT EXISTS idx_tickets_resolved_at ON uanl.tickets(resolved_at) WHERE resolved_at IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_visits_date ON uanl.scheduled_visits(visit_date);
 CREATE INDEX IF NOT EXISTS idx_notifications_status ON uanl.notifications(status);
+CREATE INDEX IF NOT EXISTS idx_notifications_due ON uanl.notifications(next_attempt_at, notification_id) WHERE status IN ('pending', 'sending');
 CREATE INDEX IF NOT EXISTS idx_watson_session ON uanl.watson_activities(session_id);
 
 -- Insertar datos de ejemplo
@@ -166,3 +211,95 @@ CREATE TRIGGER update_tickets_updated_at BEFORE UPDATE ON uanl.tickets
     
 CREATE TRIGGER update_visits_updated_at BEFORE UPDATE ON uanl.scheduled_visits 
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Agregados diarios de llamadas: cada sentencia sobre uanl.calls reduce sus filas
+-- afectadas a deltas por (fecha, operador, sentimiento, urgencia, tema); las
+-- filas anteriores restan y las nuevas suman, así que los UPDATE que no tocan
+-- esas columnas se cancelan y no escriben nada.
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_type t JOIN pg_namespace n ON n.oid = t.typnamespace
+                   WHERE n.nspname = 'uanl' AND t.typname = 'call_stats_delta') THEN
+        CREATE TYPE uanl.call_stats_delta AS (
+            stat_date DATE, operator_id INTEGER, sentimiento TEXT, urgencia TEXT, tema TEXT, delta BIGINT
+        );
+    END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION uanl.apply_call_stats_delta()
+RETURNS TRIGGER AS $$
+DECLARE
+    deltas uanl.call_stats_delta[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        deltas := ARRAY(
+            SELECT ROW(call_date, operator_id, sentimiento, urgencia, tema, COUNT(*))::uanl.call_stats_delta
+            FROM new_rows GROUP BY call_date, operator_id, sentimiento, urgencia, tema
+        );
+    ELSIF TG_OP = 'DELETE' THEN
+        deltas := ARRAY(
+            SELECT ROW(call_date, operator_id, sentimiento, urgencia, tema, -COUNT(*))::uanl.call_stats_delta
+            FROM old_rows GROUP BY call_date, operator_id, sentimiento, urgencia, tema
+        );
+    ELSE
+        deltas := ARRAY(
+            SELECT ROW(call_date, operator_id, sentimiento, urgencia, tema, SUM(delta))::uanl.call_stats_delta
+            FROM (
+                SELECT call_date, operator_id, sentimiento, urgencia, tema, 1 AS delta FROM new_rows
+                UNION ALL
+                SELECT call_date, operator_id, sentimiento, urgencia, tema, -1 AS delta FROM old_rows
+            ) AS changes
+            GROUP BY call_date, operator_id, sentimiento, urgencia, tema
+            HAVING SUM(delta) <> 0
+        );
+    END IF;
+
+    -- Orden fijo de llaves para que transacciones concurrentes no se bloqueen mutuamente
+    INSERT INTO uanl.call_stats_daily AS s (stat_date, operator_id, dimension, value, call_count)
+    SELECT d.stat_date, d.operator_id, x.dimension, x.value, SUM(d.delta)
+    FROM unnest(deltas) AS d
+    CROSS JOIN LATERAL (VALUES
+        ('total', ''), ('sentimiento', d.sentimiento), ('urgencia', d.urgencia), ('tema', d.tema)
+    ) AS x(dimension, value)
+    WHERE x.value IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+    HAVING SUM(d.delta) <> 0
+    ORDER BY 1, 2, 3, 4
+    ON CONFLICT (stat_date, operator_id, dimension, value)
+    DO UPDATE SET call_count = s.call_count + EXCLUDED.call_count;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recalcular los agregados desde cero (carga inicial o corrección)
+CREATE OR REPLACE FUNCTION uanl.rebuild_call_stats_daily()
+RETURNS VOID AS $$
+BEGIN
+    LOCK TABLE uanl.calls IN SHARE MODE;
+    DELETE FROM uanl.call_stats_daily;
+    INSERT INTO uanl.call_stats_daily (stat_date, operator_id, dimension, value, call_count)
+    SELECT c.call_date, c.operator_id, x.dimension, x.value, COUNT(*)
+    FROM uanl.calls AS c
+    CROSS JOIN LATERAL (VALUES
+        ('total', ''), ('sentimiento', c.sentimiento), ('urgencia', c.urgencia), ('tema', c.tema)
+    ) AS x(dimension, value)
+    WHERE x.value IS NOT NULL
+    GROUP BY 1, 2, 3, 4;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER calls_stats_insert AFTER INSERT ON uanl.calls
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION uanl.apply_call_stats_delta();
+
+CREATE OR REPLACE TRIGGER calls_stats_update AFTER UPDATE ON uanl.calls
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION uanl.apply_call_stats_delta();
+
+CREATE OR REPLACE TRIGGER calls_stats_delete AFTER DELETE ON uanl.calls
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION uanl.apply_call_stats_delta();
+
+SELECT uanl.rebuild_call_stats_daily();
@@ -0,0 +1,16 @@
+"""
+Configuración de las pruebas unitarias
+
+Estas pruebas no abren la base de datos ni servicios externos; solo hace
+falta que la configuración cargue, así que las variables obligatorias
+reciben valores de relleno si no vienen del entorno.
+"""
+import os
+
+for name, value in {
+    "SECRET_KEY": "test-secret",
+    "DATABASE_URL": "postgresql://test@localhost/test",
+    "DATABASE_USER": "test",
+    "DATABASE_PASSWORD": "test",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,77 @@
+"""Bitácora de Watson en lotes: drenado al detener y escritura directa"""
+import asyncio
+
+from app.services.activity_writer import ActivityBatchWriter
+
+
+def _writer(**kwargs):
+    """Writer cuyo `_flush` guarda los lotes en memoria en lugar del COPY"""
+    writer = ActivityBatchWriter(**kwargs)
+    batches = []
+
+    async def flush(batch):
+        batches.append(list(batch))
+        writer.written += len(batch)
+        writer.batches += 1
+
+    writer._flush = flush
+    return writer, batches
+
+
+def _activity(index: int) -> dict:
+    return {"session_id": f"sesion-{index}", "user_input": f"mensaje {index}"}
+
+
+def test_stop_drains_buffer():
+    # Intervalo largo: solo el tamaño de lote o el stop provocan escrituras
+    writer, batches = _writer(batch_size=10, flush_interval_ms=60000)
+
+    async def scenario():
+        writer.start()
+        for index in range(25):
+            await writer.record(_activity(index))
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+    written = [
+        activity["session_id"] for batch in batches for activity in batch
+    ]
+    assert written == [f"sesion-{index}" for index in range(25)]
+    assert all(len(batch) <= 10 for batch in batches)
+    assert writer.written == 25
+    assert not writer.running
+
+
+def test_flush_interval_writes_partial_batch():
+    writer, batches = _writer(batch_size=100, flush_interval_ms=10)
+
+    async def scenario():
+        writer.start()
+        await writer.record(_activity(1))
+        await asyncio.sleep(0.1)
+        flushed_before_stop = len(batches)
+        await writer.stop()
+        return flushed_before_stop
+
+    assert asyncio.run(scenario()) == 1
+    assert len(batches[0]) == 1
+
+
+def test_record_without_task_writes_directly():
+    writer, batches = _writer()
+
+    asyncio.run(writer.record(_activity(1)))
+
+    assert len(batches) == 1
+    # La hora se fija al registrar, no al escribir el lote
+    assert batches[0][0]["created_at"].tzinfo is not None
+
+
+def test_stop_without_start_is_noop():
+    writer, batches = _writer()
+
+    asyncio.run(writer.stop())
+
+    assert batches == []
+    assert writer.stats()["buffered"] == 0
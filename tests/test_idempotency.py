@@ -0,0 +1,119 @@
+"""Ejecución idempotente: respuestas repetidas y duplicados en vuelo"""
+import asyncio
+
+import pytest
+
+from app.core.cache import TieredCache, TTLCache
+from app.core.idempotency import IdempotencyCache, request_fingerprint
+
+
+def _cache(**kwargs) -> IdempotencyCache:
+    responses = TieredCache(TTLCache(maxsize=16, ttl=60))
+    return IdempotencyCache(responses, **kwargs)
+
+
+def test_fingerprint_ignores_key_order():
+    first = request_fingerprint("webhook", {"a": 1, "b": 2})
+    second = request_fingerprint("webhook", {"b": 2, "a": 1})
+
+    assert first == second
+    assert first != request_fingerprint("webhook", {"a": 1, "b": 3})
+
+
+def test_stored_response_is_replayed():
+    cache = _cache()
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        return {"ticket_id": 10}
+
+    async def scenario():
+        first = await cache.run("llave", operation)
+        second = await cache.run("llave", operation)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == ({"ticket_id": 10}, False)
+    assert second == ({"ticket_id": 10}, True)
+    assert len(calls) == 1
+    assert (cache.executions, cache.replays) == (1, 1)
+
+
+def test_concurrent_duplicates_share_one_execution():
+    cache = _cache()
+    calls = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def operation():
+            calls.append(1)
+            await release.wait()
+            return {"ticket_id": 11}
+
+        tasks = [
+            asyncio.create_task(cache.run("llave", operation))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert sorted(replayed for _, replayed in results) == [False, True, True]
+    assert all(response == {"ticket_id": 11} for response, _ in results)
+    assert cache.coalesced == 2
+    assert cache.stats()["in_flight"] == 0
+
+
+def test_rejected_response_is_not_stored():
+    cache = _cache(should_store=lambda response: response["status"] == "ok")
+    responses = iter([{"status": "error"}, {"status": "ok"}])
+
+    async def operation():
+        return next(responses)
+
+    async def scenario():
+        first = await cache.run("llave", operation)
+        second = await cache.run("llave", operation)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == ({"status": "error"}, False)
+    assert second == ({"status": "ok"}, False)
+    assert cache.executions == 2
+
+
+def test_duplicate_retries_when_first_execution_fails():
+    cache = _cache()
+    attempts = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def operation():
+            attempts.append(1)
+            if len(attempts) == 1:
+                await release.wait()
+                raise RuntimeError("falla transitoria")
+            return {"ticket_id": 12}
+
+        first = asyncio.create_task(cache.run("llave", operation))
+        await asyncio.sleep(0)
+        duplicate = asyncio.create_task(cache.run("llave", operation))
+        await asyncio.sleep(0)
+        release.set()
+
+        with pytest.raises(RuntimeError):
+            await first
+        return await duplicate
+
+    response, replayed = asyncio.run(scenario())
+
+    assert (response, replayed) == ({"ticket_id": 12}, False)
+    assert len(attempts) == 2
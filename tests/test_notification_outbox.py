@@ -0,0 +1,38 @@
+"""Backoff de reintentos del outbox de notificaciones"""
+import pytest
+
+from app.services.notification_outbox import NotificationOutbox
+
+
+def _outbox() -> NotificationOutbox:
+    return NotificationOutbox(
+        sender=None, retry_base_seconds=30, retry_max_seconds=3600
+    )
+
+
+@pytest.mark.parametrize("attempts, expected", [
+    (1, 30),
+    (2, 60),
+    (3, 120),
+    (5, 480),
+])
+def test_retry_delay_doubles_with_jitter(attempts, expected):
+    outbox = _outbox()
+
+    for _ in range(200):
+        delay = outbox._retry_delay(attempts)
+        assert expected * 0.8 <= delay <= expected * 1.2
+
+
+@pytest.mark.parametrize("attempts", [8, 20, 100])
+def test_retry_delay_is_capped(attempts):
+    outbox = _outbox()
+
+    for _ in range(200):
+        assert 3600 * 0.8 <= outbox._retry_delay(attempts) <= 3600 * 1.2
+
+
+def test_retry_delay_is_jittered():
+    outbox = _outbox()
+
+    assert len({outbox._retry_delay(3) for _ in range(20)}) > 1
@@ -0,0 +1,63 @@
+"""Cursores opacos de la paginación keyset"""
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.models.calls import Call
+from app.models.tickets import Ticket
+from app.utils.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor
+)
+
+TICKET_COLUMNS = (Ticket.created_at, Ticket.ticket_id)
+
+
+def test_cursor_roundtrip_datetime():
+    created_at = datetime(2024, 1, 15, 10, 30, 5, 123456, tzinfo=timezone.utc)
+    cursor = encode_cursor("tickets", [created_at, 42])
+
+    assert decode_cursor(cursor, "tickets", TICKET_COLUMNS) == [created_at, 42]
+
+
+def test_cursor_roundtrip_date():
+    cursor = encode_cursor("calls", [date(2024, 3, 3), 7])
+
+    values = decode_cursor(cursor, "calls", (Call.call_date, Call.call_id))
+    assert values == [date(2024, 3, 3), 7]
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor("tickets", [datetime(2024, 1, 15), 10 ** 12])
+
+    assert "=" not in cursor
+    assert "+" not in cursor and "/" not in cursor
+
+
+def test_cursor_from_other_listing_is_rejected():
+    cursor = encode_cursor("calls", [date(2024, 3, 3), 7])
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "tickets", TICKET_COLUMNS)
+
+
+def test_cursor_with_wrong_arity_is_rejected():
+    cursor = encode_cursor("tickets", [42])
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "tickets", TICKET_COLUMNS)
+
+
+@pytest.mark.parametrize("cursor", ["", "no-es-base64!", "e30", "bnVsbA"])
+def test_malformed_cursor_is_rejected(cursor):
+    # "e30" es {} y "bnVsbA" es null: JSON válido sin la forma esperada
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "tickets", TICKET_COLUMNS)
+
+
+def test_cursor_with_wrong_types_is_rejected():
+    cursor = encode_cursor("tickets", ["ayer", "cuarenta"])
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "tickets", TICKET_COLUMNS)
@@ -0,0 +1,106 @@
+"""Respuestas JSON precalculadas: ETag, 304 y gzip"""
+import gzip
+import json
+
+from starlette.requests import Request
+
+from app.utils.precomputed import PrecomputedJSON
+
+DOCUMENT = {"openapi": "3.0.0", "info": {"title": "API UANL", "x": "ñ"}}
+
+
+def _request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [
+            (name.replace("_", "-").encode(), value.encode())
+            for name, value in headers.items()
+        ]
+    })
+
+
+def _document() -> PrecomputedJSON:
+    return PrecomputedJSON(lambda: DOCUMENT)
+
+
+def test_plain_response():
+    response = _document().response(_request())
+
+    assert response.status_code == 200
+    assert json.loads(response.body) == DOCUMENT
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["cache-control"] == "no-cache"
+
+
+def test_gzip_response_has_its_own_etag():
+    document = _document()
+    plain = document.response(_request())
+    compressed = document.response(_request(accept_encoding="br, gzip"))
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(compressed.body) == plain.body
+    assert compressed.headers["etag"] != plain.headers["etag"]
+
+
+def test_gzip_refused_with_q_zero():
+    response = _document().response(_request(accept_encoding="gzip;q=0"))
+
+    assert "content-encoding" not in response.headers
+
+
+def test_matching_etag_returns_304():
+    document = _document()
+    etag = document.response(_request()).headers["etag"]
+
+    response = document.response(_request(if_none_match=etag))
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == etag
+
+
+def test_weak_and_listed_etags_match():
+    document = _document()
+    etag = document.response(_request()).headers["etag"]
+
+    response = document.response(
+        _request(if_none_match=f'"otro", W/{etag}')
+    )
+
+    assert response.status_code == 304
+
+
+def test_stale_etag_returns_body():
+    response = _document().response(_request(if_none_match='"viejo"'))
+
+    assert response.status_code == 200
+    assert json.loads(response.body) == DOCUMENT
+
+
+def test_document_is_built_once_until_invalidated():
+    builds = []
+
+    def build():
+        builds.append(1)
+        return DOCUMENT
+
+    document = PrecomputedJSON(build)
+    document.response(_request())
+    document.response(_request(accept_encoding="gzip"))
+    assert len(builds) == 1
+
+    document.invalidate()
+    document.response(_request())
+    assert len(builds) == 2
+
+
+def test_gzip_bytes_are_deterministic():
+    # Mismo ETag en cada instancia: mtime=0 en el encabezado gzip
+    first = _document().load()
+    second = _document().load()
+
+    assert first.gzip_body == second.gzip_body
+    assert first.gzip_etag == second.gzip_etag